@@ -1,5 +1,5 @@
 import beaker
-from calculator_blueprint import calculator, add_n
+from calculator_blueprint import calculator, add_n, vector_calculator
 
 # Create an Application named `blueprint`
 app = beaker.Application("blueprint")
@@ -13,3 +13,6 @@ app.apply(calculator)
 # in this case, we pass n=5 to specify the
 # value of n to add to the input number
 app.apply(add_n, n=5)
+
+# Vector versions of the calculator methods, taking uint64[] arguments
+app.apply(vector_calculator)
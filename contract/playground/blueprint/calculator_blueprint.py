@@ -33,3 +33,129 @@ def add_n(app: beaker.Application, n: int) -> None:
     def add_n(a: pt.abi.Uint64, *, output: pt.abi.Uint64) -> pt.Expr:
         """Add n to a"""
         return output.set(a.get() + pt.Int(n))
+
+
+# Upper bound of the opcode cost per element of the vector methods
+VECTOR_OP_COST = 40
+
+
+def _ensure_vector_budget(a: pt.abi.DynamicArray) -> pt.Expr:
+    # Long vectors need more than one call's budget; the extra inner app
+    # calls are paid from the outer transaction's fee (fee pooling)
+    return pt.OpUp(pt.OpUpMode.OnCall).ensure_budget(
+        pt.Int(VECTOR_OP_COST) * a.length(), pt.OpUpFeeSource.GroupCredit
+    )
+
+
+def _element(encoded: pt.Expr, i: pt.Expr) -> pt.Expr:
+    # Skip the 2 byte length prefix of the encoded uint64[]
+    return pt.ExtractUint64(encoded, pt.Int(2) + i * pt.Int(8))
+
+
+def _elementwise(a, b, output, op) -> pt.Expr:
+    """Apply op to each pair of elements of a and b, building the encoded result directly"""
+    i = pt.ScratchVar(pt.TealType.uint64)
+    n = pt.ScratchVar(pt.TealType.uint64)
+    result = pt.ScratchVar(pt.TealType.bytes)
+    return pt.Seq(
+        n.store(a.length()),
+        pt.Assert(n.load() == b.length()),
+        _ensure_vector_budget(a),
+        result.store(pt.Extract(a.encode(), pt.Int(0), pt.Int(2))),
+        pt.For(i.store(pt.Int(0)), i.load() < n.load(), i.store(i.load() + pt.Int(1))).Do(
+            result.store(
+                pt.Concat(
+                    result.load(),
+                    pt.Itob(op(_element(a.encode(), i.load()), _element(b.encode(), i.load()))),
+                )
+            )
+        ),
+        output.decode(result.load()),
+    )
+
+
+def _reduce(a, output, initial: pt.Expr, op) -> pt.Expr:
+    """Fold the elements of a into one value with op"""
+    i = pt.ScratchVar(pt.TealType.uint64)
+    n = pt.ScratchVar(pt.TealType.uint64)
+    acc = pt.ScratchVar(pt.TealType.uint64)
+    return pt.Seq(
+        n.store(a.length()),
+        _ensure_vector_budget(a),
+        acc.store(initial),
+        pt.For(i.store(pt.Int(0)), i.load() < n.load(), i.store(i.load() + pt.Int(1))).Do(
+            acc.store(op(acc.load(), _element(a.encode(), i.load())))
+        ),
+        output.set(acc.load()),
+    )
+
+
+def vector_calculator(app: beaker.Application) -> None:
+    """blueprint to add element-wise and reducing math operations on uint64 arrays to an application"""
+
+    @app.external
+    def add_vec(
+        a: pt.abi.DynamicArray[pt.abi.Uint64],
+        b: pt.abi.DynamicArray[pt.abi.Uint64],
+        *,
+        output: pt.abi.DynamicArray[pt.abi.Uint64],
+    ) -> pt.Expr:
+        """Add b to a element-wise"""
+        return _elementwise(a, b, output, pt.Add)
+
+    @app.external
+    def sub_vec(
+        a: pt.abi.DynamicArray[pt.abi.Uint64],
+        b: pt.abi.DynamicArray[pt.abi.Uint64],
+        *,
+        output: pt.abi.DynamicArray[pt.abi.Uint64],
+    ) -> pt.Expr:
+        """Subtract b from a element-wise"""
+        return _elementwise(a, b, output, pt.Minus)
+
+    @app.external
+    def mul_vec(
+        a: pt.abi.DynamicArray[pt.abi.Uint64],
+        b: pt.abi.DynamicArray[pt.abi.Uint64],
+        *,
+        output: pt.abi.DynamicArray[pt.abi.Uint64],
+    ) -> pt.Expr:
+        """Multiply a and b element-wise"""
+        return _elementwise(a, b, output, pt.Mul)
+
+    @app.external
+    def div_vec(
+        a: pt.abi.DynamicArray[pt.abi.Uint64],
+        b: pt.abi.DynamicArray[pt.abi.Uint64],
+        *,
+        output: pt.abi.DynamicArray[pt.abi.Uint64],
+    ) -> pt.Expr:
+        """Divide a by b element-wise"""
+        return _elementwise(a, b, output, pt.Div)
+
+    @app.external
+    def sum_vec(a: pt.abi.DynamicArray[pt.abi.Uint64], *, output: pt.abi.Uint64) -> pt.Expr:
+        """Sum of the elements of a"""
+        return _reduce(a, output, pt.Int(0), pt.Add)
+
+    @app.external
+    def dot_vec(
+        a: pt.abi.DynamicArray[pt.abi.Uint64],
+        b: pt.abi.DynamicArray[pt.abi.Uint64],
+        *,
+        output: pt.abi.Uint64,
+    ) -> pt.Expr:
+        """Dot product of a and b"""
+        i = pt.ScratchVar(pt.TealType.uint64)
+        n = pt.ScratchVar(pt.TealType.uint64)
+        acc = pt.ScratchVar(pt.TealType.uint64)
+        return pt.Seq(
+            n.store(a.length()),
+            pt.Assert(n.load() == b.length()),
+            _ensure_vector_budget(a),
+            acc.store(pt.Int(0)),
+            pt.For(i.store(pt.Int(0)), i.load() < n.load(), i.store(i.load() + pt.Int(1))).Do(
+                acc.store(acc.load() + _element(a.encode(), i.load()) * _element(b.encode(), i.load()))
+            ),
+            output.set(acc.load()),
+        )
@@ -1,9 +1,45 @@
-from algokit_utils import LogicError
+import argparse
+import math
+
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer
 import application
+from calculator_blueprint import VECTOR_OP_COST
 from beaker import client, localnet as sandbox
 
+# Opcode budget of one app call
+CALL_BUDGET = 700
+
+
+def simulate_call(app_client, algod_client, method: str, fee: int, **kwargs) -> tuple[int, int]:
+    """Return (opcode budget consumed, inner transaction count) of one simulated call."""
+    sp = algod_client.suggested_params()
+    sp.flat_fee = True
+    sp.fee = fee
+    atc = AtomicTransactionComposer()
+    app_client.add_method_call(atc, method, suggested_params=sp, **kwargs)
+    result = atc.simulate(algod_client).simulate_response["txn-groups"][0]["txn-results"][0]
+    return result.get("app-budget-consumed", 0), len(result["txn-result"].get("inner-txns", []))
+
+
+def benchmark(app_client, algod_client, elements: int) -> None:
+    """Compare per-element cost and fees of `elements` scalar calls against one vector call."""
+    min_fee = algod_client.suggested_params().min_fee
+    a = list(range(1, elements + 1))
+    b = [2] * elements
+    # The vector call pays for its OpUp inner calls through fee pooling
+    vector_fee = min_fee * (1 + math.ceil(VECTOR_OP_COST * elements / CALL_BUDGET))
+
+    print(f"\n{'method':10} {'cost/element':>12} {'fee/element':>12} {'calls':>6}")
+    for scalar, vector in [("add", "add_vec"), ("sub", "sub_vec"), ("mul", "mul_vec"), ("div", "div_vec")]:
+        scalar_cost, _ = simulate_call(app_client, algod_client, scalar, min_fee, a=a[-1], b=b[-1])
+        print(f"{scalar:10} {scalar_cost:12.1f} {min_fee:12.1f} {elements:6}")
+
+        vector_cost, inner = simulate_call(app_client, algod_client, vector, vector_fee, a=a, b=b)
+        vector_fee_paid = min_fee * (1 + inner)
+        print(f"{vector:10} {vector_cost / elements:12.1f} {vector_fee_paid / elements:12.1f} {1:6}")
 
-def main() -> None:
+
+def main(elements: int) -> None:
     acct = sandbox.get_accounts().pop()
     algod_client = sandbox.get_algod_client()
     app_client = client.ApplicationClient(
@@ -35,6 +71,34 @@ def main() -> None:
     print(f"add_n result: {result.return_value}")
     assert result.return_value == 15
 
+    # The vector methods work element-wise on uint64[] arguments
+    result = app_client.call("add_vec", a=[1, 2, 3], b=[10, 20, 30])
+    print(f"add_vec result: {result.return_value}")
+    assert result.return_value == [11, 22, 33]
+
+    result = app_client.call("div_vec", a=[10, 20, 30], b=[5, 4, 3])
+    print(f"div_vec result: {result.return_value}")
+    assert result.return_value == [2, 5, 10]
+
+    # or reduce them to a single value
+    result = app_client.call("sum_vec", a=[1, 2, 3])
+    print(f"sum_vec result: {result.return_value}")
+    assert result.return_value == 6
+
+    result = app_client.call("dot_vec", a=[1, 2, 3], b=[4, 5, 6])
+    print(f"dot_vec result: {result.return_value}")
+    assert result.return_value == 32
+
+    if elements:
+        benchmark(app_client, algod_client, elements)
+
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Call the calculator blueprints on the sandbox node.")
+    parser.add_argument(
+        "--elements", type=int, default=64,
+        help="Vector length for the scalar vs vector cost comparison, 0 to skip it. "
+        "At most 127 so the uint64[] result fits the 1024 byte log limit.",
+    )
+    args = parser.parse_args()
+    main(args.elements)
@@ -0,0 +1,101 @@
+# Build every contract package in the playground (each directory with a build.py)
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+PLAYGROUND_DIR = Path(__file__).resolve().parent
+CACHE_FILE = PLAYGROUND_DIR / ".build_cache.json"
+TOOLCHAIN_PACKAGES = ("pyteal", "beaker-pyteal")
+
+
+def find_packages(root: Path = PLAYGROUND_DIR) -> list[Path]:
+    """Return every directory below `root` that contains a build.py."""
+    return sorted(path.parent for path in root.glob("*/build.py"))
+
+
+def toolchain_versions() -> dict:
+    versions = {}
+    for package in TOOLCHAIN_PACKAGES:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def source_hash(package: Path, toolchain: dict) -> str:
+    """Hash the package's Python sources together with the pyteal/beaker versions."""
+    digest = hashlib.sha256(json.dumps(toolchain, sort_keys=True).encode())
+    for path in sorted(package.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_cache() -> dict:
+    try:
+        return json.loads(CACHE_FILE.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def build_package(package: Path) -> tuple[Path, int, str]:
+    """Run the package's build.py in its own Python process."""
+    result = subprocess.run(
+        [sys.executable, "build.py"], cwd=package, capture_output=True, text=True
+    )
+    return package, result.returncode, result.stdout + result.stderr
+
+
+def build_all(force: bool = False, workers: int | None = None, names: list[str] | None = None) -> bool:
+    """
+    Build the contract packages whose sources or toolchain changed since their
+    last successful build, in parallel processes. Returns True if all builds
+    succeeded.
+    """
+    toolchain = toolchain_versions()
+    cache = load_cache()
+    packages = find_packages()
+    if names:
+        packages = [package for package in packages if package.name in names]
+
+    hashes = {package.name: source_hash(package, toolchain) for package in packages}
+    stale = [
+        package
+        for package in packages
+        if force
+        or cache.get(package.name) != hashes[package.name]
+        or not (package / "artifacts").is_dir()
+    ]
+    for package in packages:
+        if package not in stale:
+            print(f"{package.name}: up to date")
+
+    ok = True
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for package, returncode, output in executor.map(build_package, stale):
+            if returncode == 0:
+                cache[package.name] = hashes[package.name]
+                print(f"{package.name}: built")
+            else:
+                ok = False
+                cache.pop(package.name, None)
+                print(f"{package.name}: build failed\n{output}")
+
+    CACHE_FILE.write_text(json.dumps(cache, indent=2, sort_keys=True))
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build all changed playground contracts.")
+    parser.add_argument("packages", nargs="*", help="Only consider these packages, e.g. counter.")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if nothing changed.")
+    parser.add_argument("--workers", type=int, help="Number of parallel builds.")
+    args = parser.parse_args()
+
+    sys.exit(0 if build_all(args.force, args.workers, args.packages) else 1)
@@ -56,6 +56,38 @@ def decrement(*, output: pt.abi.Uint64) -> pt.Expr:
     )
 
 
+INCREMENT_OP = 0
+DECREMENT_OP = 1
+# Upper bound of the opcode cost of one loop iteration in `batch`
+BATCH_OP_COST = 40
+
+
+@counter_app.external(authorize=Authorize.only_creator())
+def batch(ops: pt.abi.DynamicArray[pt.abi.Uint8], *, output: pt.abi.Uint64) -> pt.Expr:
+    """apply a list of operations (0 = increment, 1 = decrement) in order and return the counter"""
+    i = pt.ScratchVar(pt.TealType.uint64)
+    value = pt.ScratchVar(pt.TealType.uint64)
+    op = pt.abi.Uint8()
+    return pt.Seq(
+        # Long batches need more than one call's budget; the extra inner
+        # app calls are paid from the outer transaction's fee (fee pooling)
+        pt.OpUp(pt.OpUpMode.OnCall).ensure_budget(
+            pt.Int(BATCH_OP_COST) * ops.length(), pt.OpUpFeeSource.GroupCredit
+        ),
+        value.store(counter_app.state.counter),
+        pt.For(i.store(pt.Int(0)), i.load() < ops.length(), i.store(i.load() + pt.Int(1))).Do(
+            ops[i.load()].store_into(op),
+            pt.If(op.get() == pt.Int(INCREMENT_OP))
+            .Then(value.store((value.load() * pt.Int(3)) / pt.Int(2)))
+            .ElseIf(op.get() == pt.Int(DECREMENT_OP))
+            .Then(value.store(value.load() - pt.Int(1)))
+            .Else(pt.Err()),
+        ),
+        counter_app.state.counter.set(value.load()),
+        output.set(value.load()),
+    )
+
+
 def demo() -> None:
     # client = sandbox.get_algod_client()
     token = ""
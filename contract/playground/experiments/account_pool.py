@@ -0,0 +1,183 @@
+"""
+Pool of sender accounts for the experiment drivers.
+
+Accounts are either derived deterministically from a seed phrase or generated
+at random, funded from one account in atomic groups of up to 16 payments
+(submitted concurrently) and saved to a JSON file.
+
+The LastExecuted/Counter methods are `Authorize.only_creator()` and the apps
+have no opt-in route, so a pool account can only race against app instances
+it created itself. `--deploy` has every account create its own apps (see
+app_deployer.py); their IDs are stored with the account. The drivers load the
+file with `--account-pool` and take (account, app) pairs round-robin, the
+account sending both calls of a race on its own app.
+"""
+import argparse
+import base64
+import hashlib
+import itertools
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from algosdk import account, constants, mnemonic, transaction
+from algosdk.v2client import algod
+from nacl.signing import SigningKey
+
+from playground.experiments.app_deployer import CompiledApp, deploy_apps
+
+DEFAULT_POOL_FILE = "account_pool.json"
+DEFAULT_FUNDER_MNEMONIC = "kitchen subway tomato hire inspire pepper camera frog about kangaroo bunker express length song act oven world quality around elegant lion chimney enough ability prepare"
+MAX_GROUP_SIZE = constants.tx_group_limit
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class AccountPool:
+    def __init__(self, private_keys: list[str], app_ids: list[list[int]] | None = None):
+        if not private_keys:
+            raise ValueError("An account pool needs at least one account")
+        self.private_keys = list(private_keys)
+        self.addresses = [account.address_from_private_key(pk) for pk in self.private_keys]
+        # Apps created by each account, the only ones it may call
+        self.app_ids = [list(ids) for ids in app_ids] if app_ids else [[] for _ in self.private_keys]
+        self._cycle = itertools.cycle(range(len(self.private_keys)))
+        self._app_cycles = [itertools.cycle(ids) for ids in self.app_ids]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.private_keys)
+
+    @classmethod
+    def generate(cls, count: int) -> "AccountPool":
+        return cls([account.generate_account()[0] for _ in range(count)])
+
+    @classmethod
+    def derive(cls, seed: str, count: int) -> "AccountPool":
+        """Derive `count` accounts from `seed`; the same seed always gives the same pool."""
+        private_keys = []
+        for i in range(count):
+            signing_key = SigningKey(hashlib.sha256(f"{seed}/{i}".encode()).digest())
+            private_keys.append(
+                base64.b64encode(signing_key.encode() + signing_key.verify_key.encode()).decode()
+            )
+        return cls(private_keys)
+
+    @classmethod
+    def load(cls, path: str) -> "AccountPool":
+        with open(path) as f:
+            data = json.load(f)
+        return cls(
+            [mnemonic.to_private_key(entry["mnemonic"]) for entry in data["accounts"]],
+            [entry.get("app_ids", []) for entry in data["accounts"]],
+        )
+
+    def save(self, path: str):
+        data = {
+            "accounts": [
+                {"address": address, "mnemonic": mnemonic.from_private_key(pk), "app_ids": app_ids}
+                for address, pk, app_ids in zip(self.addresses, self.private_keys, self.app_ids)
+            ]
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=4)
+
+    def next(self) -> tuple[str, str]:
+        """Return the next (address, private_key) pair, round-robin and thread-safe."""
+        with self._lock:
+            i = next(self._cycle)
+        return self.addresses[i], self.private_keys[i]
+
+    def all_app_ids(self) -> list[int]:
+        return [app_id for app_ids in self.app_ids for app_id in app_ids]
+
+    def next_race(self) -> tuple[str, str, int]:
+        """Return the next (address, private_key, app_id) with an app the account created, round-robin."""
+        with self._lock:
+            i = next(self._cycle)
+            if not self.app_ids[i]:
+                raise ValueError(f"{self.addresses[i]} has created no apps, deploy them with account_pool.py --deploy")
+            app_id = next(self._app_cycles[i])
+        return self.addresses[i], self.private_keys[i], app_id
+
+    def fund(self, client: algod.AlgodClient, funder_private_key: str, amount: int, max_workers: int = 8):
+        """Pay `amount` microAlgos to every account, 16 payments per atomic group."""
+        funder = account.address_from_private_key(funder_private_key)
+        sp = client.suggested_params()
+        groups = []
+        for receivers in _chunks(self.addresses, MAX_GROUP_SIZE):
+            txns = [transaction.PaymentTxn(funder, sp, receiver, amount) for receiver in receivers]
+            transaction.assign_group_id(txns)
+            groups.append([txn.sign(funder_private_key) for txn in txns])
+        return _submit_groups(client, groups, max_workers)
+
+    def deploy(self, client: algod.AlgodClient, app: CompiledApp, count: int, max_workers: int = 8):
+        """Have every account create `count` instances of `app`, adding them to its app IDs."""
+        for i, pk in enumerate(self.private_keys):
+            self.app_ids[i].extend(deploy_apps(client, pk, app, count, max_workers))
+            self._app_cycles[i] = itertools.cycle(self.app_ids[i])
+
+
+def _submit_groups(client, groups, max_workers):
+    def submit_and_confirm(group):
+        txid = client.send_transactions(group)
+        return transaction.wait_for_confirmation(client, txid, 4)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(submit_and_confirm, groups))
+    print(f"Confirmed {len(groups)} groups ({sum(len(g) for g in groups)} transactions)")
+    return results
+
+
+def load_pool(path: str | None) -> AccountPool | None:
+    """
+    Load the pool at `path` for racing, or return None when no pool is
+    configured. Every account needs apps of its own (see --deploy).
+    """
+    if not path:
+        return None
+    pool = AccountPool.load(path)
+    missing = [address for address, app_ids in zip(pool.addresses, pool.app_ids) if not app_ids]
+    if missing:
+        raise ValueError(f"{len(missing)} accounts in {path} have created no apps, run account_pool.py --deploy")
+    print(f"Loaded account pool with {len(pool)} accounts and {sum(map(len, pool.app_ids))} apps from {path}")
+    return pool
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create and fund a pool of sender accounts with apps of their own.")
+    parser.add_argument("--pool-file", default=DEFAULT_POOL_FILE, help="Where the pool is stored.")
+    parser.add_argument("--count", type=int, default=16, help="Number of accounts to create.")
+    parser.add_argument("--seed", type=str, help="Derive the accounts from this seed instead of generating them.")
+    parser.add_argument("--fund-amount", type=int, default=0, help="microAlgos to send to every account.")
+    parser.add_argument("--deploy", type=str, metavar="PACKAGE",
+                        help="Have every account create apps of this playground package (e.g. last_executed).")
+    parser.add_argument("--apps-per-account", type=int, default=1, help="Apps each account creates with --deploy.")
+    parser.add_argument("--funder-mnemonic", type=str, default=DEFAULT_FUNDER_MNEMONIC)
+    parser.add_argument("--node-address", type=str, default="http://10.1.1.1:4100")
+    parser.add_argument("--node-token", type=str, default="97361fdc801fe9fd7f2ae87fa4ea5dc8b9b6ce7380c230eaf5494c4cb5d38d61")
+    parser.add_argument("--workers", type=int, default=8, help="Groups submitted concurrently.")
+    args = parser.parse_args()
+
+    if os.path.exists(args.pool_file):
+        pool = AccountPool.load(args.pool_file)
+        print(f"Using existing pool of {len(pool)} accounts in {args.pool_file}")
+    else:
+        pool = AccountPool.derive(args.seed, args.count) if args.seed else AccountPool.generate(args.count)
+        pool.save(args.pool_file)
+        print(f"Saved {len(pool)} accounts to {args.pool_file}")
+
+    client = algod.AlgodClient(args.node_token, args.node_address)
+    if args.fund_amount:
+        pool.fund(client, mnemonic.to_private_key(args.funder_mnemonic), args.fund_amount, args.workers)
+    if args.deploy:
+        pool.deploy(client, CompiledApp.load(client, args.deploy), args.apps_per_account, args.workers)
+        pool.save(args.pool_file)
+        print(f"Saved the app IDs of {len(pool)} accounts to {args.pool_file}")
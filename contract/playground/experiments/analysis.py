@@ -0,0 +1,82 @@
+"""
+Shared aggregations over the experiment_data*.csv result files.
+
+Rows carry the race outcome in `Function` (0 = increment won, 1 = decrement
+won) and, for the proposer experiments, the block proposer address in
+`Proposer 1`. Proposer addresses are given readable labels from a named set in
+proposers.json. The race drivers (generate_inc_dec_tx and
+generate_high_inc_higher_dec_tx) also write the race conditions: `Fee Ratio`
+(decrement fee / increment fee), `Node Pair` (the two node URLs) and
+`Submission Skew` (milliseconds from the increment's node accepting it to the
+decrement's, negative when the decrement was first).
+"""
+import json
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+PROPOSERS_FILE = pathlib.Path(__file__).resolve().parent / "proposers.json"
+FUNCTION_COLUMN = "Function"
+PROPOSER_COLUMN = "Proposer 1"
+FEE_RATIO_COLUMN = "Fee Ratio"
+NODE_PAIR_COLUMN = "Node Pair"
+SKEW_COLUMN = "Submission Skew"
+INCREMENT, DECREMENT = 0, 1
+
+
+def load_proposer_labels(name: str, path=PROPOSERS_FILE) -> dict:
+    """Return the address -> label map called `name` from the proposers config."""
+    with open(path) as f:
+        return json.load(f)[name]
+
+
+def label_proposers(data: pd.DataFrame, labels: dict, default_label: str | None = None,
+                    column: str = PROPOSER_COLUMN) -> pd.Series:
+    """Map the proposer column to labels; unknown addresses get `default_label` (or NaN)."""
+    labelled = data[column].map(labels)
+    if default_label is not None:
+        labelled = labelled.fillna(default_label)
+    return labelled
+
+
+def win_counts(data: pd.DataFrame, labels: dict | None = None, default_label: str | None = None,
+               by=(), column: str = PROPOSER_COLUMN) -> pd.DataFrame:
+    """
+    Count increment/decrement wins per proposer label (plus any extra `by`
+    columns such as a run id) in one groupby. Rows whose proposer has no label
+    and no `default_label` are left out.
+
+    Returns one row per group with increment, decrement, total,
+    increment_percentage and decrement_percentage columns.
+    """
+    proposer = label_proposers(data, labels, default_label, column) if labels else data[column]
+    keys = [data[key] for key in by] + [proposer.rename("proposer")]
+    counts = (
+        data[FUNCTION_COLUMN]
+        .eq(INCREMENT)
+        .groupby(keys, sort=False)
+        .agg(["sum", "size"])
+        .rename(columns={"sum": "increment", "size": "total"})
+    )
+
+    if labels and not by:
+        # Keep the config order and report configured proposers without rows as zero
+        order = list(dict.fromkeys(labels.values()))
+        if default_label is not None and default_label not in order:
+            order.append(default_label)
+        counts = counts.reindex(order, fill_value=0)
+
+    counts["increment"] = counts["increment"].astype(np.int64)
+    counts["decrement"] = counts["total"] - counts["increment"]
+    counts["increment_percentage"] = counts["increment"] / counts["total"] * 100
+    counts["decrement_percentage"] = counts["decrement"] / counts["total"] * 100
+    return counts[["increment", "decrement", "total", "increment_percentage", "decrement_percentage"]]
+
+
+def print_win_counts(counts: pd.DataFrame):
+    for group, row in counts.iterrows():
+        print(f"For {group}:")
+        print(f"Increment function was called {int(row['increment'])} times ({row['increment_percentage']:.2f}%).")
+        print(f"Decrement function was called {int(row['decrement'])} times ({row['decrement_percentage']:.2f}%).")
+        print("----------")
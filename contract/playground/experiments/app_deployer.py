@@ -0,0 +1,219 @@
+"""
+Deploy many instances of a playground contract at once.
+
+`ApplicationClient.create()` compiles the TEAL against algod and waits for
+one create transaction per app. This deployer compiles the approval and
+clear programs once, caches the bytecode in `playground/.bytecode_cache.json`
+(keyed by the node's genesis hash and build and the TEAL's sha256, so a
+rebuilt contract or another network or algod version compiles again), signs
+all create transactions up front and submits them in atomic groups of up to
+16, several groups concurrently. The created app IDs are written to a
+manifest that the experiment drivers load with `--app-manifest`.
+
+The apps are created by the deploying account, and the LastExecuted/Counter
+methods are `Authorize.only_creator()`, so race against them with the same
+account.
+"""
+import argparse
+import base64
+import hashlib
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from algosdk import account, mnemonic, transaction
+from algosdk.v2client import algod
+
+PLAYGROUND_DIR = Path(__file__).resolve().parent.parent
+BYTECODE_CACHE_FILE = PLAYGROUND_DIR / ".bytecode_cache.json"
+DEFAULT_MANIFEST_FILE = "app_manifest.json"
+DEFAULT_MNEMONIC = "kitchen subway tomato hire inspire pepper camera frog about kangaroo bunker express length song act oven world quality around elegant lion chimney enough ability prepare"
+MAX_GROUP_SIZE = 16
+PAGE_SIZE = 2048
+
+_cache_lock = threading.Lock()
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _load_bytecode_cache() -> dict:
+    try:
+        return json.loads(BYTECODE_CACHE_FILE.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _node_id(client: algod.AlgodClient) -> str:
+    """Genesis hash and algod build of the node, which decide the bytecode a source compiles to."""
+    versions = client.versions()
+    build = versions.get("build", {})
+    return "{}/{}.{}.{}-{}".format(
+        versions.get("genesis_hash_b64"), build.get("major"), build.get("minor"), build.get("build_number"),
+        build.get("commit_hash"),
+    )
+
+
+def compile_program(client: algod.AlgodClient, source: str) -> bytes:
+    """Compile TEAL `source` with algod, or return the cached bytecode of an identical source on the same node build."""
+    key = hashlib.sha256(f"{_node_id(client)}\n{source}".encode()).hexdigest()
+    with _cache_lock:
+        cached = _load_bytecode_cache().get(key)
+    if cached is not None:
+        return base64.b64decode(cached)
+
+    result = client.compile(source)["result"]
+    with _cache_lock:
+        cache = _load_bytecode_cache()
+        cache[key] = result
+        BYTECODE_CACHE_FILE.write_text(json.dumps(cache, indent=2, sort_keys=True))
+    return base64.b64decode(result)
+
+
+class CompiledApp:
+    """Bytecode and state schema of a built playground package."""
+
+    def __init__(self, name: str, approval: bytes, clear: bytes, global_schema: transaction.StateSchema,
+                 local_schema: transaction.StateSchema):
+        self.name = name
+        self.approval = approval
+        self.clear = clear
+        self.global_schema = global_schema
+        self.local_schema = local_schema
+
+    @property
+    def extra_pages(self) -> int:
+        return max(0, math.ceil((len(self.approval) + len(self.clear)) / PAGE_SIZE) - 1)
+
+    @classmethod
+    def load(cls, client: algod.AlgodClient, package: str) -> "CompiledApp":
+        artifacts = PLAYGROUND_DIR / package / "artifacts"
+        if not (artifacts / "approval.teal").exists():
+            raise FileNotFoundError(f"No artifacts in {artifacts}, run build_all.py {package} first")
+        state = json.loads((artifacts / "application.json").read_text())["state"]
+        return cls(
+            package,
+            compile_program(client, (artifacts / "approval.teal").read_text()),
+            compile_program(client, (artifacts / "clear.teal").read_text()),
+            transaction.StateSchema(state["global"]["num_uints"], state["global"]["num_byte_slices"]),
+            transaction.StateSchema(state["local"]["num_uints"], state["local"]["num_byte_slices"]),
+        )
+
+    def create_txn(self, sender: str, sp: transaction.SuggestedParams, note: bytes) -> transaction.ApplicationCreateTxn:
+        # A create call without app args runs the bare create handler, which
+        # initializes the global state like ApplicationClient.create() does
+        return transaction.ApplicationCreateTxn(
+            sender,
+            sp,
+            transaction.OnComplete.NoOpOC,
+            self.approval,
+            self.clear,
+            self.global_schema,
+            self.local_schema,
+            extra_pages=self.extra_pages,
+            note=note,
+        )
+
+
+def deploy_apps(client: algod.AlgodClient, private_key: str, app: CompiledApp, count: int,
+                max_workers: int = 8) -> list[int]:
+    """Create `count` instances of `app`, returning their IDs in creation order."""
+    sender = account.address_from_private_key(private_key)
+    sp = client.suggested_params()
+    # The note keeps otherwise identical create transactions distinct
+    stamp = time.time_ns()
+    txns = [app.create_txn(sender, sp, f"deploy/{app.name}/{stamp}/{i}".encode()) for i in range(count)]
+    groups = []
+    for chunk in _chunks(txns, MAX_GROUP_SIZE):
+        transaction.assign_group_id(chunk)
+        groups.append([txn.sign(private_key) for txn in chunk])
+
+    def submit_and_collect(group):
+        client.send_transactions(group)
+        transaction.wait_for_confirmation(client, group[0].get_txid(), 4)
+        # Grouped transactions confirm in the same round
+        return [client.pending_transaction_info(stxn.get_txid())["application-index"] for stxn in group]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        app_ids = list(itertools.chain.from_iterable(executor.map(submit_and_collect, groups)))
+    print(f"Created {len(app_ids)} {app.name} apps in {len(groups)} groups")
+    return app_ids
+
+
+def write_manifest(path: str, app: CompiledApp, creator: str, app_ids: list[int], append: bool = False):
+    """Write the app IDs to the manifest at `path`, after the existing ones of the same package if `append`."""
+    manifest = load_manifest(path) if append and os.path.exists(path) else {}
+    if manifest and (manifest["package"] != app.name or manifest["creator"] != creator):
+        raise ValueError(f"{path} holds {manifest['package']} apps of {manifest['creator']}")
+    manifest = {
+        "package": app.name,
+        "creator": creator,
+        "approval_sha256": hashlib.sha256(app.approval).hexdigest(),
+        "app_ids": manifest.get("app_ids", []) + app_ids,
+    }
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=4)
+
+
+def load_manifest(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+class AppPool:
+    """App IDs of a manifest, handed out round-robin like AccountPool senders."""
+
+    def __init__(self, app_ids: list[int]):
+        if not app_ids:
+            raise ValueError("An app pool needs at least one app")
+        self.app_ids = list(app_ids)
+        self._cycle = itertools.cycle(self.app_ids)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.app_ids)
+
+    def next(self) -> int:
+        with self._lock:
+            return next(self._cycle)
+
+
+def load_app_pool(path: str | None) -> AppPool | None:
+    """Load the manifest at `path`, or return None when no manifest is configured."""
+    if not path:
+        return None
+    manifest = load_manifest(path)
+    pool = AppPool(manifest["app_ids"])
+    print(f"Loaded {len(pool)} {manifest['package']} apps from {path}")
+    return pool
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create many instances of a playground contract in parallel.")
+    parser.add_argument("package", nargs="?", default="last_executed", help="Playground package to deploy.")
+    parser.add_argument("--count", type=int, default=16, help="Number of app instances to create.")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_FILE, help="Where the app IDs are stored.")
+    parser.add_argument("--append", action="store_true", help="Add the new apps to an existing manifest.")
+    parser.add_argument("--mnemonic", type=str, default=DEFAULT_MNEMONIC)
+    parser.add_argument("--node-address", type=str, default="http://10.1.1.1:4100")
+    parser.add_argument("--node-token", type=str, default="97361fdc801fe9fd7f2ae87fa4ea5dc8b9b6ce7380c230eaf5494c4cb5d38d61")
+    parser.add_argument("--workers", type=int, default=8, help="Groups submitted concurrently.")
+    args = parser.parse_args()
+
+    client = algod.AlgodClient(args.node_token, args.node_address)
+    private_key = mnemonic.to_private_key(args.mnemonic)
+    start = time.perf_counter()
+    compiled = CompiledApp.load(client, args.package)
+    app_ids = deploy_apps(client, private_key, compiled, args.count, args.workers)
+    write_manifest(args.manifest, compiled, account.address_from_private_key(private_key), app_ids, args.append)
+    print(f"Wrote {args.manifest} in {time.perf_counter() - start:.1f}s")
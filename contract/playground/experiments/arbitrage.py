@@ -0,0 +1,264 @@
+"""
+Arbitrage cycle search over the pools of a PoolTracker.
+
+Every tracked Tinyman V2 pool adds two edges to a graph of assets, weighted
+-log(marginal price after fee). A cycle of trades that ends with more of the
+start asset than it began with is a negative cycle, found with Bellman-Ford.
+Each cycle is then sized with the exact constant-product math of
+quote_engine.py: the first pool lends its output asset in a flash swap, the
+loan is swapped along the rest of the cycle and the flash swap is repaid
+from the proceeds, so no capital is needed. Profitable cycles come out as
+flash swap group templates that `build_group` turns into unsigned
+transactions.
+
+Only the edges of the pools a block touched are recomputed, and only cycles
+through those pools are sized again; other cycles keep their last template.
+
+    python arbitrage.py --pool <address> --pool <address> ... --network testnet
+"""
+import argparse
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from algosdk import transaction
+from algosdk.v2client import algod
+
+from playground.experiments.pool_tracker import FEE_SHARE_DENOMINATOR, VALIDATOR_APP_IDS, PoolTracker
+from playground.experiments.quote_engine import candidate_sizes, fixed_input_swap, flash_swap_asset_2_payment
+
+DEFAULT_MAX_CYCLE_LENGTH = 4
+DEFAULT_SIZES = 2_000
+MIN_FEE = 1000
+
+
+class ArbitrageSearch:
+    def __init__(self, tracker: PoolTracker, max_cycle_length: int = DEFAULT_MAX_CYCLE_LENGTH,
+                 sizes: int = DEFAULT_SIZES, min_profit: int = 1):
+        self.tracker = tracker
+        self.max_cycle_length = max_cycle_length
+        self.sizes = sizes
+        self.min_profit = min_profit
+        # pool address -> [(asset in, asset out, weight)]
+        self.edges = {}
+        # cycle (tuple of legs) -> last template, or None if not profitable
+        self.templates = {}
+        self.refresh()
+
+    def refresh(self, addresses=None):
+        """Recompute the edges of `addresses` (every tracked pool if None)."""
+        for address in self.tracker.pools if addresses is None else addresses:
+            pool = self.tracker.pools[address]
+            kept = 1 - pool.total_fee_share / FEE_SHARE_DENOMINATOR
+            edges = []
+            for asset_in, asset_out in ((pool.asset_1_id, pool.asset_2_id), (pool.asset_2_id, pool.asset_1_id)):
+                price = pool.spot_price(asset_in) * kept
+                if price > 0:
+                    edges.append((asset_in, asset_out, -math.log(price)))
+            self.edges[address] = edges
+
+    def find_cycles(self) -> list[tuple]:
+        """
+        Negative cycles as tuples of (pool address, asset in, asset out)
+        legs, each pool used at most once. Bellman-Ford from a virtual
+        source connected to every asset.
+        """
+        edges = [(address, a, b, w) for address, pool_edges in self.edges.items() for a, b, w in pool_edges]
+        assets = {a for _, a, _, _ in edges} | {b for _, _, b, _ in edges}
+        distance = dict.fromkeys(assets, 0.0)
+        predecessor = {}
+        for _ in range(len(assets)):
+            changed = False
+            for address, a, b, w in edges:
+                if distance[a] + w < distance[b] - 1e-12:
+                    distance[b] = distance[a] + w
+                    predecessor[b] = (address, a, b)
+                    changed = True
+            if not changed:
+                return []
+
+        cycles = set()
+        for address, a, b, w in edges:
+            if distance[a] + w >= distance[b] - 1e-12:
+                continue
+            # Walk back far enough to be inside the cycle, then collect it
+            asset = b
+            for _ in range(len(assets)):
+                asset = predecessor[asset][1] if asset in predecessor else None
+            if asset is None:
+                continue
+            legs, current = [], asset
+            while current in predecessor:
+                leg = predecessor[current]
+                legs.append(leg)
+                current = leg[1]
+                if current == asset or len(legs) > len(assets):
+                    break
+            legs.reverse()
+            pools = [leg[0] for leg in legs]
+            if current == asset and len(legs) <= self.max_cycle_length and len(set(pools)) == len(pools):
+                cycles.add(_canonical(legs))
+        return sorted(cycles)
+
+    def size_cycle(self, cycle: tuple) -> dict | None:
+        """Most profitable flash swap size for `cycle`, as a group template, or None if nothing is profitable."""
+        pools = self.tracker.pools
+        first_address, start_asset, loan_asset = cycle[0]
+        first = pools[first_address]
+        loan_reserves = first.asset_1_reserves if loan_asset == first.asset_1_id else first.asset_2_reserves
+        sizes = candidate_sizes(max(loan_reserves - 1, 1), self.sizes)
+
+        # Repaying asset 2 for an asset 1 loan; the formula is symmetric, so swap the roles otherwise
+        if loan_asset == first.asset_1_id:
+            reserves = (first.asset_1_reserves, first.asset_2_reserves)
+        else:
+            reserves = (first.asset_2_reserves, first.asset_1_reserves)
+        payment = flash_swap_asset_2_payment(*reserves, first.total_fee_share, first.protocol_fee_ratio, sizes, 0, 0)
+
+        amounts = [sizes]
+        for address, asset_in, _ in cycle[1:]:
+            pool = pools[address]
+            input_reserves, output_reserves = pool.reserves(asset_in)
+            amounts.append(fixed_input_swap(input_reserves, output_reserves, amounts[-1], pool.total_fee_share)[0])
+        profits = amounts[-1] - payment
+        best = int(np.argmax(profits))
+        if profits[best] < self.min_profit:
+            return None
+
+        loan, repay = int(sizes[best]), int(payment[best])
+        asset_1_loan, asset_2_loan = (loan, 0) if loan_asset == first.asset_1_id else (0, loan)
+        return {
+            "round": self.tracker.round,
+            "asset_id": start_asset,
+            "profit": int(profits[best]),
+            "flash_swap": {
+                "pool": first_address,
+                "asset_1_id": first.asset_1_id,
+                "asset_2_id": first.asset_2_id,
+                "asset_1_loan_amount": asset_1_loan,
+                "asset_2_loan_amount": asset_2_loan,
+                "payment_asset_id": start_asset,
+                "payment_amount": repay,
+            },
+            "swaps": [
+                {
+                    "pool": address,
+                    "asset_1_id": pools[address].asset_1_id,
+                    "asset_2_id": pools[address].asset_2_id,
+                    "asset_in_id": asset_in,
+                    "amount_in": int(amount_in[best]),
+                    "asset_out_id": asset_out,
+                    "min_amount_out": int(amount_out[best]),
+                }
+                for (address, asset_in, asset_out), amount_in, amount_out in zip(cycle[1:], amounts, amounts[1:])
+            ],
+        }
+
+    def on_block(self, touched: set[str]) -> list[dict]:
+        """Update for the pools a block changed and return the templates of all profitable cycles."""
+        if touched:
+            self.refresh(touched)
+        current = set(self.find_cycles())
+        for cycle in list(self.templates):
+            if cycle not in current:
+                del self.templates[cycle]
+        for cycle in current:
+            if cycle not in self.templates or any(leg[0] in touched for leg in cycle):
+                self.templates[cycle] = self.size_cycle(cycle)
+        return sorted((t for t in self.templates.values() if t), key=lambda t: -t["profit"])
+
+
+def _canonical(legs: list) -> tuple:
+    """Rotate a cycle so equal cycles found from different edges compare equal."""
+    start = min(range(len(legs)), key=lambda i: legs[i])
+    return tuple(legs[start:] + legs[:start])
+
+
+def _with_fee(sp: transaction.SuggestedParams, fee: int) -> transaction.SuggestedParams:
+    params = transaction.SuggestedParams(sp.fee, sp.first, sp.last, sp.gh, sp.gen, flat_fee=True,
+                                         min_fee=sp.min_fee)
+    params.fee = fee
+    return params
+
+
+def transfer(sender: str, sp: transaction.SuggestedParams, receiver: str, asset_id: int, amount: int,
+             fee: int = MIN_FEE) -> transaction.Transaction:
+    """Payment (asset 0) or asset transfer of `amount` at a flat `fee`."""
+    if asset_id == 0:
+        return transaction.PaymentTxn(sender, _with_fee(sp, fee), receiver, amount)
+    return transaction.AssetTransferTxn(sender, _with_fee(sp, fee), receiver, amount, asset_id)
+
+
+def flash_swap_group(sender: str, sp: transaction.SuggestedParams, validator_app_id: int, pool: str,
+                     asset_1_id: int, asset_2_id: int, asset_1_loan_amount: int, asset_2_loan_amount: int,
+                     transactions: list[transaction.Transaction]) -> list[transaction.Transaction]:
+    """
+    `transactions` between the pool's flash_swap and verify_flash_swap calls,
+    grouped, as tinyman.v2.flash_swap.prepare_flash_swap_transactions lays
+    them out. The flash_swap fee covers the inner transfer of each loan.
+    """
+    index_diff = len(transactions) + 1
+    loans = int(asset_1_loan_amount > 0) + int(asset_2_loan_amount > 0)
+    txns = [
+        transaction.ApplicationNoOpTxn(
+            sender, _with_fee(sp, (1 + loans) * MIN_FEE), validator_app_id,
+            app_args=[b"flash_swap", index_diff, asset_1_loan_amount, asset_2_loan_amount],
+            accounts=[pool], foreign_assets=[asset_1_id, asset_2_id],
+        ),
+        *transactions,
+        transaction.ApplicationNoOpTxn(
+            sender, _with_fee(sp, MIN_FEE), validator_app_id,
+            app_args=[b"verify_flash_swap", index_diff],
+            accounts=[pool], foreign_assets=[asset_1_id, asset_2_id],
+        ),
+    ]
+    transaction.assign_group_id(txns)
+    return txns
+
+
+def build_group(template: dict, sender: str, sp: transaction.SuggestedParams,
+                validator_app_id: int) -> list[transaction.Transaction]:
+    """
+    Unsigned, grouped transactions of a template: the flash swap call, a
+    transfer and fixed-input swap call per leg, the repayment and the
+    verify_flash_swap call. App call fees cover their inner transactions.
+    """
+    flash = template["flash_swap"]
+    middle = []
+    for swap in template["swaps"]:
+        middle.append(transfer(sender, sp, swap["pool"], swap["asset_in_id"], swap["amount_in"]))
+        middle.append(transaction.ApplicationNoOpTxn(
+            sender, _with_fee(sp, 2 * MIN_FEE), validator_app_id,
+            app_args=[b"swap", b"fixed-input", swap["min_amount_out"]],
+            accounts=[swap["pool"]], foreign_assets=[swap["asset_1_id"], swap["asset_2_id"]],
+        ))
+    middle.append(transfer(sender, sp, flash["pool"], flash["payment_asset_id"], flash["payment_amount"]))
+    return flash_swap_group(
+        sender, sp, validator_app_id, flash["pool"], flash["asset_1_id"], flash["asset_2_id"],
+        flash["asset_1_loan_amount"], flash["asset_2_loan_amount"], middle,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search arbitrage cycles across tracked Tinyman V2 pools.")
+    parser.add_argument("--pool", action="append", required=True, help="Pool address, may be repeated.")
+    parser.add_argument("--network", choices=VALIDATOR_APP_IDS, default="testnet")
+    parser.add_argument("--max-cycle-length", type=int, default=DEFAULT_MAX_CYCLE_LENGTH)
+    parser.add_argument("--sizes", type=int, default=DEFAULT_SIZES, help="Candidate loan sizes per cycle.")
+    parser.add_argument("--rounds", type=int, help="Stop after this many rounds.")
+    parser.add_argument("--node-address", type=str, default="http://131.159.14.109:8081")
+    parser.add_argument("--node-token", type=str, default=os.getenv("TOKEN_TUM_TESTNET", ""))
+    args = parser.parse_args()
+
+    tracker = PoolTracker(algod.AlgodClient(args.node_token, args.node_address), VALIDATOR_APP_IDS[args.network])
+    for address in args.pool:
+        tracker.add_pool(address)
+    search = ArbitrageSearch(tracker, args.max_cycle_length, args.sizes)
+    for template in search.on_block(set(tracker.pools)):
+        print(template)
+    for round_number, touched in tracker.follow(args.rounds):
+        for template in search.on_block(touched):
+            print(f"Round {round_number}: profit {template['profit']} of asset {template['asset_id']}: {template}")
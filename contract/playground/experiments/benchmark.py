@@ -0,0 +1,212 @@
+"""
+Throughput benchmark for the experiment harness.
+
+Runs the increment/decrement race of `generate_inc_dec_tx.generate_data`,
+`get_fees.process_transactions` and the congestion scanner against local mock
+nodes (see `mock_algod.py`) with fixed latency, so the numbers only reflect the
+harness itself. Results are compared with `benchmark_baseline.json` and the
+script exits with status 1 if any metric regressed by more than `--threshold`.
+
+    python benchmark.py                    # compare against the baseline
+    python benchmark.py --update-baseline  # store the current numbers
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import pathlib
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from algosdk import abi, account, mnemonic
+from algosdk.v2client import indexer
+
+import get_fees
+from playground.experiments import generate_inc_dec_tx, historical_congenstion
+from playground.experiments.mock_algod import method_names_from_contract, start_mock_network
+
+BASELINE_FILE = pathlib.Path(__file__).resolve().parent / "benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.25
+
+# Whether a larger value of the metric is better.
+HIGHER_IS_BETTER = {
+    "iterations_per_second": True,
+    "decide_to_submit_ms": False,
+    "rounds_scanned_per_second": True,
+    "blocks_per_second": True,
+}
+
+DEFAULT_MNEMONIC = "kitchen subway tomato hire inspire pepper camera frog about kangaroo bunker express length song act oven world quality around elegant lion chimney enough ability prepare"
+
+
+@contextlib.contextmanager
+def _quiet_in_tempdir():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield pathlib.Path(tmp)
+        finally:
+            os.chdir(cwd)
+
+
+def bench_race(iterations, latency, block_time):
+    contract_json_path = pathlib.Path(__file__).resolve().parent.parent / "last_executed" / "artifacts" / "contract.json"
+    contract = abi.Contract.from_json(contract_json_path.read_text())
+    ledger, nodes = start_mock_network(
+        [latency, latency],
+        block_time=block_time,
+        method_names=method_names_from_contract(contract),
+    )
+    app_id = 1002
+    ledger.create_app(app_id, account.address_from_private_key(mnemonic.to_private_key(DEFAULT_MNEMONIC)))
+
+    try:
+        with _quiet_in_tempdir():
+            start = time.perf_counter()
+            generate_inc_dec_tx.generate_data(
+                non_part_1_url=nodes[0].url,
+                non_part_2_url=nodes[1].url,
+                app_id_arg=app_id,
+                iterations=iterations,
+            )
+            elapsed = time.perf_counter() - start
+    finally:
+        for node in nodes:
+            node.stop()
+
+    # The last app read before building the transactions is the decision point
+    # (the initial read and each batch's call log read, see call_log.RaceResolver);
+    # measure how long it takes from there until the next group is submitted.
+    overheads = []
+    last_decision = None
+    for timestamp, _, method, path in ledger.requests:
+        if method == "GET" and path.startswith("/v2/applications/"):
+            last_decision = timestamp
+        elif method == "POST" and last_decision is not None:
+            overheads.append(timestamp - last_decision)
+            last_decision = None
+
+    return {
+        "iterations_per_second": iterations / elapsed,
+        "decide_to_submit_ms": statistics.median(overheads) * 1000,
+    }
+
+
+def bench_get_fees(rounds, txns_per_block, notes, latency):
+    note_values = [f"inc_{i}" for i in range(notes)]
+    ledger, nodes = start_mock_network([latency], block_time=60.0)
+    ledger.seed_blocks(rounds, txns_per_block, notes=note_values)
+    client = generate_inc_dec_tx.create_algod_client_from_url(nodes[0].url)
+
+    try:
+        with _quiet_in_tempdir() as tmp:
+            with open(tmp / "transaction_log.csv", "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["txid", "note", "type", "status", "round"])
+                for i, note in enumerate(note_values):
+                    writer.writerow([f"TX{i}", note, "increment", "Confirmed", 0])
+            start = time.perf_counter()
+            get_fees.process_transactions(
+                str(tmp / "transaction_log.csv"),
+                str(tmp / "transaction_log_with_fees.csv"),
+                client,
+                rounds,
+            )
+            elapsed = time.perf_counter() - start
+    finally:
+        for node in nodes:
+            node.stop()
+
+    return {"rounds_scanned_per_second": rounds / elapsed}
+
+
+def bench_congestion(rounds, txns_per_block, latency, workers):
+    ledger, nodes = start_mock_network([latency], block_time=60.0, with_indexer=True)
+    ledger.seed_blocks(rounds, txns_per_block)
+    indexer_client = indexer.IndexerClient("", nodes[-1].url)
+    last_round = ledger.current_round()
+
+    try:
+        with _quiet_in_tempdir():
+            start = time.perf_counter()
+            historical_congenstion.scan_congestion(
+                indexer_client, last_round - rounds + 1, last_round, max_workers=workers
+            )
+            elapsed = time.perf_counter() - start
+    finally:
+        for node in nodes:
+            node.stop()
+
+    return {"blocks_per_second": rounds / elapsed}
+
+
+def run_benchmarks(args) -> dict:
+    results = {}
+    print("Running race benchmark...")
+    results["race"] = bench_race(args.race_iterations, args.latency, args.block_time)
+    print("Running get_fees benchmark...")
+    results["get_fees"] = bench_get_fees(args.fee_rounds, args.txns_per_block, args.fee_notes, args.latency)
+    print("Running congestion scanner benchmark...")
+    results["congestion"] = bench_congestion(args.scan_rounds, args.txns_per_block, args.latency, args.scan_workers)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for bench, metrics in baseline.items():
+        for name, expected in metrics.items():
+            actual = results.get(bench, {}).get(name)
+            if actual is None:
+                continue
+            if HIGHER_IS_BETTER[name]:
+                change = (expected - actual) / expected
+            else:
+                change = (actual - expected) / expected
+            status = "REGRESSION" if change > threshold else "ok"
+            print(f"{bench:>10} {name:<26} baseline {expected:10.3f}  now {actual:10.3f}  {status}")
+            if change > threshold:
+                regressions.append(f"{bench}.{name}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the experiment harness against local mock nodes.")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed relative regression before failing. Defaults to {DEFAULT_THRESHOLD}.")
+    parser.add_argument("--latency", type=float, default=0.002, help="Per-request latency of the mock nodes in seconds.")
+    parser.add_argument("--block-time", type=float, default=0.05, help="Round duration of the mock network in seconds.")
+    parser.add_argument("--race-iterations", type=int, default=40)
+    parser.add_argument("--fee-rounds", type=int, default=300)
+    parser.add_argument("--fee-notes", type=int, default=50)
+    parser.add_argument("--scan-rounds", type=int, default=200)
+    parser.add_argument("--scan-workers", type=int, default=1)
+    parser.add_argument("--txns-per-block", type=int, default=20)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args)
+    print(json.dumps(results, indent=4))
+
+    if args.update_baseline:
+        BASELINE_FILE.write_text(json.dumps(results, indent=4) + "\n")
+        print(f"Baseline written to {BASELINE_FILE}")
+        sys.exit(0)
+
+    if not BASELINE_FILE.exists():
+        print(f"No baseline at {BASELINE_FILE}, run with --update-baseline first.")
+        sys.exit(1)
+
+    regressions = compare(results, json.loads(BASELINE_FILE.read_text()), args.threshold)
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("No regressions.")
@@ -0,0 +1,136 @@
+"""
+Helpers for raw (msgpack) blocks from algod.
+
+The msgpack form of `/v2/blocks/{round}` is smaller and faster to decode than
+the JSON one and still carries the apply data of every transaction: state
+deltas (`dt`), inner transactions (`dt.itx`) and closing amounts. Keys are
+left as bytes (b"txns", b"apid", ...) as they are in the block.
+"""
+import random
+import threading
+import time
+
+import msgpack
+import numpy as np
+from algosdk import encoding
+
+# EvalDelta actions
+SET_BYTES, SET_UINT, DELETE = 1, 2, 3
+MAX_RETRIES = 5
+# Fields of a SignedTxnInBlock that belong to the signed transaction, not its apply data
+SIGNED_TXN_KEYS = (b"lsig", b"msig", b"sgnr", b"sig", b"txn")
+
+
+def fetch_raw_block(client, round_number: int) -> dict:
+    """Return round `round_number` msgpack decoded with byte keys: the `block` and its `cert`."""
+    response = client.block_info(round_number, response_format="msgpack")
+    return msgpack.unpackb(response, raw=True, strict_map_key=False)
+
+
+def fetch_block(client, round_number: int) -> dict:
+    """Return the `block` part of round `round_number`, msgpack decoded with byte keys."""
+    return fetch_raw_block(client, round_number)[b"block"]
+
+
+def block_proposer(raw_block: dict) -> str | None:
+    """Proposer address from the certificate, or from the header on protocols that record it there."""
+    proposer = raw_block.get(b"cert", {}).get(b"prop", {}).get(b"oprop") or raw_block[b"block"].get(b"prp")
+    return encoding.encode_address(proposer) if proposer else None
+
+
+class RateLimiter:
+    """Token bucket shared by the fetching threads: at most `rate` requests per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def fetch_with_retry(client, round_number: int, limiter: RateLimiter, fetch=fetch_block) -> dict:
+    """`fetch` round `round_number` behind `limiter`, retrying failures with exponential backoff."""
+    for attempt in range(MAX_RETRIES):
+        limiter.acquire()
+        try:
+            return fetch(client, round_number)
+        except Exception as e:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            delay = 2 ** attempt * 0.5 + random.uniform(0, 0.5)
+            print(f"Block {round_number} failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def iter_transactions(block: dict):
+    """Yield every signed transaction with apply data of `block` in execution order, inner ones after their parent."""
+    stack = list(reversed(block.get(b"txns", [])))
+    while stack:
+        stxn = stack.pop()
+        yield stxn
+        stack.extend(reversed(stxn.get(b"dt", {}).get(b"itx", [])))
+
+
+def signed_transaction(stxn: dict) -> dict:
+    """The signed transaction of a block payset entry, without its apply data."""
+    return {key: stxn[key] for key in SIGNED_TXN_KEYS if key in stxn}
+
+
+def signed_size(stxn: dict) -> int:
+    """Encoded size of a payset entry's signed transaction (byte keys, see fetch_raw_block), the fee_per_byte size."""
+    return len(msgpack.packb(signed_transaction(stxn), use_bin_type=True))
+
+
+def fee_per_byte(stxns: list) -> np.ndarray:
+    """
+    Fee per byte of each unit of a payset in order, a unit being an atomic
+    group or a single transaction: total fee over total signed size, as the
+    transaction pool prioritises them. Apply data (logs, inner transactions,
+    state deltas) is not part of that size.
+    """
+    if not stxns:
+        return np.empty(0)
+    fees = np.fromiter((stxn[b"txn"].get(b"fee", 0) for stxn in stxns), dtype=np.float64, count=len(stxns))
+    sizes = np.fromiter((signed_size(stxn) for stxn in stxns), dtype=np.float64, count=len(stxns))
+    # A new unit starts at every transaction that is not in the same group as the one before it
+    groups = [stxn[b"txn"].get(b"grp") for stxn in stxns]
+    starts = np.fromiter(
+        (group is None or i == 0 or group != groups[i - 1] for i, group in enumerate(groups)),
+        dtype=bool, count=len(groups),
+    )
+    units = np.cumsum(starts) - 1
+    return np.bincount(units, fees) / np.bincount(units, sizes)
+
+
+def delta_value(delta: dict):
+    """The new value of a state delta entry, or None if the key was deleted."""
+    action = delta.get(b"at")
+    if action == SET_UINT:
+        return delta.get(b"ui", 0)
+    if action == SET_BYTES:
+        return delta.get(b"bs", b"")
+    return None
+
+
+def local_deltas(stxn: dict):
+    """
+    Yield (address, key, value) for the local state changes of an app call.
+    Account index 0 is the sender, 1.. the transaction's accounts array and
+    the shared accounts of the apply data after that.
+    """
+    txn = stxn[b"txn"]
+    apply_data = stxn.get(b"dt", {})
+    accounts = [txn[b"snd"]] + txn.get(b"apat", []) + apply_data.get(b"sa", [])
+    for index, changes in apply_data.get(b"ld", {}).items():
+        address = encoding.encode_address(accounts[index])
+        for key, delta in changes.items():
+            yield address, key, delta_value(delta)
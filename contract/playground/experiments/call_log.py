@@ -0,0 +1,128 @@
+"""
+Reader for the LastExecuted call log.
+
+Every increment/decrement call appends a 49 byte entry (method uint8, round
+uint64, sequence uint64, sender address) to a ring buffer of LOG_SLOTS global
+state slots keyed by "call_log" plus one byte (sequence % LOG_SLOTS), the key
+Beaker's ReservedGlobalStateValue generates from the field name; `seq` holds
+the next sequence number. The encoding is the ABI encoding of the
+(uint8,uint64,uint64,address) tuple the contract's get_log method returns.
+
+One application_info read returns the whole buffer, so the outcome of up to
+LOG_SLOTS calls, e.g. LOG_SLOTS / 2 races, is known from a single request
+instead of one global state read per race.
+"""
+import base64
+import struct
+
+from algosdk import encoding
+
+# Keep in sync with last_executed.py
+LOG_SLOTS = 60
+INCREMENT, DECREMENT = 0, 1
+# Key prefix of the call_log reserved global state (Beaker's prefix_key_gen)
+LOG_KEY_PREFIX = b"call_log"
+METHOD_NAMES = {INCREMENT: "increment", DECREMENT: "decrement"}
+
+_ENTRY = struct.Struct(">BQQ32s")
+
+
+def log_key(seq: int) -> bytes:
+    """Global state key of the slot holding the entry with sequence `seq`."""
+    return LOG_KEY_PREFIX + bytes([seq % LOG_SLOTS])
+
+
+def encode_log_entry(method: int, round_number: int, seq: int, sender: str) -> bytes:
+    return _ENTRY.pack(method, round_number, seq, encoding.decode_address(sender))
+
+
+def decode_log_entry(value: bytes) -> dict:
+    method, round_number, seq, sender = _ENTRY.unpack(value)
+    return {
+        "seq": seq,
+        "method": METHOD_NAMES.get(method, method),
+        "round": round_number,
+        "sender": encoding.encode_address(sender),
+    }
+
+
+def decode_call_log(global_state: list, since: int = 0) -> tuple[list[dict], int]:
+    """
+    Decode the call log from an application's `global-state` list. Returns the
+    entries with sequence >= `since` still held in the buffer, oldest first,
+    and the next sequence number.
+    """
+    next_seq = 0
+    slots = {}
+    for item in global_state:
+        key = base64.b64decode(item["key"])
+        if key == b"seq":
+            next_seq = item["value"]["uint"]
+        elif len(key) == len(LOG_KEY_PREFIX) + 1 and key.startswith(LOG_KEY_PREFIX):
+            slots[key[-1]] = base64.b64decode(item["value"]["bytes"])
+
+    entries = []
+    for seq in range(max(since, next_seq - LOG_SLOTS, 0), next_seq):
+        value = slots.get(seq % LOG_SLOTS)
+        if value is not None:
+            entries.append(decode_log_entry(value))
+    return entries, next_seq
+
+
+def read_call_log(client, app_id: int, since: int = 0) -> tuple[list[dict], int]:
+    """Read the call log of `app_id` with one application_info request."""
+    response = client.application_info(app_id)
+    return decode_call_log(response["params"].get("global-state", []), since)
+
+
+def first_calls_by_round(entries: list[dict]) -> dict:
+    """Method that executed first in each round, for races with one call pair per round."""
+    first = {}
+    for entry in entries:
+        first.setdefault(entry["round"], entry["method"])
+    return first
+
+
+class RaceResolver:
+    """
+    Decides increment/decrement races without reading the app after each
+    one. A race whose two calls confirmed in different rounds is decided by
+    the rounds; for calls in the same round the app's call log is read once
+    per batch, so a batch of races costs at most one request per app.
+
+    Races are queued with `add` and decided when `batch_size` are queued or
+    on `flush`. A batch holds at most LOG_SLOTS / 2 races, so the buffer
+    still holds every call of the batch when it is read (each race on an app
+    waits for its calls to confirm before the next one on that app starts).
+    """
+
+    def __init__(self, client, batch_size: int = LOG_SLOTS // 2):
+        if not 0 < batch_size <= LOG_SLOTS // 2:
+            raise ValueError(f"A batch holds 1 to {LOG_SLOTS // 2} races")
+        self.client = client
+        self.batch_size = batch_size
+        self.pending = []
+
+    def add(self, race, app_id: int, increment_round: int | None, decrement_round: int | None) -> list[tuple]:
+        """Queue `race` (any value); returns the decided (race, winner) pairs once the batch is full, else []."""
+        self.pending.append((race, app_id, increment_round, decrement_round))
+        return self.flush() if len(self.pending) >= self.batch_size else []
+
+    def flush(self) -> list[tuple]:
+        """
+        Decide the queued races in order. The winner is "Increment",
+        "Decrement" or None if a call did not confirm.
+        """
+        same_round_apps = {app_id for _, app_id, inc, dec in self.pending if inc is not None and inc == dec}
+        first_calls = {app_id: first_calls_by_round(read_call_log(self.client, app_id)[0]) for app_id in same_round_apps}
+        decided = []
+        for race, app_id, increment_round, decrement_round in self.pending:
+            if increment_round is None or decrement_round is None:
+                winner = None
+            elif increment_round != decrement_round:
+                winner = "Increment" if increment_round < decrement_round else "Decrement"
+            else:
+                winner = first_calls[app_id].get(increment_round, "").capitalize() or None
+            decided.append((race, winner))
+        self.pending = []
+        return decided
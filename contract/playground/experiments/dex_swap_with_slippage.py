@@ -4,6 +4,7 @@
 from playground.experiments.utils import get_mainnet_TUM_algod_client
 from playground.experiments.utils import get_testnet_TUM_algod_client
 from playground.experiments.utils import get_mainnet_algod_client
+from playground.experiments.pool_tracker import PoolTracker
 from tinyman.v2.client import TinymanV2TestnetClient, TinymanV2MainnetClient
 from dotenv import load_dotenv
 import os
@@ -30,9 +31,31 @@ ALGO = client.fetch_asset(0)
 pool = client.fetch_pool(USDC, ALGO)
 print(f"Pool Info: {pool.info()}")
 
+# Track the pool's reserves from block deltas, the quotes below catch up with the
+# blocks committed since then instead of refetching the pool
+tracker = PoolTracker(algod, pool.validator_app_id)
+tracker.add_pool(pool.address)
+
+if not client.asset_is_opted_in(asset_id=10458941):
+    # write code for Opt-in transaction to the asset if necessary
+    opt_in_txn = transaction.AssetOptInTxn(
+        sender=account_address,
+        sp=algod.suggested_params(),
+        index=10458941,
+    )
+    signed_optin_txn = opt_in_txn.sign(private_key)
+    txid = algod.send_transaction(signed_optin_txn)
+
+pool_token_opted_in = client.asset_is_opted_in(asset_id=pool.pool_token_asset.id)
+
+# Quote from the reserves as of the latest block, right before the group is built and submitted
+tracker.catch_up()
+tracker.update_tinyman_pool(pool)
+print(f"Reserves at round {tracker.round}: {pool.asset_1_reserves} / {pool.asset_2_reserves}")
+
 # Get a quote for a swap of 1 ALGO to USDC with 1% slippage tolerance
-quote = pool.fetch_fixed_input_swap_quote(amount_in=ALGO(1_000_000), slippage=0.01)
-quote2 = pool.fetch_fixed_input_swap_quote(amount_in=ALGO(1_000_000), slippage=0.0)
+quote = pool.fetch_fixed_input_swap_quote(amount_in=ALGO(1_000_000), slippage=0.01, refresh=False)
+quote2 = pool.fetch_fixed_input_swap_quote(amount_in=ALGO(1_000_000), slippage=0.0, refresh=False)
 
 print(quote)
 print(f"USDC per ALGO: {quote.price}")
@@ -52,17 +75,7 @@ txn_group2 = pool.prepare_swap_transactions_from_quote(
 
 print("Pool Asset id: ", pool.pool_token_asset.id)
 
-if not client.asset_is_opted_in(asset_id=10458941):
-    # write code for Opt-in transaction to the asset if necessary
-    opt_in_txn = transaction.AssetOptInTxn(
-        sender=account_address,
-        sp=algod.suggested_params(),
-        index=10458941,
-    )
-    signed_optin_txn = opt_in_txn.sign(private_key)
-    txid = algod.send_transaction(signed_optin_txn)
-
-if not client.asset_is_opted_in(asset_id=pool.pool_token_asset.id):
+if not pool_token_opted_in:
     # Opt-in to the pool token
     opt_in_txn_group = pool.prepare_pool_token_asset_optin_transactions()
     # You can merge the transaction groups
@@ -0,0 +1,283 @@
+"""
+SQLite store for race experiment results.
+
+The CSV outputs (experiment_data.csv, transaction_log.csv,
+transaction_log_with_fees.csv and the proposer columns) only line up by row
+order and txid. The store keeps the same data in indexed tables instead:
+
+- runs: one row per script invocation with its configuration
+- iterations: race outcome per run and iteration (Function, 0 = increment won,
+  NULL if the race has no winner, e.g. a call did not confirm)
+- transactions: submitted transactions with their note, status, round and fee
+- fees: fees found on chain by get_fees.py, keyed by txid
+- blocks: proposer and transaction count per round
+- proposers: readable labels for proposer addresses (see proposers.json)
+
+so that e.g. the win rate by proposer for transactions with fee >= X is a
+single query (win_rate_by_proposer). The drivers pass their algod client to
+record_iteration, which stores the proposer of every round a race transaction
+confirmed in. A store file is meant for one network;
+rounds of different networks would collide in `blocks`.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from playground.experiments.analysis import load_proposer_labels
+from playground.experiments.blocks import block_proposer, fetch_raw_block
+
+DEFAULT_STORE = "experiments.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    script TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    config TEXT,
+    stop_reason TEXT
+);
+CREATE TABLE IF NOT EXISTS iterations (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    iteration INTEGER NOT NULL,
+    function INTEGER,
+    PRIMARY KEY (run_id, iteration)
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER REFERENCES runs(run_id),
+    iteration INTEGER,
+    txid TEXT,
+    note TEXT,
+    type TEXT,
+    status TEXT,
+    round INTEGER,
+    fee INTEGER
+);
+CREATE INDEX IF NOT EXISTS transactions_iteration ON transactions (run_id, iteration, type);
+CREATE INDEX IF NOT EXISTS transactions_txid ON transactions (txid);
+CREATE INDEX IF NOT EXISTS transactions_note ON transactions (note);
+CREATE INDEX IF NOT EXISTS transactions_round ON transactions (round);
+CREATE TABLE IF NOT EXISTS fees (
+    txid TEXT PRIMARY KEY,
+    fee INTEGER NOT NULL,
+    round INTEGER
+);
+CREATE INDEX IF NOT EXISTS fees_fee ON fees (fee);
+CREATE TABLE IF NOT EXISTS blocks (
+    round INTEGER PRIMARY KEY,
+    proposer TEXT,
+    txn_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS blocks_proposer ON blocks (proposer);
+CREATE TABLE IF NOT EXISTS proposers (
+    address TEXT PRIMARY KEY,
+    label TEXT NOT NULL
+);
+"""
+
+
+class ExperimentStore:
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self._allow_undecided_iterations()
+
+    def _allow_undecided_iterations(self):
+        """Drop the NOT NULL of iterations.function in stores created before undecided races were kept."""
+        not_null = {row[1]: row[3] for row in self.connection.execute("PRAGMA table_info(iterations)")}
+        if not not_null.get("function"):
+            return
+        self.connection.executescript("""
+            BEGIN;
+            ALTER TABLE iterations RENAME TO iterations_not_null;
+            CREATE TABLE iterations (
+                run_id INTEGER NOT NULL REFERENCES runs(run_id),
+                iteration INTEGER NOT NULL,
+                function INTEGER,
+                PRIMARY KEY (run_id, iteration)
+            );
+            INSERT INTO iterations SELECT run_id, iteration, function FROM iterations_not_null;
+            DROP TABLE iterations_not_null;
+            COMMIT;
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def start_run(self, script: str, config: dict | None = None) -> int:
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (script, started_at, config) VALUES (?, ?, ?)",
+                (script, time.time(), json.dumps(config or {}, default=str)),
+            )
+        return cursor.lastrowid
+
+    def finish_run(self, run_id: int, stop_reason: str | None = None, config: dict | None = None):
+        """Mark the run finished; `config` entries (values only known at the end) are merged into its config."""
+        with self.connection:
+            if config:
+                (stored,) = self.connection.execute("SELECT config FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+                self.connection.execute(
+                    "UPDATE runs SET config = ? WHERE run_id = ?",
+                    (json.dumps({**json.loads(stored or "{}"), **config}, default=str), run_id),
+                )
+            self.connection.execute(
+                "UPDATE runs SET finished_at = ?, stop_reason = ? WHERE run_id = ?",
+                (time.time(), stop_reason, run_id),
+            )
+
+    def record_iteration(self, run_id: int, iteration: int, function: int | None, transactions=(), client=None):
+        """
+        Store one race outcome (None if the race has no winner) together with
+        its transactions in a single commit. Transactions are dicts with the transaction_log.csv keys
+        (txid, note, type, status, round) and optionally fee. With an algod
+        `client`, the blocks they confirmed in are recorded as well.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO iterations (run_id, iteration, function) VALUES (?, ?, ?)",
+                (run_id, iteration, function),
+            )
+            self.connection.executemany(
+                "INSERT INTO transactions (run_id, iteration, txid, note, type, status, round, fee) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        iteration,
+                        tx.get("txid") if tx.get("txid") != "N/A" else None,
+                        tx.get("note"),
+                        tx.get("type"),
+                        tx.get("status"),
+                        tx.get("round") if isinstance(tx.get("round"), int) else None,
+                        tx.get("fee"),
+                    )
+                    for tx in transactions
+                ],
+            )
+        if client is not None:
+            self.record_blocks(client, [tx.get("round") for tx in transactions if isinstance(tx.get("round"), int)])
+
+    def record_blocks(self, client, rounds):
+        """Fetch and store the proposer and transaction count of the `rounds` whose proposer is not stored yet."""
+        rounds = set(rounds)
+        if not rounds:
+            return
+        known = {
+            row[0] for row in self.connection.execute(
+                f"SELECT round FROM blocks WHERE proposer IS NOT NULL AND round IN ({','.join('?' * len(rounds))})",
+                tuple(rounds),
+            )
+        }
+        for round_number in sorted(rounds - known):
+            raw_block = fetch_raw_block(client, round_number)
+            self.add_block(round_number, block_proposer(raw_block), len(raw_block[b"block"].get(b"txns", [])))
+
+    def add_fees(self, fees: dict, rounds: dict | None = None):
+        """Store on-chain fees (txid -> fee), optionally with the round they were found in."""
+        rounds = rounds or {}
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO fees (txid, fee, round) VALUES (?, ?, ?)",
+                [(txid, fee, rounds.get(txid)) for txid, fee in fees.items()],
+            )
+
+    def add_block(self, round_number: int, proposer: str | None = None, txn_count: int | None = None):
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO blocks (round, proposer, txn_count) VALUES (?, ?, ?) "
+                "ON CONFLICT(round) DO UPDATE SET "
+                "proposer = COALESCE(excluded.proposer, proposer), "
+                "txn_count = COALESCE(excluded.txn_count, txn_count)",
+                (round_number, proposer, txn_count),
+            )
+
+    def add_proposer_labels(self, labels: dict):
+        """Store address -> label pairs, e.g. a set from proposers.json."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO proposers (address, label) VALUES (?, ?)", labels.items()
+            )
+
+    def win_rate_by_proposer(self, min_fee: int | None = None, run_id: int | None = None,
+                             transaction_type: str = "increment") -> list[tuple]:
+        """
+        Increment win rate per proposer of the block that confirmed each
+        iteration's `transaction_type` transaction, over the races with a
+        winner. With `min_fee`, only
+        iterations where that transaction paid at least `min_fee` (on-chain fee
+        from get_fees.py if known, else the submitted fee) are counted.
+
+        Returns (proposer, races, increment_wins, win_rate) rows.
+        """
+        query = """
+            SELECT COALESCE(p.label, b.proposer) AS proposer,
+                   COUNT(*) AS races,
+                   SUM(i.function = 0) AS increment_wins,
+                   AVG(i.function = 0) AS win_rate
+            FROM iterations i
+            JOIN transactions t
+              ON t.run_id = i.run_id AND t.iteration = i.iteration AND t.type = ?
+            JOIN blocks b ON b.round = t.round
+            LEFT JOIN fees f ON f.txid = t.txid
+            LEFT JOIN proposers p ON p.address = b.proposer
+            WHERE i.function IS NOT NULL
+              AND (? IS NULL OR COALESCE(f.fee, t.fee) >= ?)
+              AND (? IS NULL OR i.run_id = ?)
+            GROUP BY 1
+            ORDER BY 1
+        """
+        return self.connection.execute(
+            query, (transaction_type, min_fee, min_fee, run_id, run_id)
+        ).fetchall()
+
+
+def confirmed_transaction(txid: str, function_type: str, transaction_info: dict | None) -> dict:
+    """Transaction row for record_iteration from a pending_transaction_info response."""
+    if not transaction_info:
+        return {"txid": txid, "type": function_type, "status": "Not Confirmed"}
+    return {
+        "txid": txid,
+        "type": function_type,
+        "status": "Confirmed",
+        "round": transaction_info.get("confirmed-round"),
+        "fee": transaction_info.get("txn", {}).get("txn", {}).get("fee"),
+    }
+
+
+def open_store(path: str | None) -> ExperimentStore | None:
+    return ExperimentStore(path) if path else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the experiment store.")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="SQLite store file.")
+    parser.add_argument("--min-fee", type=int, help="Only count races whose transaction paid at least this fee.")
+    parser.add_argument("--run-id", type=int, help="Only count races of this run.")
+    parser.add_argument("--type", default="increment", choices=["increment", "decrement"],
+                        help="Transaction whose block proposer and fee are used.")
+    parser.add_argument("--proposers", type=str,
+                        help="Name of a label set in proposers.json to store before querying.")
+    args = parser.parse_args()
+
+    with ExperimentStore(args.store) as store:
+        if args.proposers:
+            store.add_proposer_labels(load_proposer_labels(args.proposers))
+        for proposer, races, wins, rate in store.win_rate_by_proposer(args.min_fee, args.run_id, args.type):
+            print(f"{proposer}: increment won {wins}/{races} races ({rate * 100:.2f}%)")
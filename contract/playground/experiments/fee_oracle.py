@@ -0,0 +1,193 @@
+"""
+Fee bids from the fees paid in recent blocks.
+
+The race drivers used fixed flat fees, which overpay on an idle network and
+may still lose under congestion. A `FeeOracle` keeps the fee per byte of
+every transaction (atomic groups as one unit, see blocks.fee_per_byte) in
+the last `window` rounds and bids a chosen percentile of it plus `epsilon`
+microAlgos per byte for the size of the transaction to send, never less than
+the minimum fee:
+
+    oracle = FeeOracle(client, window=20)
+    fee = oracle.apply(txn, percentile=95, epsilon=1.0)   # sets txn.fee
+
+Each bid first reads the blocks confirmed since the last one, so the window
+follows the chain without a background thread.
+
+    python fee_oracle.py --window 20 --percentile 95 --rounds 10
+"""
+import argparse
+import base64
+import math
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import msgpack
+import numpy as np
+from algosdk import constants, encoding, transaction
+from algosdk.v2client import algod
+
+from playground.experiments.blocks import RateLimiter, fee_per_byte, fetch_block, fetch_with_retry, signed_size
+
+DEFAULT_WINDOW = 20
+DEFAULT_PERCENTILE = 95.0
+# MicroAlgos per byte bid above the percentile
+DEFAULT_EPSILON = 1.0
+FETCH_WORKERS = 8
+# Race transactions a driver's bidder sets the fee of, the others keep the driver's fixed fee
+FEE_SIDES = {"decrement": ("decrement",), "increment": ("increment",), "both": ("increment", "decrement")}
+
+
+def transaction_size(txn: transaction.Transaction) -> int:
+    """
+    Size in bytes of `txn` once signed (with a placeholder signature) as a
+    block's payset holds it, i.e. without the genesis ID and hash the block
+    header carries. It is decoded like a fetched block and measured with
+    blocks.signed_size, so bids and the fees per byte they are based on use
+    the same byte count.
+    """
+    signed = transaction.SignedTransaction(txn, base64.b64encode(bytes(64)).decode())
+    stxn = msgpack.unpackb(base64.b64decode(encoding.msgpack_encode(signed)), raw=True)
+    for key in (b"gen", b"gh"):
+        stxn[b"txn"].pop(key, None)
+    return signed_size(stxn)
+
+
+class FeeOracle:
+    def __init__(self, client, window: int = DEFAULT_WINDOW, min_fee: int = constants.MIN_TXN_FEE):
+        self.client = client
+        self.window = window
+        self.min_fee = min_fee
+        # (round, fee per byte of its units), oldest first
+        self.blocks = deque(maxlen=window)
+        self.round = 0
+        self._fees = np.empty(0)
+        self._limiter = RateLimiter(0)
+
+    def update(self) -> int:
+        """Read the rounds confirmed since the last update (the last `window` at most). Returns the current round."""
+        last_round = self.client.status()["last-round"]
+        rounds = range(max(self.round + 1, last_round - self.window + 1, 1), last_round + 1)
+        if rounds:
+            with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+                blocks = executor.map(lambda r: fetch_with_retry(self.client, r, self._limiter, fetch_block), rounds)
+                for round_number, block in zip(rounds, blocks):
+                    self.blocks.append((round_number, fee_per_byte(block.get(b"txns", []))))
+            self.round = last_round
+            self._fees = np.concatenate([fees for _, fees in self.blocks])
+        return self.round
+
+    def percentile(self, percentile: float = DEFAULT_PERCENTILE) -> float:
+        """Fee per byte at `percentile` over the window, 0 if the window holds no transactions."""
+        return float(np.percentile(self._fees, percentile)) if self._fees.size else 0.0
+
+    def bid(self, size: int, percentile: float = DEFAULT_PERCENTILE, epsilon: float = DEFAULT_EPSILON,
+            max_fee: int | None = None, refresh: bool = True) -> int:
+        """Flat fee for a `size` byte transaction: (percentile + epsilon) per byte, at least the minimum fee."""
+        if refresh:
+            self.update()
+        fee = max(self.min_fee, math.ceil((self.percentile(percentile) + epsilon) * size))
+        return min(fee, max_fee) if max_fee is not None else fee
+
+    def apply(self, txn: transaction.Transaction, percentile: float = DEFAULT_PERCENTILE,
+              epsilon: float = DEFAULT_EPSILON, max_fee: int | None = None, refresh: bool = True) -> int:
+        """Set the bid for `txn` as its flat fee and return it. Call before signing."""
+        txn.fee = self.bid(transaction_size(txn), percentile, epsilon, max_fee, refresh)
+        return txn.fee
+
+    def describe(self, percentile: float = DEFAULT_PERCENTILE) -> str:
+        return (f"p{percentile:g} {self.percentile(percentile):.2f} microAlgos/byte over {self._fees.size} "
+                f"transactions in rounds {self.blocks[0][0] if self.blocks else '-'}-{self.round}")
+
+
+class FeeBidder:
+    """
+    The bidding settings of a driver's --fee-* options. `bind` gives it an
+    oracle on the client that submits the transactions, `apply` sets and
+    logs the bid of each transaction. `side` names the race transactions
+    that bid (see FEE_SIDES); the bids made per transaction type are kept for
+    `summary`.
+    """
+
+    def __init__(self, percentile: float = DEFAULT_PERCENTILE, epsilon: float = DEFAULT_EPSILON,
+                 window: int = DEFAULT_WINDOW, max_fee: int | None = None, side: str = "decrement"):
+        self.percentile = percentile
+        self.epsilon = epsilon
+        self.window = window
+        self.max_fee = max_fee
+        self.side = side
+        self.oracle = None
+        self.fees = {}
+
+    def bind(self, client) -> "FeeBidder":
+        self.oracle = FeeOracle(client, self.window)
+        return self
+
+    def bids(self, txn_type: str) -> bool:
+        """Whether the `txn_type` ("increment" or "decrement") transaction of a race bids."""
+        return txn_type in FEE_SIDES[self.side]
+
+    def apply(self, txn: transaction.Transaction, txn_type: str = "transaction") -> int:
+        fee = self.oracle.apply(txn, self.percentile, self.epsilon, self.max_fee)
+        self.fees.setdefault(txn_type, []).append(fee)
+        print(f"Fee bid {fee} microAlgos for {transaction_size(txn)} bytes ({self.oracle.describe(self.percentile)})")
+        return fee
+
+    def summary(self) -> dict:
+        """Min, median and max of the bids made, as `<txn type>_fee` entries for a run's config."""
+        return {
+            f"{txn_type}_fee": {"min": min(fees), "median": float(np.median(fees)), "max": max(fees)}
+            for txn_type, fees in self.fees.items()
+        }
+
+
+def add_arguments(parser: argparse.ArgumentParser, sides: bool = False):
+    """
+    Add the --fee-* options that switch a driver from fixed fees to oracle
+    bids. With `sides`, --fee-side chooses which race transactions bid.
+    """
+    parser.add_argument(
+        "--fee-percentile", type=float,
+        help="Bid this percentile of the recent fee per byte (plus --fee-epsilon) instead of the fixed fee.",
+    )
+    parser.add_argument("--fee-epsilon", type=float, default=DEFAULT_EPSILON,
+                        help="MicroAlgos per byte bid above the percentile.")
+    parser.add_argument("--fee-window", type=int, default=DEFAULT_WINDOW, help="Rounds the percentile covers.")
+    parser.add_argument("--max-fee", type=int, help="Never bid more than this many microAlgos.")
+    if sides:
+        parser.add_argument("--fee-side", choices=FEE_SIDES, default="decrement",
+                            help="Race transactions that bid, the others keep the fixed fee.")
+
+
+def from_args(args) -> FeeBidder | None:
+    """FeeBidder for the parsed --fee-* options, or None if --fee-percentile was not given."""
+    if args.fee_percentile is None:
+        return None
+    return FeeBidder(args.fee_percentile, args.fee_epsilon, args.fee_window, args.max_fee,
+                     getattr(args, "fee_side", "decrement"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling fee per byte percentiles of recent blocks.")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Rounds the percentiles cover.")
+    parser.add_argument("--percentile", type=float, action="append", help="Percentile to show, may be repeated.")
+    parser.add_argument("--epsilon", type=float, default=DEFAULT_EPSILON, help="MicroAlgos per byte above it.")
+    parser.add_argument("--size", type=int, default=250, help="Transaction size to show the bid for.")
+    parser.add_argument("--rounds", type=int, help="Stop after this many rounds.")
+    parser.add_argument("--node-address", type=str, default="http://131.159.14.109:8081")
+    parser.add_argument("--node-token", type=str, default=os.getenv("TOKEN_TUM_TESTNET", ""))
+    args = parser.parse_args()
+
+    client = algod.AlgodClient(args.node_token, args.node_address)
+    oracle = FeeOracle(client, args.window)
+    percentiles = args.percentile or [50.0, DEFAULT_PERCENTILE]
+    for _ in range(args.rounds or sys.maxsize):
+        current = oracle.update()
+        values = ", ".join(f"p{p:g} {oracle.percentile(p):.2f}" for p in percentiles)
+        bid = oracle.bid(args.size, percentiles[-1], args.epsilon, refresh=False)
+        print(f"Round {current}: {values} microAlgos/byte, bid for {args.size} bytes: {bid}")
+        client.status_after_block(current)
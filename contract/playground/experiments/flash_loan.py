@@ -4,6 +4,7 @@
 from pprint import pprint
 from urllib.parse import quote_plus
 from playground.experiments.utils import get_testnet_algod_client
+from playground.experiments.pool_tracker import PoolTracker
 
 from tinyman.assets import AssetAmount
 
@@ -31,11 +32,17 @@ ASSET_A = client.fetch_asset(ASSET_A_ID)
 ASSET_B = client.fetch_asset(ASSET_B_ID)
 pool = client.fetch_pool(ASSET_A_ID, ASSET_B_ID)
 print("Pool Info: ", pool.info())
+# Track the pool's reserves from block deltas instead of refetching the pool for the quote
+tracker = PoolTracker(algod, pool.validator_app_id)
+tracker.add_pool(pool.address)
 position = pool.fetch_pool_position()
 
+tracker.catch_up()
+tracker.update_tinyman_pool(pool)
 quote = pool.fetch_flash_loan_quote(
     loan_amount_a=AssetAmount(pool.asset_1, 1_000_000_000),
     loan_amount_b=AssetAmount(pool.asset_2, 0),
+    refresh=False,
 )
 
 print("\nQuote:")
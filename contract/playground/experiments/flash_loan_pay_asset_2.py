@@ -2,15 +2,16 @@
 # It is not intended for production use.
 # This example does not constitute trading advice.
 from pprint import pprint
+import base64
 from urllib.parse import quote_plus
 
-from algosdk.future.transaction import AssetTransferTxn, PaymentTxn
 from playground.experiments.utils import get_testnet_algod_client
+from playground.experiments.group_template import FlashSwapGroup
+from playground.experiments.pool_tracker import PoolTracker
 
 from examples.v2.tutorial.common import get_account, get_assets
 from examples.v2.utils import get_algod
 from tinyman.v2.client import TinymanV2TestnetClient
-from tinyman.v2.flash_swap import prepare_flash_swap_transactions
 from tinyman.v2.formulas import calculate_flash_swap_asset_2_payment_amount
 from algosdk import mnemonic, account, transaction
 import os
@@ -34,6 +35,9 @@ ASSET_A = client.fetch_asset(ASSET_A_ID)
 ASSET_B = client.fetch_asset(ASSET_B_ID)
 pool = client.fetch_pool(ASSET_A_ID, ASSET_B_ID)
 # print("Pool Info: ", pool.info())
+# Track the pool's reserves from block deltas, the payment below uses them as of the latest block
+tracker = PoolTracker(algod, pool.validator_app_id)
+tracker.add_pool(pool.address)
 
 suggested_params = algod.suggested_params()
 account_info = algod.account_info(account_address)
@@ -45,86 +49,51 @@ for asset in account_info["assets"]:
 asset_1_loan_amount = 1_000_000
 asset_2_loan_amount = 0
 asset_1_payment_amount = 1_000_000
-asset_2_payment_amount = calculate_flash_swap_asset_2_payment_amount(
-    asset_1_reserves=pool.asset_1_reserves,
-    asset_2_reserves=pool.asset_2_reserves,
-    total_fee_share=pool.total_fee_share,
-    protocol_fee_ratio=pool.protocol_fee_ratio,
-    asset_1_loan_amount=asset_1_loan_amount,
-    asset_2_loan_amount=asset_2_loan_amount,
-    asset_1_payment_amount=asset_1_payment_amount,
-)
 
-print("Asset 1 loan amount: ", asset_1_loan_amount)
-print("Asset 2 loan amount: ", asset_2_loan_amount)
-print("Asset 1 payment amount: ", asset_1_payment_amount)
-print("Asset 2 payment amount: ", asset_2_payment_amount)
+
+def asset_2_payment():
+    return calculate_flash_swap_asset_2_payment_amount(
+        asset_1_reserves=pool.asset_1_reserves,
+        asset_2_reserves=pool.asset_2_reserves,
+        total_fee_share=pool.total_fee_share,
+        protocol_fee_ratio=pool.protocol_fee_ratio,
+        asset_1_loan_amount=asset_1_loan_amount,
+        asset_2_loan_amount=asset_2_loan_amount,
+        asset_1_payment_amount=asset_1_payment_amount,
+    )
+
+
+# Build the group once; each submission only patches the amounts and valid rounds and re-signs
+tracker.update_tinyman_pool(pool)
+group = FlashSwapGroup(
+    pool.address, pool.asset_1.id, pool.asset_2.id, account_address, private_key, suggested_params,
+    pool.validator_app_id, asset_1_loan_amount, asset_2_loan_amount, asset_1_payment_amount, asset_2_payment(),
+)
 
 # Transfer amount is equal to sum of initial account balance and loan amount
 # This transaction demonstrate that you can use the total amount
 transfer_amount = balance + asset_1_loan_amount
 print("Transfer amount: ", transfer_amount)
-transactions = [
-    # AssetTransferTxn(
-    #     sender=account_address,
-    #     sp=suggested_params,
-    #     receiver=account_address,
-    #     amt=transfer_amount,
-    #     index=pool.asset_1.id,
-    # )
-]
-
-if asset_1_payment_amount:
-    transactions.append(
-        AssetTransferTxn(
-            sender=account_address,
-            sp=suggested_params,
-            receiver=pool.address,
-            index=pool.asset_1.id,
-            amt=asset_1_payment_amount,
-        )
-    )
 
-if asset_2_payment_amount:
-    if pool.asset_2.id:
-        transactions.append(
-            AssetTransferTxn(
-                sender=account_address,
-                sp=suggested_params,
-                receiver=pool.address,
-                index=pool.asset_2.id,
-                amt=asset_2_payment_amount,
-            )
-        )
-    else:
-        transactions.append(
-            PaymentTxn(
-                sender=account_address,
-                sp=suggested_params,
-                receiver=pool.address,
-                amt=asset_2_payment_amount,
-            )
-        )
-
-txn_group = prepare_flash_swap_transactions(
-    validator_app_id=pool.validator_app_id,
-    asset_1_id=pool.asset_1.id,
-    asset_2_id=pool.asset_2.id,
-    asset_1_loan_amount=asset_1_loan_amount,
-    asset_2_loan_amount=asset_2_loan_amount,
-    transactions=transactions,
-    suggested_params=suggested_params,
-    sender=account_address,
-)
+tracker.catch_up()
+tracker.update_tinyman_pool(pool)
+asset_2_payment_amount = asset_2_payment()
+
+print("Asset 1 loan amount: ", asset_1_loan_amount)
+print("Asset 2 loan amount: ", asset_2_loan_amount)
+print("Asset 1 payment amount: ", asset_1_payment_amount)
+print("Asset 2 payment amount: ", asset_2_payment_amount)
 
-# Sign
-txn_group.sign_with_private_key(account_address, private_key)
+group.update(asset_1_loan_amount, asset_2_loan_amount, asset_1_payment_amount, asset_2_payment_amount,
+             first_valid=tracker.round)
 
-# Submit transactions to the network and wait for confirmation
-txn_info = client.submit(txn_group, wait=True)
+# Sign and submit, then wait for confirmation
+txid = group.submit(algod)
+txn_info = transaction.wait_for_confirmation(algod, txid)
 print("Transaction Info")
 print(txn_info)
 
 print(
-    f"Check the transaction group on Algoexplorer: https://testnet.algoexplorer.io/tx/group/{quote_plus(txn_group.id)}"
+    f"Check the transaction group on Algoexplorer: "
+    f"https://testnet.algoexplorer.io/tx/group/{quote_plus(base64.b64encode(group.group_id).decode())}"
 )
@@ -23,6 +23,7 @@ from algosdk.atomic_transaction_composer import (
     TransactionWithSigner,
 )
 import base64
+import math
 import os
 from playground.experiments.utils import (
     get_test_non_part_1,
@@ -31,11 +32,27 @@ from playground.experiments.utils import (
     get_testnet_TUM_algod_client,
     get_testnet_algod_client,
 )
+from playground.experiments.account_pool import load_pool
+from playground.experiments.app_deployer import load_app_pool
+from playground.experiments import call_log, fee_oracle, sequential, stats
+from playground.experiments.experiment_store import open_store
 from dotenv import load_dotenv
 import csv
+import numpy as np
 
 load_dotenv()
 
+INCREMENT_FEE = algosdk.constants.MIN_TXN_FEE * 5
+DECREMENT_FEE = algosdk.constants.MIN_TXN_FEE * 1000
+DEFAULT_MNEMONIC = "kitchen subway tomato hire inspire pepper camera frog about kangaroo bunker express length song act oven world quality around elegant lion chimney enough ability prepare"
+DEFAULT_APP_ID = 1002
+
+SEARCH_TARGET = 0.9
+SEARCH_TOLERANCE = 0.1
+SEARCH_BATCH_SIZE = 10
+SEARCH_MAX_BATCHES = 3
+SEARCH_CONFIDENCE = 0.9
+
 
 def create_algod_client_from_url(url: str) -> algod.AlgodClient:
     """Creates an AlgodClient instance from a given URL."""
@@ -46,17 +63,49 @@ def create_algod_client_from_url(url: str) -> algod.AlgodClient:
     return algod.AlgodClient(algod_token, url, algod_headers)
 
 
+def create_clients(non_part_1_url: str | None, non_part_2_url: str | None):
+    if non_part_1_url:
+        print(f"Using provided URL for client 1: {non_part_1_url}")
+        client1 = create_algod_client_from_url(non_part_1_url)
+    else:
+        print("Using default utils.py function for client 1.")
+        client1 = get_test_non_part_1()
+
+    if non_part_2_url:
+        print(f"Using provided URL for client 2: {non_part_2_url}")
+        client2 = create_algod_client_from_url(non_part_2_url)
+    else:
+        print("Using default utils.py function for client 2.")
+        client2 = get_test_non_part_2()
+    return client1, client2
+
+
+def load_contract() -> abi.Contract:
+    script_path = pathlib.Path(__file__).resolve().parent
+    contract_json_path = script_path.parent / "last_executed" / "artifacts" / "contract.json"
+
+    with open(contract_json_path) as f:
+        js = f.read()
+    return abi.Contract.from_json(js)
+
+
 def generate_data(
     non_part_1_url: str | None = None,
     non_part_2_url: str | None = None,
     app_id_arg: int | None = None,
     mnemonic_arg: str | None = None,
+    account_pool_path: str | None = None,
+    iterations: int = 100,
+    early_stop: sequential.SPRT | None = None,
+    store_path: str | None = None,
+    app_manifest_path: str | None = None,
+    fee_bidder: fee_oracle.FeeBidder | None = None,
+    resolve_every: int = call_log.LOG_SLOTS // 2,
 ):
-    default_mnemonic = "kitchen subway tomato hire inspire pepper camera frog about kangaroo bunker express length song act oven world quality around elegant lion chimney enough ability prepare"
-    default_app_id = 1002
-
-    mnemonic_1 = mnemonic_arg if mnemonic_arg is not None else default_mnemonic
-    app_id = app_id_arg if app_id_arg is not None else default_app_id
+    mnemonic_1 = mnemonic_arg if mnemonic_arg is not None else DEFAULT_MNEMONIC
+    # An explicit --app-id wins over the manifest's app pool
+    apps = load_app_pool(app_manifest_path) if app_id_arg is None else None
+    app_id = app_id_arg if app_id_arg is not None else apps.app_ids[0] if apps else DEFAULT_APP_ID
 
     print(f"--- Configuration ---")
     print(f"Using App ID: {app_id}")
@@ -64,6 +113,7 @@ def generate_data(
     print(f"---------------------\n")
 
     private_key = mnemonic.to_private_key(mnemonic_1)
+    pool = load_pool(account_pool_path)
 
     increment_count = 0
     decrement_count = 0
@@ -71,145 +121,59 @@ def generate_data(
     x_values = []
     y_values = []
     colors = []
+    # Per-race conditions written next to the outcomes for grouping, see stats.py
+    fee_ratios = []
+    skews = []
+    conditions = {}
+    node_pair = f"{non_part_1_url or 'non_part_1'} / {non_part_2_url or 'non_part_2'}"
 
     transaction_log = []
 
     first_function = "None"
     color = ""
 
-    if non_part_1_url:
-        print(f"Using provided URL for client 1: {non_part_1_url}")
-        client1 = create_algod_client_from_url(non_part_1_url)
-    else:
-        print("Using default utils.py function for client 1.")
-        client1 = get_test_non_part_1()
-
-    if non_part_2_url:
-        print(f"Using provided URL for client 2: {non_part_2_url}")
-        client2 = create_algod_client_from_url(non_part_2_url)
-    else:
-        print("Using default utils.py function for client 2.")
-        client2 = get_test_non_part_2()
-
-    script_path = pathlib.Path(__file__).resolve().parent
-    contract_json_path = script_path.parent / "last_executed" / "artifacts" / "contract.json"
-
-    with open(contract_json_path) as f:
-        js = f.read()
-    contract = abi.Contract.from_json(js)
+    client1, client2 = create_clients(non_part_1_url, non_part_2_url)
+    contract = load_contract()
+    # Without a fee bidder (or for the side it does not bid on) the increment pays INCREMENT_FEE
+    # and the decrement DECREMENT_FEE
+    if fee_bidder:
+        fee_bidder.bind(client2)
 
     print("Initial Value: ", print_global_state(client1, app_id), "\n")
     print(f"Account Address: {account.address_from_private_key(private_key)}\n")
 
-    for i in range(100):
-        print(f"\n--- Iteration {i} ---")
-        previous_value = print_global_state(client2, app_id)
-        print("Previous Value:", previous_value)
-        atc1 = AtomicTransactionComposer()
-        atc2 = AtomicTransactionComposer()
-
-        note_inc = f"inc_{time.time()}_{i}".encode()
-        params1 = client1.suggested_params()
-        params1.flat_fee = True
-        params1.fee = algosdk.constants.MIN_TXN_FEE * 5
-
-        atc1.add_method_call(
-            app_id=app_id,
-            method=contract.get_method_by_name("increment"),
-            method_args=[],
-            note=note_inc,
-            sp=params1,
-            sender=account.address_from_private_key(private_key),
-            signer=AccountTransactionSigner(private_key),
+    store = open_store(store_path)
+    if store:
+        run_id = store.start_run(
+            "generate_high_inc_higher_dec_tx",
+            {"app_id": app_id, "app_ids": pool.all_app_ids() if pool else apps.app_ids if apps else [app_id], "iterations": iterations,
+             "increment_fee": None if fee_bidder and fee_bidder.bids("increment") else INCREMENT_FEE,
+             "decrement_fee": None if fee_bidder and fee_bidder.bids("decrement") else DECREMENT_FEE,
+             "non_part_1": non_part_1_url, "non_part_2": non_part_2_url,
+             "fee_percentile": fee_bidder.percentile if fee_bidder else None,
+             "fee_side": fee_bidder.side if fee_bidder else None, "resolve_every": resolve_every},
         )
 
-        note_dec = f"dec_{time.time()}_{i}".encode()
-        params2 = client2.suggested_params()
-        params2.flat_fee = True
-        params2.fee = algosdk.constants.MIN_TXN_FEE * 1000
-
-        atc2.add_method_call(
-            app_id=app_id,
-            method=contract.get_method_by_name("decrement"),
-            method_args=[],
-            note=note_dec,
-            sp=params2,
-            sender=account.address_from_private_key(private_key),
-            signer=AccountTransactionSigner(private_key),
-        )
-
-        try:
-            current_round = client1.status().get("last-round")
-        except Exception:
-            current_round = "N/A"
-
-
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future1 = executor.submit(submit_atc, atc1, client1)
-            future2 = executor.submit(submit_atc, atc2, client2)
-
-            success_inc, result_inc = future1.result()
-            success_dec, result_dec = future2.result()
-
-        note_inc_str = note_inc.decode('utf-8')
-        note_dec_str = note_dec.decode('utf-8')
-
-        if success_inc:
-            txid_inc = result_inc[0]
-            print(f"Increment submitted successfully: {txid_inc}")
-            confirmation_inc = wait_for_confirmation(client1, txid_inc)
-            if confirmation_inc:
-                round_inc = confirmation_inc.get('confirmed-round', 'N/A')
-                transaction_log.append(
-                    {'txid': txid_inc, 'note': note_inc_str, 'type': 'increment',
-                     'status': 'Confirmed', 'round': round_inc}
-                )
-            else:
-                transaction_log.append(
-                    {'txid': txid_inc, 'note': note_inc_str, 'type': 'increment',
-                     'status': 'Not Confirmed', 'round': f'Timed out after round {current_round}'}
-                )
-        else:
-            error_message = result_inc
-            print(f"Increment submission failed: {error_message}")
-            transaction_log.append(
-                {'txid': 'N/A', 'note': note_inc_str, 'type': 'increment',
-                 'status': f'Submission Failed: {error_message}', 'round': current_round}
-            )
-
-        if success_dec:
-            txid_dec = result_dec[0]
-            print(f"Decrement submitted successfully: {txid_dec}")
-            confirmation_dec = wait_for_confirmation(client2, txid_dec)
-            if confirmation_dec:
-                round_dec = confirmation_dec.get('confirmed-round', 'N/A')
-                transaction_log.append(
-                    {'txid': txid_dec, 'note': note_dec_str, 'type': 'decrement',
-                     'status': 'Confirmed', 'round': round_dec}
-                )
-            else:
-                transaction_log.append(
-                    {'txid': txid_dec, 'note': note_dec_str, 'type': 'decrement',
-                     'status': 'Not Confirmed', 'round': f'Timed out after round {current_round}'}
-                )
-        else:
-            error_message = result_dec
-            print(f"Decrement submission failed: {error_message}")
-            transaction_log.append(
-                {'txid': 'N/A', 'note': note_dec_str, 'type': 'decrement',
-                 'status': f'Submission Failed: {error_message}', 'round': current_round}
-            )
-
-        updated_value = print_global_state(client1, app_id)
-        print("After Value: ", updated_value)
-
-        if updated_value == "increment":
-            print("Decrement won the race.")
+    # With the call log the winners are decided in batches from the confirmed rounds, see call_log.RaceResolver
+    resolver = call_log.RaceResolver(client1, resolve_every) if resolve_every else None
+
+    undecided = 0
+
+    def record(i, winner, transactions):
+        nonlocal first_function, color, increment_count, decrement_count, undecided
+        fee_ratio, skew = conditions.pop(i)
+        # A race without a winner is kept in the store as undecided but is not an outcome
+        if winner is None:
+            print(f"Race {i} has no winner")
+            undecided += 1
+            if store:
+                store.record_iteration(run_id, i, None, transactions, client=client1)
+            return
+        if winner == "Decrement":
             first_function = "Decrement"
             decrement_count += 1
             color = "red"
-        elif updated_value == "decrement":
-            print("Increment won the race.")
+        elif winner == "Increment":
             first_function = "Increment"
             increment_count += 1
             color = "blue"
@@ -217,6 +181,49 @@ def generate_data(
         x_values.append(i)
         y_values.append(0) if first_function == "Increment" else y_values.append(1)
         colors.append(0) if color == "blue" else colors.append(1)
+        fee_ratios.append(fee_ratio)
+        skews.append(skew)
+
+        if store:
+            store.record_iteration(run_id, i, y_values[-1], transactions, client=client1)
+
+    for i in range(iterations):
+        print(f"\n--- Iteration {i} ---")
+        if pool:
+            # The methods are creator-only, so both calls come from the account that created the app
+            sender_1, key_1, app_id = pool.next_race()
+            sender_2, key_2 = sender_1, key_1
+        else:
+            if apps:
+                app_id = apps.next()
+            sender_1 = sender_2 = account.address_from_private_key(private_key)
+            key_1 = key_2 = private_key
+        if not resolver:
+            previous_value = print_global_state(client2, app_id)
+            print("Previous Value:", previous_value)
+        winner, skew = run_race(
+            client1, client2, contract, app_id, i, ((sender_1, key_1), (sender_2, key_2)),
+            INCREMENT_FEE, DECREMENT_FEE, transaction_log, fee_bidder, read_state=not resolver,
+        )
+        transactions = transaction_log[-2:]
+        increment_tx, decrement_tx = transactions
+        # Skew in milliseconds, positive when the decrement reached its node after the increment
+        conditions[i] = (round(decrement_tx["fee"] / increment_tx["fee"], 4), round(skew * 1000, 1))
+        if resolver:
+            decided = resolver.add((i, transactions), app_id, *race_rounds(*transactions))
+            if i == iterations - 1:
+                decided += resolver.flush()
+        else:
+            decided = [((i, transactions), winner)]
+
+        stop = False
+        for (race, transactions), winner in decided:
+            record(race, winner, transactions)
+            # A race without a winner is not an observation
+            if early_stop and not stop and winner is not None:
+                stop = early_stop.update(winner == "Increment")
+        if stop:
+            break
 
     total_operations = increment_count + decrement_count if (
                                                                 increment_count + decrement_count) > 0 else 1
@@ -229,6 +236,7 @@ def generate_data(
             [
                 "Iteration", "Function", "Color", "Increment Count",
                 "Increment Percentage", "Decrement Count", "Decrement Percentage",
+                "Fee Ratio", "Node Pair", "Submission Skew",
             ]
         )
         for i in range(len(x_values)):
@@ -236,14 +244,25 @@ def generate_data(
                 [
                     x_values[i], y_values[i], colors[i], increment_count,
                     percentage_increment, decrement_count, percentage_decrement,
+                    fee_ratios[i], node_pair, skews[i],
                 ]
             )
 
-    log_filename = "transaction_log.csv"
+    stop_reason = early_stop.stop_reason if early_stop else f"Completed {len(x_values) + undecided} iterations ({undecided} without a winner)"
+    sequential.write_summary(increment_count, decrement_count, stop_reason)
+    if store:
+        # The bids actually made replace the fixed fees in the run's config
+        store.finish_run(run_id, stop_reason, fee_bidder.summary() if fee_bidder else None)
+        store.close()
+
+    write_transaction_log(transaction_log)
+
+
+def write_transaction_log(transaction_log, log_filename="transaction_log.csv"):
     print(f"\nWriting detailed transaction log to {log_filename}...")
     try:
         with open(log_filename, "w", newline="") as file:
-            fieldnames = ['txid', 'note', 'type', 'status', 'round']
+            fieldnames = ['txid', 'note', 'type', 'status', 'round', 'fee']
             writer = csv.DictWriter(file, fieldnames=fieldnames)
             writer.writeheader()
             writer.writerows(transaction_log)
@@ -252,17 +271,288 @@ def generate_data(
         print(f"Error writing to {log_filename}: {e}")
 
 
+def run_race(client1, client2, contract, app_id, i, senders, increment_fee, decrement_fee, transaction_log,
+             fee_bidder=None, read_state=True):
+    """
+    Submit one increment (via client1) and one decrement (via client2) at the
+    given flat fees, wait for both and append their outcome and fee to
+    `transaction_log`. With `fee_bidder` (see fee_oracle.py) the side(s) it
+    bids on bid from recent blocks instead of paying the given fee. Returns
+    "Increment" or "Decrement" for the function that executed first, or None
+    if the counter shows neither, and the submission skew: seconds between
+    the nodes accepting the increment and the decrement. With `read_state`
+    False the counter is not read and the winner is None; decide the race
+    from the logged rounds with a call_log.RaceResolver instead.
+    """
+    (sender_1, key_1), (sender_2, key_2) = senders
+    atc1 = AtomicTransactionComposer()
+    atc2 = AtomicTransactionComposer()
+
+    note_inc = f"inc_{time.time()}_{i}".encode()
+    params1 = client1.suggested_params()
+    params1.flat_fee = True
+    params1.fee = increment_fee
+
+    atc1.add_method_call(
+        app_id=app_id,
+        method=contract.get_method_by_name("increment"),
+        method_args=[],
+        note=note_inc,
+        sp=params1,
+        sender=sender_1,
+        signer=AccountTransactionSigner(key_1),
+    )
+
+    note_dec = f"dec_{time.time()}_{i}".encode()
+    params2 = client2.suggested_params()
+    params2.flat_fee = True
+    params2.fee = decrement_fee
+
+    atc2.add_method_call(
+        app_id=app_id,
+        method=contract.get_method_by_name("decrement"),
+        method_args=[],
+        note=note_dec,
+        sp=params2,
+        sender=sender_2,
+        signer=AccountTransactionSigner(key_2),
+    )
+    if fee_bidder and fee_bidder.bids("increment"):
+        increment_fee = fee_bidder.apply(atc1.txn_list[-1].txn, "increment")
+    if fee_bidder and fee_bidder.bids("decrement"):
+        decrement_fee = fee_bidder.apply(atc2.txn_list[-1].txn, "decrement")
+
+    try:
+        current_round = client1.status().get("last-round")
+    except Exception:
+        current_round = "N/A"
+
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        future1 = executor.submit(submit_atc, atc1, client1)
+        future2 = executor.submit(submit_atc, atc2, client2)
+
+        success_inc, result_inc, submitted_inc = future1.result()
+        success_dec, result_dec, submitted_dec = future2.result()
+    skew = submitted_dec - submitted_inc
+
+    note_inc_str = note_inc.decode('utf-8')
+    note_dec_str = note_dec.decode('utf-8')
+
+    if success_inc:
+        txid_inc = result_inc[0]
+        print(f"Increment submitted successfully: {txid_inc}")
+        confirmation_inc = wait_for_confirmation(client1, txid_inc)
+        if confirmation_inc:
+            round_inc = confirmation_inc.get('confirmed-round', 'N/A')
+            transaction_log.append(
+                {'txid': txid_inc, 'note': note_inc_str, 'type': 'increment', 'fee': increment_fee,
+                 'status': 'Confirmed', 'round': round_inc}
+            )
+        else:
+            transaction_log.append(
+                {'txid': txid_inc, 'note': note_inc_str, 'type': 'increment', 'fee': increment_fee,
+                 'status': 'Not Confirmed', 'round': f'Timed out after round {current_round}'}
+            )
+    else:
+        error_message = result_inc
+        print(f"Increment submission failed: {error_message}")
+        transaction_log.append(
+            {'txid': 'N/A', 'note': note_inc_str, 'type': 'increment', 'fee': increment_fee,
+             'status': f'Submission Failed: {error_message}', 'round': current_round}
+        )
+
+    if success_dec:
+        txid_dec = result_dec[0]
+        print(f"Decrement submitted successfully: {txid_dec}")
+        confirmation_dec = wait_for_confirmation(client2, txid_dec)
+        if confirmation_dec:
+            round_dec = confirmation_dec.get('confirmed-round', 'N/A')
+            transaction_log.append(
+                {'txid': txid_dec, 'note': note_dec_str, 'type': 'decrement', 'fee': decrement_fee,
+                 'status': 'Confirmed', 'round': round_dec}
+            )
+        else:
+            transaction_log.append(
+                {'txid': txid_dec, 'note': note_dec_str, 'type': 'decrement', 'fee': decrement_fee,
+                 'status': 'Not Confirmed', 'round': f'Timed out after round {current_round}'}
+            )
+    else:
+        error_message = result_dec
+        print(f"Decrement submission failed: {error_message}")
+        transaction_log.append(
+            {'txid': 'N/A', 'note': note_dec_str, 'type': 'decrement', 'fee': decrement_fee,
+             'status': f'Submission Failed: {error_message}', 'round': current_round}
+        )
+
+    if not read_state:
+        return None, skew
+    updated_value = print_global_state(client1, app_id)
+    print("After Value: ", updated_value)
+
+    if updated_value == "increment":
+        print("Decrement won the race.")
+        return "Decrement", skew
+    if updated_value == "decrement":
+        print("Increment won the race.")
+        return "Increment", skew
+    return None, skew
+
+
+def race_rounds(increment_tx: dict, decrement_tx: dict) -> tuple:
+    """Confirmed rounds of a race's transaction log entries, None for a call that did not confirm."""
+    return tuple(tx["round"] if tx["status"] == "Confirmed" else None for tx in (increment_tx, decrement_tx))
+
+
+def search_fee_ratio(
+    non_part_1_url: str | None = None,
+    non_part_2_url: str | None = None,
+    app_id_arg: int | None = None,
+    mnemonic_arg: str | None = None,
+    account_pool_path: str | None = None,
+    target: float = SEARCH_TARGET,
+    low: float = 1.0,
+    high: float = DECREMENT_FEE / INCREMENT_FEE,
+    tolerance: float = SEARCH_TOLERANCE,
+    batch_size: int = SEARCH_BATCH_SIZE,
+    max_batches: int = SEARCH_MAX_BATCHES,
+    confidence: float = SEARCH_CONFIDENCE,
+    output: str = "fee_search.csv",
+    app_manifest_path: str | None = None,
+    resolve_every: int = call_log.LOG_SLOTS // 2,
+    store_path: str | None = None,
+):
+    """
+    Find the smallest decrement/increment fee ratio at which decrement wins at
+    least `target` of the races. The increment fee stays at INCREMENT_FEE.
+
+    The ratio is bisected geometrically between `low` and `high`. At each
+    ratio, races run in batches of `batch_size` until the Wilson interval of
+    the decrement win rate lies entirely above or below `target`, or
+    `max_batches` batches have run (then the point estimate decides). The
+    search ends once high / low <= 1 + tolerance. Every measured ratio is
+    written to `output` as the estimated fee vs win probability curve.
+    Unless `resolve_every` is 0 the winners of a batch are decided from the
+    call log (see call_log.RaceResolver) instead of a state read per race.
+    With `store_path` every race is written to the experiment store, under
+    one run whose config gets the threshold when the search ends.
+    """
+    private_key = mnemonic.to_private_key(mnemonic_arg if mnemonic_arg is not None else DEFAULT_MNEMONIC)
+    apps = load_app_pool(app_manifest_path) if app_id_arg is None else None
+    app_id = app_id_arg if app_id_arg is not None else apps.app_ids[0] if apps else DEFAULT_APP_ID
+    pool = load_pool(account_pool_path)
+    client1, client2 = create_clients(non_part_1_url, non_part_2_url)
+    contract = load_contract()
+
+    transaction_log = []
+    results = {}  # decrement fee -> [races, decrement wins]
+    race_index = 0
+    resolver = call_log.RaceResolver(client1, min(resolve_every, batch_size)) if resolve_every else None
+
+    store = open_store(store_path)
+    if store:
+        run_id = store.start_run(
+            "generate_high_inc_higher_dec_tx --search",
+            {"app_id": app_id, "app_ids": pool.all_app_ids() if pool else apps.app_ids if apps else [app_id],
+             "increment_fee": INCREMENT_FEE, "target": target, "low": low, "high": high, "tolerance": tolerance,
+             "batch_size": batch_size, "max_batches": max_batches, "confidence": confidence,
+             "non_part_1": non_part_1_url, "non_part_2": non_part_2_url, "resolve_every": resolve_every},
+        )
+
+    def reaches_target(ratio: float) -> bool:
+        nonlocal race_index
+        decrement_fee = max(INCREMENT_FEE, round(INCREMENT_FEE * ratio))
+        races, wins = results.setdefault(decrement_fee, [0, 0])
+        for _ in range(max_batches):
+            winners = []
+            for _ in range(batch_size):
+                if pool:
+                    address, key, race_app_id = pool.next_race()
+                else:
+                    address, key = account.address_from_private_key(private_key), private_key
+                    race_app_id = apps.next() if apps else app_id
+                winner, _ = run_race(
+                    client1, client2, contract, race_app_id, race_index, ((address, key), (address, key)),
+                    INCREMENT_FEE, decrement_fee, transaction_log, read_state=not resolver,
+                )
+                race_index += 1
+                race = (race_index - 1, transaction_log[-2:])
+                if resolver:
+                    winners += resolver.add(race, race_app_id, *race_rounds(*race[1]))
+                else:
+                    winners.append((race, winner))
+            if resolver:
+                winners += resolver.flush()
+            for (iteration, transactions), winner in winners:
+                if store:
+                    function = None if winner is None else int(winner == "Decrement")
+                    store.record_iteration(run_id, iteration, function, transactions, client=client1)
+                if winner is None:
+                    continue
+                races += 1
+                wins += winner == "Decrement"
+            results[decrement_fee] = [races, wins]
+            wilson_low, wilson_high = stats.wilson_interval(wins, races, confidence)
+            if wilson_low >= target or wilson_high < target:
+                break
+        rate = wins / races if races else 0.0
+        print(f"Fee ratio {decrement_fee / INCREMENT_FEE:.2f}: decrement won {wins}/{races} races ({rate:.0%})")
+        return rate >= target
+
+    if not reaches_target(high):
+        print(f"Decrement does not reach a {target:.0%} win rate even at fee ratio {high:.2f}.")
+        threshold = None
+    elif reaches_target(low):
+        threshold = low
+    else:
+        while high / low > 1 + tolerance:
+            mid = math.sqrt(low * high)
+            if round(INCREMENT_FEE * mid) in (round(INCREMENT_FEE * low), round(INCREMENT_FEE * high)):
+                break
+            if reaches_target(mid):
+                high = mid
+            else:
+                low = mid
+        threshold = high
+
+    fees = sorted(results)
+    races = np.array([results[fee][0] for fee in fees])
+    wins = np.array([results[fee][1] for fee in fees])
+    wilson_low, wilson_high = stats.wilson_interval(wins, races, confidence)
+    with open(output, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(
+            ["Fee Ratio", "Increment Fee", "Decrement Fee", "Races", "Decrement Wins",
+             "Decrement Win Rate", "Wilson Low", "Wilson High"]
+        )
+        for k, fee in enumerate(fees):
+            writer.writerow(
+                [fee / INCREMENT_FEE, INCREMENT_FEE, fee, races[k], wins[k],
+                 wins[k] / races[k] if races[k] else "", wilson_low[k], wilson_high[k]]
+            )
+    write_transaction_log(transaction_log)
+
+    print(f"\nRan {race_index} races over {len(fees)} fee ratios, curve written to {output}")
+    if threshold is not None:
+        print(f"Estimated minimum fee ratio for a {target:.0%} decrement win rate: {threshold:.2f} "
+              f"(decrement fee {round(INCREMENT_FEE * threshold)} microAlgos)")
+    if store:
+        store.finish_run(run_id, f"Searched {len(fees)} fee ratios in {race_index} races", {"threshold": threshold})
+        store.close()
+    return threshold
+
+
 def submit_atc(atc, client):
     """
     Submits an AtomicTransactionComposer object.
     Returns:
-        tuple: (True, txids) on success, (False, error_message) on failure.
+        tuple: (True, txids, submitted) on success, (False, error_message, submitted) on failure,
+        where submitted is the time.perf_counter() at which the node answered.
     """
     try:
         result = atc.submit(client)
-        return True, result
+        return True, result, time.perf_counter()
     except Exception as e:
-        return False, str(e)
+        return False, str(e), time.perf_counter()
 
 
 def print_global_state(client, app_id):
@@ -336,11 +626,83 @@ if __name__ == "__main__":
         "--mnemonic", type=str,
         help="The mnemonic phrase of the account to sign transactions.",
     )
+    parser.add_argument(
+        "--account-pool",
+        type=str,
+        help="Account pool file (see account_pool.py --deploy). Each race runs on an app of the next account "
+             "instead of --app-id/--app-manifest.",
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=100,
+        help="Number of increment/decrement races to run.",
+    )
+    sequential.add_arguments(parser)
+    fee_oracle.add_arguments(parser, sides=True)
+    parser.add_argument(
+        "--search", action="store_true",
+        help="Bisect over the decrement/increment fee ratio instead of running a fixed race count.",
+    )
+    parser.add_argument(
+        "--search-target", type=float, default=SEARCH_TARGET,
+        help="Decrement win rate the searched fee ratio has to reach.",
+    )
+    parser.add_argument("--search-low", type=float, default=1.0, help="Lowest fee ratio to consider.")
+    parser.add_argument(
+        "--search-high", type=float, default=DECREMENT_FEE / INCREMENT_FEE,
+        help="Highest fee ratio to consider.",
+    )
+    parser.add_argument(
+        "--search-tolerance", type=float, default=SEARCH_TOLERANCE,
+        help="Stop once high / low <= 1 + tolerance.",
+    )
+    parser.add_argument("--batch-size", type=int, default=SEARCH_BATCH_SIZE, help="Races per batch.")
+    parser.add_argument(
+        "--resolve-every", type=int, default=call_log.LOG_SLOTS // 2,
+        help=f"Decide the winners from the confirmed rounds and the app's call log every this many races "
+             f"(at most {call_log.LOG_SLOTS // 2}); 0 reads the counter after every race instead.",
+    )
+    parser.add_argument("--max-batches", type=int, default=SEARCH_MAX_BATCHES, help="Batches per fee ratio at most.")
+    parser.add_argument(
+        "--app-manifest", type=str,
+        help="App manifest (see app_deployer.py) whose apps are raced round-robin, one per race.",
+    )
+    parser.add_argument(
+        "--store", type=str,
+        help="Experiment store (SQLite file, see experiment_store.py) to write runs and transactions into.",
+    )
     args = parser.parse_args()
 
-    generate_data(
-        non_part_1_url=args.non_part_1,
-        non_part_2_url=args.non_part_2,
-        app_id_arg=args.app_id,
-        mnemonic_arg=args.mnemonic,
-    )
+    if args.search:
+        # The search sets the decrement fee itself and stops each ratio on its Wilson interval
+        if args.fee_percentile is not None or args.early_stop:
+            parser.error("--fee-percentile and --early-stop do not apply to --search")
+        search_fee_ratio(
+            non_part_1_url=args.non_part_1,
+            non_part_2_url=args.non_part_2,
+            app_id_arg=args.app_id,
+            mnemonic_arg=args.mnemonic,
+            account_pool_path=args.account_pool,
+            target=args.search_target,
+            low=args.search_low,
+            high=args.search_high,
+            tolerance=args.search_tolerance,
+            batch_size=args.batch_size,
+            max_batches=args.max_batches,
+            app_manifest_path=args.app_manifest,
+            resolve_every=args.resolve_every,
+            store_path=args.store,
+        )
+    else:
+        generate_data(
+            non_part_1_url=args.non_part_1,
+            non_part_2_url=args.non_part_2,
+            app_id_arg=args.app_id,
+            mnemonic_arg=args.mnemonic,
+            account_pool_path=args.account_pool,
+            iterations=args.iterations,
+            early_stop=sequential.from_args(args),
+            store_path=args.store,
+            app_manifest_path=args.app_manifest,
+            fee_bidder=fee_oracle.from_args(args),
+            resolve_every=args.resolve_every,
+        )
@@ -31,11 +31,18 @@ from playground.experiments.utils import (
     get_testnet_TUM_algod_client,
     get_testnet_algod_client,
 )
+from playground.experiments.account_pool import load_pool
+from playground.experiments.app_deployer import load_app_pool
+from playground.experiments.state_reader import GlobalStateReader
+from playground.experiments import call_log, fee_oracle, sequential
+from playground.experiments.experiment_store import confirmed_transaction, open_store
 from dotenv import load_dotenv
 import csv
 
 load_dotenv()  # take environment variables from .env.
 
+DECREMENT_FEE = 10000
+
 def create_algod_client_from_url(url: str) -> algod.AlgodClient:
     """Creates an AlgodClient instance from a given URL."""
     algod_token = ""
@@ -50,12 +57,21 @@ def generate_data(
     non_part_2_url: str | None = None,
     app_id_arg: int | None = None,
     mnemonic_arg: str | None = None,
+    iterations: int = 500,
+    account_pool_path: str | None = None,
+    early_stop: sequential.SPRT | None = None,
+    store_path: str | None = None,
+    app_manifest_path: str | None = None,
+    fee_bidder: fee_oracle.FeeBidder | None = None,
+    resolve_every: int = call_log.LOG_SLOTS // 2,
 ):
     default_mnemonic = "kitchen subway tomato hire inspire pepper camera frog about kangaroo bunker express length song act oven world quality around elegant lion chimney enough ability prepare"
     default_app_id = 1002
 
     mnemonic_1 = mnemonic_arg if mnemonic_arg is not None else default_mnemonic
-    app_id = app_id_arg if app_id_arg is not None else default_app_id
+    # An explicit --app-id wins over the manifest's app pool
+    apps = load_app_pool(app_manifest_path) if app_id_arg is None else None
+    app_id = app_id_arg if app_id_arg is not None else apps.app_ids[0] if apps else default_app_id
 
     print(f"--- Configuration ---")
     print(f"Using App ID: {app_id}")
@@ -63,6 +79,7 @@ def generate_data(
     print(f"---------------------\n")
 
     private_key = mnemonic.to_private_key(mnemonic_1)
+    pool = load_pool(account_pool_path)
 
     increment_count = 0
     decrement_count = 0
@@ -70,6 +87,11 @@ def generate_data(
     x_values = []
     y_values = []
     colors = []
+    # Per-race conditions written next to the outcomes for grouping, see stats.py
+    fee_ratios = []
+    skews = []
+    conditions = {}
+    node_pair = f"{non_part_1_url or 'non_part_1'} / {non_part_2_url or 'non_part_2'}"
 
     first_function = "None"
     color = ""
@@ -88,6 +110,11 @@ def generate_data(
         print("Using default utils.py function for client 2.")
         client2 = get_test_non_part_2()
 
+    # Without a fee bidder (or for the side it does not bid on) the increment pays the suggested
+    # fee and the decrement DECREMENT_FEE
+    if fee_bidder:
+        fee_bidder.bind(client2)
+
     script_path = pathlib.Path(__file__).resolve().parent
     contract_json_path = script_path.parent / "last_executed" / "artifacts" / "contract.json"
 
@@ -98,9 +125,65 @@ def generate_data(
     print("Initial Value: ", print_global_state(client1, app_id), "\n")
     print(f"Account Address: {account.address_from_private_key(private_key)}\n")
 
-    for i in range(500):
-        previous_value = print_global_state(client2, app_id)
-        print("Previous Value:", previous_value)
+    store = open_store(store_path)
+    if store:
+        run_id = store.start_run(
+            "generate_inc_dec_tx",
+            {"app_id": app_id, "app_ids": pool.all_app_ids() if pool else apps.app_ids if apps else [app_id], "iterations": iterations, "non_part_1": non_part_1_url, "non_part_2": non_part_2_url,
+             "fee_percentile": fee_bidder.percentile if fee_bidder else None,
+             "fee_side": fee_bidder.side if fee_bidder else None,
+             "decrement_fee": None if fee_bidder and fee_bidder.bids("decrement") else DECREMENT_FEE,
+             "resolve_every": resolve_every},
+        )
+
+    # With the call log the winners are decided in batches from the confirmed rounds, see call_log.RaceResolver
+    resolver = call_log.RaceResolver(client1, resolve_every) if resolve_every else None
+
+    undecided = 0
+
+    def record(i, winner, transactions):
+        nonlocal first_function, color, increment_count, decrement_count, undecided
+        fee_ratio, skew = conditions.pop(i)
+        # A race without a winner is kept in the store as undecided but is not an outcome
+        if winner is None:
+            print(f"Race {i} has no winner")
+            undecided += 1
+            if store:
+                store.record_iteration(run_id, i, None, transactions, client=client1)
+            return
+        if winner == "Decrement":
+            print("decrement first")
+            first_function = "Decrement"
+            decrement_count += 1
+            color = "red"
+        elif winner == "Increment":
+            print("increment first")
+            first_function = "Increment"
+            increment_count += 1
+            color = "blue"
+
+        x_values.append(i)
+        y_values.append(0) if first_function == "Increment" else y_values.append(1)
+        colors.append(0) if color == "blue" else colors.append(1)
+        fee_ratios.append(fee_ratio)
+        skews.append(skew)
+
+        if store:
+            store.record_iteration(run_id, i, y_values[-1], transactions, client=client1)
+
+    for i in range(iterations):
+        if pool:
+            # The methods are creator-only, so both calls come from the account that created the app
+            sender_1, key_1, app_id = pool.next_race()
+            sender_2, key_2 = sender_1, key_1
+        else:
+            if apps:
+                app_id = apps.next()
+            sender_1 = sender_2 = account.address_from_private_key(private_key)
+            key_1 = key_2 = private_key
+        if not resolver:
+            previous_value = print_global_state(client2, app_id)
+            print("Previous Value:", previous_value)
         atc1 = AtomicTransactionComposer()
         atc2 = AtomicTransactionComposer()
         note = str(time.time()).encode()
@@ -110,53 +193,67 @@ def generate_data(
             method_args=[],
             note=note,
             sp=client1.suggested_params(),
-            sender=account.address_from_private_key(private_key),
-            signer=AccountTransactionSigner(private_key),
+            sender=sender_1,
+            signer=AccountTransactionSigner(key_1),
         )
 
         note = str(time.time()).encode()
         params2 = client2.suggested_params()
         params2.flat_fee = True
-        params2.fee = 10000
+        params2.fee = DECREMENT_FEE
         atc2.add_method_call(
             app_id=app_id,
             method=contract.get_method_by_name("decrement"),
             method_args=[],
             note=note,
             sp=params2,
-            sender=account.address_from_private_key(private_key),
-            signer=AccountTransactionSigner(private_key),
+            sender=sender_2,
+            signer=AccountTransactionSigner(key_2),
         )
+        if fee_bidder and fee_bidder.bids("increment"):
+            fee_bidder.apply(atc1.txn_list[-1].txn, "increment")
+        if fee_bidder and fee_bidder.bids("decrement"):
+            fee_bidder.apply(atc2.txn_list[-1].txn, "decrement")
 
         with concurrent.futures.ThreadPoolExecutor() as executor:
             future2 = executor.submit(submit_atc, atc2, client2)
             future1 = executor.submit(submit_atc, atc1, client1)
 
-            txids1 = future1.result()
-            txids2 = future2.result()
+            txids1, submitted1 = future1.result()
+            txids2, submitted2 = future2.result()
 
             print("txids for atc1: ", txids1)
             print("txids for atc2: ", txids2)
-            wait_for_confirmation(client1, txids1[0])
-            wait_for_confirmation(client2, txids2[0])
-
-        updated_value = print_global_state(client1, app_id)
-        print("After Value: ", updated_value, "\n")
-
-        if updated_value == "increment":
-            print("decrement first")
-            first_function = "Decrement"
-            decrement_count += 1
-            color = "red"
-        elif updated_value == "decrement":
-            print("increment first")
-            first_function = "Increment"
-            increment_count += 1
-            color = "blue"
-
-        x_values.append(i)
-        y_values.append(0) if first_function == "Increment" else y_values.append(1)
-        colors.append(0) if color == "blue" else colors.append(1)
+            transaction_info_1 = wait_for_confirmation(client1, txids1[0])
+            transaction_info_2 = wait_for_confirmation(client2, txids2[0])
+
+        transactions = [
+            confirmed_transaction(txids1[0], "increment", transaction_info_1),
+            confirmed_transaction(txids2[0], "decrement", transaction_info_2),
+        ]
+        # Skew in milliseconds, positive when the decrement reached its node after the increment
+        conditions[i] = (round(atc2.txn_list[-1].txn.fee / atc1.txn_list[-1].txn.fee, 4),
+                         round((submitted2 - submitted1) * 1000, 1))
+        if resolver:
+            rounds = [info["confirmed-round"] if info else None for info in (transaction_info_1, transaction_info_2)]
+            decided = resolver.add((i, transactions), app_id, *rounds)
+            if i == iterations - 1:
+                decided += resolver.flush()
+        else:
+            updated_value = print_global_state(client1, app_id)
+            print("After Value: ", updated_value, "\n")
+            # The counter holds the method that executed last
+            winner = {"increment": "Decrement", "decrement": "Increment"}.get(updated_value)
+            decided = [((i, transactions), winner)]
+
+        stop = False
+        for (race, transactions), winner in decided:
+            record(race, winner, transactions)
+            # A race without a winner is not an observation
+            if early_stop and not stop and winner is not None:
+                stop = early_stop.update(winner == "Increment")
+        if stop:
+            break
 
     total_operations = increment_count + decrement_count
 
@@ -174,6 +271,9 @@ def generate_data(
                 "Increment Percentage",
                 "Decrement Count",
                 "Decrement Percentage",
+                "Fee Ratio",
+                "Node Pair",
+                "Submission Skew",
             ]
         )
         for i in range(len(x_values)):
@@ -186,22 +286,32 @@ def generate_data(
                     percentage_increment,
                     decrement_count,
                     percentage_decrement,
+                    fee_ratios[i],
+                    node_pair,
+                    skews[i],
                 ]
             )
 
+    stop_reason = early_stop.stop_reason if early_stop else f"Completed {len(x_values) + undecided} iterations ({undecided} without a winner)"
+    sequential.write_summary(increment_count, decrement_count, stop_reason)
+    if store:
+        # The bids actually made replace the fixed fee in the run's config
+        store.finish_run(run_id, stop_reason, fee_bidder.summary() if fee_bidder else None)
+        store.close()
+
 
 def submit_atc(atc, client):
-    return atc.submit(client)
+    """Submit `atc` and return its txids with the time.perf_counter() at which the node accepted it."""
+    txids = atc.submit(client)
+    return txids, time.perf_counter()
+
+
+STATE_READER = GlobalStateReader()
 
 
 def print_global_state(client, app_id):
-    response = client.application_info(app_id)
-    counter = None
-    for item in response["params"]["global-state"]:
-        key = base64.b64decode(item["key"]).decode("utf-8")
-        if key == "counter":
-            counter = base64.b64decode(item["value"]["bytes"]).decode("utf-8")
-            return counter
+    counter = STATE_READER.read_app(client, app_id, keys={"counter"}).get("counter")
+    return counter.decode("utf-8") if counter is not None else None
 
 
 import time
@@ -277,6 +387,37 @@ if __name__ == "__main__":
         type=str,
         help="The mnemonic phrase of the account to sign transactions.",
     )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=500,
+        help="Number of increment/decrement races to run.",
+    )
+    parser.add_argument(
+        "--account-pool",
+        type=str,
+        help="Account pool file (see account_pool.py --deploy). Each race runs on an app of the next account "
+             "instead of --app-id/--app-manifest.",
+    )
+    parser.add_argument(
+        "--app-manifest",
+        type=str,
+        help="App manifest (see app_deployer.py) whose apps are raced round-robin, one per iteration.",
+    )
+    parser.add_argument(
+        "--resolve-every",
+        type=int,
+        default=call_log.LOG_SLOTS // 2,
+        help=f"Decide the winners from the confirmed rounds and the app's call log every this many races "
+             f"(at most {call_log.LOG_SLOTS // 2}); 0 reads the counter before and after every race instead.",
+    )
+    sequential.add_arguments(parser)
+    fee_oracle.add_arguments(parser, sides=True)
+    parser.add_argument(
+        "--store",
+        type=str,
+        help="Experiment store (SQLite file, see experiment_store.py) to write runs and transactions into.",
+    )
     args = parser.parse_args()
 
     generate_data(
@@ -284,4 +425,11 @@ if __name__ == "__main__":
         non_part_2_url=args.non_part_2,
         app_id_arg=args.app_id,
         mnemonic_arg=args.mnemonic,
+        account_pool_path=args.account_pool,
+        iterations=args.iterations,
+        early_stop=sequential.from_args(args),
+        store_path=args.store,
+        app_manifest_path=args.app_manifest,
+        fee_bidder=fee_oracle.from_args(args),
+        resolve_every=args.resolve_every,
     )
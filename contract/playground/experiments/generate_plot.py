@@ -1,17 +1,28 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MaxNLocator
 import matplotlib.patches as mpatches
+from playground.experiments.plotting import binned_counts, is_large, save_figure, use_headless
+
 
+def generate_plot(headless: bool = False, output: str = "plot.svg"):
+    if headless:
+        use_headless()
 
-def generate_plot():
     # Read the data from the CSV file
     data = pd.read_csv("experiment_data_1.csv")
 
     # Separate the data into x_values, y_values, colors and additional information
-    x_values = data["Iteration"].tolist()
-    y_values = data["Function"].tolist()
-    colors = data["Color"].tolist()
+    x_values = data["Iteration"].to_numpy()
+    y_values = data["Function"].to_numpy()
+    colors = data["Color"].to_numpy()
     increment_count = data["Increment Count"].tolist()[
         0
     ]  # these values are same in every row, so just take the first one
@@ -23,16 +34,22 @@ def generate_plot():
     increment_info = f"Increment: {increment_count} times ({percentage_increment:.2f}%)"
     decrement_info = f"Decrement: {decrement_count} times ({percentage_decrement:.2f}%)"
 
-    # Plot data
-    scatter = plt.scatter(x_values, y_values, c=colors, cmap="bwr")
+    # Plot data, binned into stacked bars for large runs
+    if is_large(len(x_values)):
+        edges, increments, decrements = binned_counts(x_values, y_values)
+        widths = np.diff(edges)
+        plt.bar(edges[:-1], increments, width=widths, align="edge", color="blue")
+        plt.bar(edges[:-1], decrements, width=widths, align="edge", color="red", bottom=increments)
+        plt.ylabel("Races won per bin")
+    else:
+        scatter = plt.scatter(x_values, y_values, c=colors, cmap="bwr")
+        plt.ylabel("Functions Executed")
+        # Define x-tick labels and color bar
+        plt.yticks([0, 1])
 
     # Set plot title and labels
     plt.title("Frequency of Increment and Decrement Functions")
     plt.xlabel("Iterations")
-    plt.ylabel("Functions Executed")
-
-    # Define x-tick labels and color bar
-    plt.yticks([0, 1])
 
     ax = plt.gca()  # get the current axes
     ax.xaxis.set_major_locator(
@@ -49,9 +66,13 @@ def generate_plot():
     plt.text(0.9, 0.75, increment_info, fontsize=10, color="blue")
     plt.text(0.9, 0.7, decrement_info, fontsize=10, color="red")
 
-    plt.savefig("plot.svg", format="svg")
-    plt.show()
+    save_figure(output, len(x_values), show=not headless)
 
 
 if __name__ == "__main__":
-    generate_plot()
+    parser = argparse.ArgumentParser(description="Plot the outcome of every race in experiment_data_1.csv.")
+    parser.add_argument("--headless", action="store_true", help="Render with the Agg backend and don't show the plot.")
+    parser.add_argument("--output", default="plot.svg", help="Output file; large runs are written as PNG.")
+    args = parser.parse_args()
+
+    generate_plot(headless=args.headless, output=args.output)
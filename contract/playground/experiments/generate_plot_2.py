@@ -1,59 +1,72 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MaxNLocator
 import matplotlib.patches as mpatches
+from playground.experiments.analysis import (
+    label_proposers,
+    load_proposer_labels,
+    win_counts,
+)
+from playground.experiments.plotting import (
+    is_large,
+    plot_win_rate,
+    render_proposer_figures,
+    save_figure,
+    use_headless,
+)
+
 
+def generate_plot(headless: bool = False, output: str = "plot.svg", per_proposer: bool = False):
+    if headless:
+        use_headless()
 
-def generate_plot():
     # Read the data from the CSV file
     data = pd.read_csv("experiment_data_2.csv")
 
     # Separate the data into variables
-    x_values = data["Iteration"].tolist()
-    y_values = data["Function"].tolist()
-    proposers = data["Proposer 1"].tolist()
-
-    # Map colors and calculate percentages based on function and proposer combination
-    colors = []
-    part1_increment = 0
-    part1_decrement = 0
-    part2_increment = 0
-    part2_decrement = 0
-
-    for i in range(len(y_values)):
-        if proposers[i] == "EMGUFI4UI3CF7VIKSAVFU65RLA6FAPSVU6TM4IZUYOVXSVR7HSZJGGOQUU":
-            if y_values[i] == 0:
-                colors.append("lime")  # bright green
-                part1_increment += 1
-            else:
-                colors.append("cyan")  # bright cyan
-                part1_decrement += 1
-        else:
-            if y_values[i] == 0:
-                colors.append("magenta")  # bright magenta
-                part2_increment += 1
-            else:
-                colors.append("yellow")  # bright yellow
-                part2_decrement += 1
-
-    total_part1 = part1_increment + part1_decrement
-    total_part2 = part2_increment + part2_decrement
-
-    lime_percentage = part1_increment / total_part1 * 100
-    cyan_percentage = part1_decrement / total_part1 * 100
-    magenta_percentage = part2_increment / total_part2 * 100
-    yellow_percentage = part2_decrement / total_part2 * 100
-
-    # Plot data
-    plt.scatter(x_values, y_values, c=colors)
+    x_values = data["Iteration"].to_numpy()
+    y_values = data["Function"].to_numpy()
+
+    # Every proposer other than part1 is counted as part2
+    labels = load_proposer_labels("two_node")
+    parts = label_proposers(data, labels, default_label="part2")
+    counts = win_counts(data, labels, default_label="part2")
+
+    # Map colors based on function and proposer combination
+    increment_colors = {"part1": "lime", "part2": "magenta"}  # bright green / magenta
+    decrement_colors = {"part1": "cyan", "part2": "yellow"}  # bright cyan / yellow
+    colors = np.where(y_values == 0, parts.map(increment_colors), parts.map(decrement_colors))
+
+    lime_percentage = counts.loc["part1", "increment_percentage"]
+    cyan_percentage = counts.loc["part1", "decrement_percentage"]
+    magenta_percentage = counts.loc["part2", "increment_percentage"]
+    yellow_percentage = counts.loc["part2", "decrement_percentage"]
+
+    proposer_colors = {part: (increment_colors[part], decrement_colors[part]) for part in increment_colors}
+    if per_proposer:
+        render_proposer_figures(x_values, y_values, parts, proposer_colors)
+
+    # Plot data, as rolling win rates per proposer for large runs
+    if is_large(len(data)):
+        for part, part_colors in proposer_colors.items():
+            mask = (parts == part).to_numpy()
+            plot_win_rate(plt.gca(), x_values[mask], y_values[mask], color=part_colors[0], label=part)
+    else:
+        plt.scatter(x_values, y_values, c=colors)
+        plt.ylabel("Functions Executed")
+        # Define x-tick labels
+        plt.yticks([0, 1], ["Decrement", "Increment"])
 
     # Set plot title and labels
     plt.title("Function Call Analysis Based on Proposer")
     plt.xlabel("Iterations")
-    plt.ylabel("Functions Executed")
-
-    # Define x-tick labels
-    plt.yticks([0, 1], ["Decrement", "Increment"])
 
     ax = plt.gca()  # get the current axes
     ax.xaxis.set_major_locator(
@@ -77,9 +90,14 @@ def generate_plot():
     ]
     plt.legend(handles=patches, loc="best")
 
-    plt.savefig("plot.svg", format="svg")
-    plt.show()
+    save_figure(output, len(data), show=not headless)
 
 
 if __name__ == "__main__":
-    generate_plot()
+    parser = argparse.ArgumentParser(description="Plot the races in experiment_data_2.csv by block proposer.")
+    parser.add_argument("--headless", action="store_true", help="Render with the Agg backend and don't show the plot.")
+    parser.add_argument("--output", default="plot.svg", help="Output file; large runs are written as PNG.")
+    parser.add_argument("--per-proposer", action="store_true", help="Also write one PNG per proposer, rendered in parallel.")
+    args = parser.parse_args()
+
+    generate_plot(headless=args.headless, output=args.output, per_proposer=args.per_proposer)
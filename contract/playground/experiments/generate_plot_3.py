@@ -1,87 +1,104 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MaxNLocator
 import matplotlib.patches as mpatches
+from playground.experiments.analysis import (
+    label_proposers,
+    load_proposer_labels,
+    win_counts,
+)
+from playground.experiments.plotting import (
+    is_large,
+    plot_win_rate,
+    render_proposer_figures,
+    save_figure,
+    use_headless,
+)
+
+
+def generate_plot(headless: bool = False, output: str = "plot.svg", per_proposer: bool = False):
+    if headless:
+        use_headless()
 
-
-def generate_plot():
     # Read the data from the CSV file
     data = pd.read_csv("experiment_data_3.csv")
 
     # Separate the data into variables
-    x_values = data["Iteration"].tolist()
-    y_values = data["Function"].tolist()
-    proposers = data["Proposer 1"].tolist()
-
-    # Map colors and calculate percentages based on function and proposer combination
-    colors = []
-    part_counts = {
-        part: {"increment": 0, "decrement": 0}
-        for part in ["Alice", "Bob", "Thomas", "Alex"]
-    }
+    x_values = data["Iteration"].to_numpy()
+    y_values = data["Function"].to_numpy()
 
-    color_map = {
-        "Alice": {"0": "lime", "1": "cyan"},
-        "Bob": {"0": "magenta", "1": "yellow"},
-        "Thomas": {"0": "blue", "1": "red"},
-        "Alex": {"0": "green", "1": "orange"},
-    }
+    labels = load_proposer_labels("testbed_names")
+    parts = label_proposers(data, labels)
+    part_counts = win_counts(data, labels)
 
-    proposer_map = {
-        "FJ4Z6WHDTIBSA72XNN55MUIUZQUYFFBKXTU4EDFAR5XR4R6CV5CR6DYEHU": "Alice",
-        "NGVE57RDBABVTWYKUPBOVOHXZ2JHBVLOJXZNG2BVKQZTLGM7XH4VHLQP64": "Thomas",
-        "PME5E5SOV33LLEYEZNNJAUAPMY6ZS4BBWQ432YG456OQVHZCFALCFEH7KU": "Bob",
-        "SKV2WCTAYCA7YX2YIUH6WQBLNJ4JYMB6TNK737DIL5Z4N6LG52XXKXU4VM": "Alex",
+    # Map colors based on function and proposer combination
+    color_map = {
+        "Alice": {0: "lime", 1: "cyan"},
+        "Bob": {0: "magenta", 1: "yellow"},
+        "Thomas": {0: "blue", 1: "red"},
+        "Alex": {0: "green", 1: "orange"},
     }
-
-    for i in range(len(y_values)):
-        part = proposer_map[proposers[i]]
-        function = str(y_values[i])
-        colors.append(color_map[part][function])
-
-        if function == "0":
-            part_counts[part]["increment"] += 1
-        else:
-            part_counts[part]["decrement"] += 1
-
-    # Plot data
-    plt.scatter(x_values, y_values, c=colors)
+    colors = np.where(
+        y_values == 0,
+        parts.map({part: c[0] for part, c in color_map.items()}),
+        parts.map({part: c[1] for part, c in color_map.items()}),
+    )
+
+    proposer_colors = color_map
+    if per_proposer:
+        render_proposer_figures(x_values, y_values, parts, proposer_colors)
+
+    # Plot data, as rolling win rates per proposer for large runs
+    if is_large(len(data)):
+        for part, part_colors in proposer_colors.items():
+            mask = (parts == part).to_numpy()
+            plot_win_rate(plt.gca(), x_values[mask], y_values[mask], color=part_colors[0], label=part)
+    else:
+        plt.scatter(x_values, y_values, c=colors)
+        plt.ylabel("Functions Executed")
+        # Define x-tick labels
+        plt.yticks([0, 1], ["Decrement", "Increment"])
 
     # Set plot title and labels
     plt.title("Function Call Analysis Based on Proposer")
     plt.xlabel("Iterations")
-    plt.ylabel("Functions Executed")
-
-    # Define x-tick labels
-    plt.yticks([0, 1], ["Decrement", "Increment"])
 
     ax = plt.gca()
     ax.xaxis.set_major_locator(MaxNLocator(integer=True))
 
     # Create custom legend
     patches = []
-    for part, counts in part_counts.items():
-        total = counts["increment"] + counts["decrement"]
-        increment_percentage = counts["increment"] / total * 100
-        decrement_percentage = counts["decrement"] / total * 100
+    for part, counts in part_counts.iterrows():
         patches.extend(
             [
                 mpatches.Patch(
-                    color=color_map[part]["0"],
-                    label=f"Increment ({part}): {increment_percentage:.2f}%",
+                    color=color_map[part][0],
+                    label=f"Increment ({part}): {counts['increment_percentage']:.2f}%",
                 ),
                 mpatches.Patch(
-                    color=color_map[part]["1"],
-                    label=f"Decrement ({part}): {decrement_percentage:.2f}%",
+                    color=color_map[part][1],
+                    label=f"Decrement ({part}): {counts['decrement_percentage']:.2f}%",
                 ),
             ]
         )
 
     plt.legend(handles=patches, loc="best")
 
-    plt.savefig("plot.svg", format="svg")
-    plt.show()
+    save_figure(output, len(data), show=not headless)
 
 
 if __name__ == "__main__":
-    generate_plot()
+    parser = argparse.ArgumentParser(description="Plot the races in experiment_data_3.csv by block proposer.")
+    parser.add_argument("--headless", action="store_true", help="Render with the Agg backend and don't show the plot.")
+    parser.add_argument("--output", default="plot.svg", help="Output file; large runs are written as PNG.")
+    parser.add_argument("--per-proposer", action="store_true", help="Also write one PNG per proposer, rendered in parallel.")
+    args = parser.parse_args()
+
+    generate_plot(headless=args.headless, output=args.output, per_proposer=args.per_proposer)
@@ -29,6 +29,7 @@ from playground.experiments.utils import (
     get_test_non_part_2,
     get_test_non_part_1,
 )
+from playground.experiments.experiment_store import confirmed_transaction, open_store
 from dotenv import load_dotenv
 import csv
 
@@ -51,6 +52,7 @@ def generate_data(
     non_part_2_url: str | None = None,
     app_id_arg: int | None = None,
     mnemonic_arg: str | None = None,
+    store_path: str | None = None,
 ):
     default_mnemonic = "kitchen subway tomato hire inspire pepper camera frog about kangaroo bunker express length song act oven world quality around elegant lion chimney enough ability prepare"
     default_app_id = 1002
@@ -96,6 +98,12 @@ def generate_data(
         js = f.read()
     contract = abi.Contract.from_json(js)
 
+    store = open_store(store_path)
+    if store:
+        run_id = store.start_run(
+            "generate_proposer_inc_dec_tx", {"app_id": app_id, "non_part_1": non_part_1_url, "non_part_2": non_part_2_url}
+        )
+
     for i in range(500):
         previous_value = print_global_state(client2, app_id)
         print("Previous Value:", previous_value)
@@ -151,10 +159,22 @@ def generate_data(
         x_values.append(i)
         y_values.append(0) if first_function == "Increment" else y_values.append(1)
         colors.append(0) if color == "blue" else colors.append(1)
+
+        if store:
+            store.add_block(confirmed_round_1, proposer_1)
+            store.add_block(confirmed_round_2, proposer_2)
+            store.record_iteration(run_id, i, y_values[-1], [
+                confirmed_transaction(txids1[0], "decrement", transaction_info_1),
+                confirmed_transaction(txids2[0], "increment", transaction_info_2),
+            ])
         print("before sleep")
         time.sleep(2)
         print("after sleep")
 
+    if store:
+        store.finish_run(run_id, f"Completed {len(x_values)} iterations")
+        store.close()
+
     total_operations = increment_count + decrement_count
 
     percentage_increment = (increment_count / total_operations) * 100
@@ -274,6 +294,11 @@ if __name__ == "__main__":
         type=str,
         help="The mnemonic phrase of the account to sign transactions.",
     )
+    parser.add_argument(
+        "--store",
+        type=str,
+        help="Experiment store (SQLite file, see experiment_store.py) to write runs, transactions and proposers into.",
+    )
     args = parser.parse_args()
 
     generate_data(
@@ -281,4 +306,5 @@ if __name__ == "__main__":
         non_part_2_url=args.non_part_2,
         app_id_arg=args.app_id,
         mnemonic_arg=args.mnemonic,
+        store_path=args.store,
     )
@@ -14,32 +14,18 @@ from playground.experiments.utils import get_mainnet_algod_client
 from playground.experiments.utils import get_mainnet_indexer_client
 from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from time import sleep
 import random
 
 load_dotenv()  # take environment variables from .env.
 
-mnemonic_1 = os.getenv("MNEMONIC")
-private_key = mnemonic.to_private_key(mnemonic_1)
-account_address = account.address_from_private_key(private_key)
+CONGESTION_THRESHOLD = 2000
 
-algod_indexer = get_TUM_indexer_client()
-algod = get_mainnet_TUM_algod_client()
 
-start_round = 1
-# Get the latest block's round number
-end_round = 0
-try:
-    status_info = algod.status()
-    end_round = status_info.get("last-round")
-except Exception as e:
-    print(f"An error occurred while fetching the latest round: {e}")
-
-print(f"End round: {end_round}")
-
-
-def fetch_block_info(round_number):
+def fetch_block_info(algod_indexer, round_number, threshold=CONGESTION_THRESHOLD):
     retries = 2  # Number of retries
+    num_txns = None
     while retries > 0:
         try:
             block_info = algod_indexer.block_info(round_number)
@@ -48,7 +34,7 @@ def fetch_block_info(round_number):
             num_txns = len(transactions)
 
             print(f"Block {round_number} has {num_txns} transactions.")
-            if num_txns > 2000:
+            if num_txns > threshold:
                 print(f"Block {round_number} has {num_txns} transactions.")
                 with open("results.txt", "a") as f:
                     f.write(f"Block {round_number} has {num_txns} transactions.\n")
@@ -61,8 +47,37 @@ def fetch_block_info(round_number):
             sleep(sleep_duration)  # Sleep for 2+ seconds before retrying
         sleep_duration = 0.01
         sleep(sleep_duration)  # Sleep for 2+ seconds before retrying
+    return num_txns
+
+
+def scan_congestion(algod_indexer, start_round, end_round, max_workers=1):
+    """Count the transactions of every block in [start_round, end_round]."""
+    # Use a ThreadPool to fetch blocks in parallel
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(
+            executor.map(
+                partial(fetch_block_info, algod_indexer),
+                range(start_round, end_round + 1),
+            )
+        )
+
+
+def main():
+    algod_indexer = get_TUM_indexer_client()
+    algod = get_mainnet_TUM_algod_client()
+
+    # Get the latest block's round number
+    end_round = 0
+    try:
+        status_info = algod.status()
+        end_round = status_info.get("last-round")
+    except Exception as e:
+        print(f"An error occurred while fetching the latest round: {e}")
+
+    print(f"End round: {end_round}")
+
+    scan_congestion(algod_indexer, end_round - 2, end_round, max_workers=1)  # Reduced number of workers
 
 
-# Use a ThreadPool to fetch blocks in parallel
-with ThreadPoolExecutor(max_workers=1) as executor:  # Reduced number of workers
-    executor.map(fetch_block_info, range(end_round - 2, end_round + 1))
+if __name__ == "__main__":
+    main()
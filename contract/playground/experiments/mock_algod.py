@@ -0,0 +1,446 @@
+"""
+Local stand-in for the testbed algod/indexer nodes.
+
+Every node is a small HTTP server that speaks the subset of the algod v2 and
+indexer REST APIs used by the experiment scripts, so the real `AlgodClient` /
+`IndexerClient` can be pointed at it unchanged. All nodes started from the same
+`MockLedger` share one chain: rounds advance every `block_time` seconds and the
+transactions that reached any node before a round boundary are put into that
+round's block. Each node adds its own request latency on top.
+
+App calls are evaluated like the LastExecuted contract: the first app argument
+is looked up in `method_names` and the method name is written to the `counter`
+global key of the called app, and increment/decrement calls are appended to
+the call log like LastExecuted.record_call does (see call_log.py).
+"""
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlparse
+
+import msgpack
+from algosdk import abi, account, encoding, transaction
+
+from playground.experiments import call_log
+
+MOCK_GENESIS_ID = "mocknet-v1"
+MOCK_GENESIS_HASH = base64.b64encode(hashlib.sha256(b"mocknet").digest()).decode()
+CALL_LOG_METHODS = {"increment": call_log.INCREMENT, "decrement": call_log.DECREMENT}
+
+
+def method_names_from_contract(contract: abi.Contract) -> dict:
+    """Map ABI selectors of a contract to the method names stored in `counter`."""
+    return {method.get_selector(): method.name for method in contract.methods}
+
+
+def _to_json(value):
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    if isinstance(value, dict):
+        return {str(k): _to_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_json(v) for v in value]
+    return value
+
+
+class MockLedger:
+    def __init__(
+        self,
+        block_time: float = 0.05,
+        start_round: int = 1000,
+        method_names: dict | None = None,
+        proposers: list[str] | None = None,
+        ordering: str = "arrival",
+    ):
+        self.block_time = block_time
+        self.start_round = start_round
+        self.method_names = method_names or {}
+        self.proposers = proposers or [account.generate_account()[1] for _ in range(4)]
+        self.ordering = ordering
+
+        self._t0 = time.monotonic()
+        self._lock = threading.Lock()
+        self.round = start_round
+        self.pending = []
+        self.confirmed = {}
+        self.blocks = {}
+        self.apps = {}
+        self.app_creators = {}
+        self.created_apps = {}
+        self.next_app_id = 1001
+        self.balances = {}
+        self.requests = []
+
+    def create_app(self, app_id: int, creator: str, state: dict | None = None):
+        with self._lock:
+            self.apps[app_id] = dict(state or {b"counter": b"None"})
+            self.app_creators[app_id] = creator
+            self.next_app_id = max(self.next_app_id, app_id + 1)
+
+    def seed_blocks(self, count: int, txns_per_block: int, notes=()):
+        """Append `count` historical blocks of synthetic payments.
+
+        `notes` are spread over the blocks so scanners have something to find.
+        The clock is shifted so the seeded rounds are already in the past.
+        """
+        notes = list(notes)
+        total = count * txns_per_block
+        note_at = {k * total // len(notes): note for k, note in enumerate(notes)} if notes else {}
+        sender = encoding.decode_address(self.proposers[0])
+        with self._lock:
+            for i in range(count):
+                self.round += 1
+                txns = []
+                for j in range(txns_per_block):
+                    txn = {
+                        "amt": 1,
+                        "fee": 1000 + j,
+                        "fv": self.round - 1,
+                        "lv": self.round + 999,
+                        "rcv": sender,
+                        "snd": sender,
+                        "type": "pay",
+                    }
+                    note = note_at.get(i * txns_per_block + j)
+                    if note is not None:
+                        txn["note"] = note.encode()
+                    txns.append({"hgi": True, "sig": bytes(64), "txn": txn})
+                self._store_block(self.round, txns)
+            self._t0 -= count * self.block_time
+
+    def current_round(self) -> int:
+        with self._lock:
+            self._advance()
+            return self.round
+
+    def submit(self, raw: bytes) -> str:
+        unpacker = msgpack.Unpacker(BytesIO(raw), raw=False, strict_map_key=False)
+        stxns = list(unpacker)
+        txids = [
+            transaction.Transaction.undictify(stxn["txn"]).get_txid() for stxn in stxns
+        ]
+        arrival = time.monotonic()
+        with self._lock:
+            self._advance()
+            for stxn, txid in zip(stxns, txids):
+                self.pending.append((arrival, len(self.pending), txid, stxn))
+        return txids[0]
+
+    def wait_for_round_after(self, round_num: int, timeout: float = 60.0) -> int:
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._advance()
+                if self.round > round_num or time.monotonic() > deadline:
+                    return self.round
+                next_boundary = self._t0 + (self.round + 1 - self.start_round) * self.block_time
+            time.sleep(max(0.0, next_boundary - time.monotonic()) + 0.0005)
+
+    def _advance(self):
+        target = self.start_round + int((time.monotonic() - self._t0) / self.block_time)
+        while self.round < target:
+            self.round += 1
+            boundary = self._t0 + (self.round - self.start_round) * self.block_time
+            included = [p for p in self.pending if p[0] <= boundary]
+            self.pending = [p for p in self.pending if p[0] > boundary]
+            if self.ordering == "fee":
+                included.sort(key=lambda p: (-p[3]["txn"].get("fee", 0), p[0], p[1]))
+            txns = []
+            for _, _, txid, stxn in included:
+                created = self._apply(stxn["txn"])
+                if created is not None:
+                    self.created_apps[txid] = created
+                self.confirmed[txid] = (self.round, stxn)
+                block_stxn = dict(stxn)
+                block_stxn["txn"] = {
+                    k: v for k, v in stxn["txn"].items() if k not in ("gen", "gh")
+                }
+                block_stxn["hgi"] = True
+                txns.append(block_stxn)
+            self._store_block(self.round, txns, [p[2] for p in included])
+
+    def _store_block(self, round_num: int, txns: list, txids: list | None = None):
+        proposer = self.proposers[round_num % len(self.proposers)]
+        self.blocks[round_num] = {"txns": txns, "txids": txids or [], "proposer": proposer}
+
+    def _apply(self, txn: dict):
+        sender = encoding.encode_address(txn["snd"])
+        if txn.get("type") == "pay":
+            amount = txn.get("amt", 0)
+            receiver = encoding.encode_address(txn["rcv"])
+            self.balances[sender] = self.balances.get(sender, 10**15) - amount - txn.get("fee", 0)
+            self.balances[receiver] = self.balances.get(receiver, 0) + amount
+        elif txn.get("type") == "appl":
+            app_id = txn.get("apid", 0)
+            args = txn.get("apaa", [])
+            if app_id == 0 and not args:
+                # Bare create, returns the new app ID
+                app_id = self.next_app_id
+                self.next_app_id += 1
+                self.apps[app_id] = {b"counter": b"None"}
+                self.app_creators[app_id] = sender
+                return app_id
+            if app_id in self.apps and args and args[0] in self.method_names:
+                method = self.method_names[args[0]]
+                state = self.apps[app_id]
+                state[b"counter"] = method.encode()
+                if method in CALL_LOG_METHODS:
+                    seq = state.get(b"seq", 0)
+                    state[call_log.log_key(seq)] = call_log.encode_log_entry(
+                        CALL_LOG_METHODS[method], self.round, seq, sender
+                    )
+                    state[b"seq"] = seq + 1
+
+    def record_request(self, node: int, method: str, path: str):
+        self.requests.append((time.monotonic(), node, method, path))
+
+    # Response bodies -------------------------------------------------------
+
+    def status(self) -> dict:
+        round_num = self.current_round()
+        return {
+            "last-round": round_num,
+            "last-version": "future",
+            "next-version": "future",
+            "next-version-round": round_num + 1,
+            "time-since-last-round": 0,
+            "catchup-time": 0,
+        }
+
+    def suggested_params(self) -> dict:
+        return {
+            "consensus-version": "future",
+            "fee": 0,
+            "genesis-hash": MOCK_GENESIS_HASH,
+            "genesis-id": MOCK_GENESIS_ID,
+            "last-round": self.current_round(),
+            "min-fee": 1000,
+        }
+
+    def pending_info(self, txid: str) -> dict | None:
+        with self._lock:
+            self._advance()
+            if txid in self.confirmed:
+                round_num, stxn = self.confirmed[txid]
+                info = {"confirmed-round": round_num, "pool-error": "", "txn": _to_json(stxn)}
+                if txid in self.created_apps:
+                    info["application-index"] = self.created_apps[txid]
+                return info
+            if any(p[2] == txid for p in self.pending):
+                return {"confirmed-round": 0, "pool-error": "", "txn": {}}
+        return None
+
+    def _global_state(self, app_id: int) -> list:
+        state = []
+        for key, value in self.apps[app_id].items():
+            if isinstance(value, int):
+                state.append({"key": _to_json(key), "value": {"type": 2, "bytes": "", "uint": value}})
+            else:
+                state.append({"key": _to_json(key), "value": {"type": 1, "bytes": _to_json(value), "uint": 0}})
+        return state
+
+    def application_info(self, app_id: int) -> dict | None:
+        with self._lock:
+            self._advance()
+            if app_id not in self.apps:
+                return None
+            return {
+                "id": app_id,
+                "params": {"creator": self.app_creators[app_id], "global-state": self._global_state(app_id)},
+            }
+
+    def account_info(self, address: str) -> dict:
+        with self._lock:
+            self._advance()
+            created = [
+                {"id": app_id, "params": {"creator": address, "global-state": self._global_state(app_id)}}
+                for app_id, creator in self.app_creators.items()
+                if creator == address
+            ]
+            return {
+                "address": address,
+                "amount": self.balances.get(address, 10**15),
+                "assets": [],
+                "created-apps": created,
+                "apps-local-state": [],
+                "round": self.round,
+            }
+
+    def block(self, round_num: int) -> dict | None:
+        with self._lock:
+            self._advance()
+            return self.blocks.get(round_num)
+
+
+class MockNode(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, ledger: MockLedger, index: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, kind: str = "algod"):
+        super().__init__(("127.0.0.1", 0), _MockHandler)
+        self.ledger = ledger
+        self.index = index
+        self.latency = latency
+        self.jitter = jitter
+        self.kind = kind
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "MockNode":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    server: MockNode
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay(self):
+        delay = self.server.latency
+        if self.server.jitter:
+            delay += random.uniform(0, self.server.jitter)
+        if delay:
+            time.sleep(delay)
+
+    def _reply(self, body, status=200, fmt="json"):
+        if fmt == "msgpack":
+            payload = msgpack.packb(body, use_bin_type=True)
+            content_type = "application/msgpack"
+        else:
+            payload = json.dumps(body).encode()
+            content_type = "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _not_found(self, message):
+        self._reply({"message": message}, status=404)
+
+    def do_POST(self):
+        self._delay()
+        ledger = self.server.ledger
+        path = urlparse(self.path).path
+        ledger.record_request(self.server.index, "POST", path)
+        if path == "/v2/transactions":
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self._reply({"txId": ledger.submit(body)})
+        elif path == "/v2/teal/compile":
+            # Stand-in bytecode: the version byte followed by the source digest
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            program = bytes([8]) + hashlib.sha256(body).digest()
+            self._reply({
+                "hash": encoding.encode_address(hashlib.sha512(b"Program" + program).digest()[:32]),
+                "result": base64.b64encode(program).decode(),
+            })
+        else:
+            self._not_found(f"unsupported path {path}")
+
+    def do_GET(self):
+        self._delay()
+        ledger = self.server.ledger
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        fmt = query.get("format", ["json"])[0]
+        parts = url.path.strip("/").split("/")[1:]
+        ledger.record_request(self.server.index, "GET", url.path)
+
+        if url.path == "/versions":
+            self._reply({
+                "genesis_hash_b64": MOCK_GENESIS_HASH,
+                "genesis_id": MOCK_GENESIS_ID,
+                "build": {"major": 0, "minor": 0, "build_number": 0, "commit_hash": "mock", "branch": "mock",
+                          "channel": "mock"},
+                "versions": ["v2"],
+            })
+        elif parts == ["status"]:
+            self._reply(ledger.status())
+        elif parts[:2] == ["status", "wait-for-block-after"]:
+            ledger.wait_for_round_after(int(parts[2]))
+            self._reply(ledger.status())
+        elif parts == ["transactions", "params"]:
+            self._reply(ledger.suggested_params())
+        elif parts[:2] == ["transactions", "pending"]:
+            info = ledger.pending_info(parts[2])
+            if info is None:
+                self._not_found("txn does not exist")
+            else:
+                self._reply(info)
+        elif parts[0] == "applications" and len(parts) == 2:
+            info = ledger.application_info(int(parts[1]))
+            if info is None:
+                self._not_found("application does not exist")
+            else:
+                self._reply(info)
+        elif parts[0] == "accounts" and len(parts) == 2:
+            self._reply(ledger.account_info(parts[1]))
+        elif parts[0] == "blocks" and len(parts) == 3 and parts[2] == "txids":
+            block = ledger.block(int(parts[1]))
+            if block is None:
+                self._not_found("block not found")
+            else:
+                self._reply({"blockTxids": block["txids"]})
+        elif parts[0] == "blocks" and len(parts) == 2:
+            self._block(ledger, int(parts[1]), fmt)
+        else:
+            self._not_found(f"unsupported path {url.path}")
+
+    def _block(self, ledger: MockLedger, round_num: int, fmt: str):
+        block = ledger.block(round_num)
+        if block is None:
+            self._not_found("ledger does not have entry")
+            return
+        if self.server.kind == "indexer":
+            transactions = []
+            for stxn in block["txns"]:
+                txn = stxn["txn"]
+                transactions.append(
+                    {"fee": txn.get("fee", 0), "tx-type": txn.get("type"), "note": _to_json(txn.get("note", b""))}
+                )
+            self._reply({"round": round_num, "transactions": transactions})
+            return
+        header = {"rnd": round_num, "gen": MOCK_GENESIS_ID, "txns": block["txns"]}
+        if fmt == "msgpack":
+            cert = {"prop": {"oprop": encoding.decode_address(block["proposer"])}, "rnd": round_num}
+            self._reply({"block": header, "cert": cert}, fmt="msgpack")
+        else:
+            self._reply({"block": _to_json(header)})
+
+
+def start_mock_network(
+    latencies: list[float],
+    block_time: float = 0.05,
+    jitter: float = 0.0,
+    with_indexer: bool = False,
+    **ledger_kwargs,
+) -> tuple[MockLedger, list[MockNode]]:
+    """Start one node per entry in `latencies` sharing a single ledger.
+
+    With `with_indexer` an extra indexer node (latency of the first node) is
+    appended to the returned list.
+    """
+    ledger = MockLedger(block_time=block_time, **ledger_kwargs)
+    nodes = [
+        MockNode(ledger, index=i, latency=latency, jitter=jitter).start()
+        for i, latency in enumerate(latencies)
+    ]
+    if with_indexer:
+        nodes.append(
+            MockNode(ledger, index=len(nodes), latency=latencies[0], jitter=jitter, kind="indexer").start()
+        )
+    return ledger, nodes
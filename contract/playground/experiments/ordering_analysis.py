@@ -0,0 +1,144 @@
+"""
+Does fee decide the order of transactions inside a block?
+
+For every block in a range this computes the Spearman rank correlation
+between a transaction's position in the payset and its fee per byte. Atomic
+groups are ranked as one unit with the group's total fee over its total
+size, since the transaction pool prioritises whole groups. Fee per byte uses
+the size of the signed transaction, without the apply data (logs, inner
+transactions, state deltas) the block stores with it. A correlation
+near -1 means higher fee per byte comes first, near 0 means the fee does not
+matter for the ordering.
+
+Blocks are fetched and analysed in parallel threads, each block with a few
+vectorised NumPy operations. The per-block results are written to a CSV and
+summarised as distributions by proposer and by congestion level (number of
+transactions in the block).
+
+    python ordering_analysis.py --start 30000000 --end 30010000 --workers 16
+    python ordering_analysis.py --input block_ordering.csv --proposers testbed
+
+--proposers names a set of proposers.json (testbed, testbed_names, two_node);
+without it proposers are grouped by address.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+import pandas as pd
+
+from playground.experiments.analysis import PROPOSERS_FILE, label_proposers, load_proposer_labels
+from playground.experiments.blocks import (
+    RateLimiter, block_proposer, fee_per_byte, fetch_raw_block, fetch_with_retry,
+)
+
+DEFAULT_OUTPUT = "block_ordering.csv"
+PROPOSER_COLUMN = "Proposer"
+CORRELATION_COLUMN = "Spearman"
+# Upper bounds of the transaction count per congestion level; the last level
+# starts at historical_congenstion.CONGESTION_THRESHOLD
+CONGESTION_BINS = [0, 10, 100, 500, 2000, np.inf]
+CONGESTION_LABELS = ["idle", "low", "medium", "high", "congested"]
+QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+def average_ranks(values: np.ndarray) -> np.ndarray:
+    """1-based ranks of `values`, ties getting the average of their ranks."""
+    order = np.argsort(values, kind="mergesort")
+    ordered = values[order]
+    starts = np.concatenate(([True], ordered[1:] != ordered[:-1]))
+    dense = np.empty(len(values), dtype=np.int64)
+    dense[order] = np.cumsum(starts) - 1
+    bounds = np.append(np.flatnonzero(starts), len(values))
+    return (bounds[dense] + bounds[dense + 1] + 1) / 2
+
+
+def spearman(x: np.ndarray, y: np.ndarray) -> float:
+    """Spearman rank correlation, NaN if either side has no variation."""
+    if len(x) < 2:
+        return float("nan")
+    rx, ry = average_ranks(x), average_ranks(y)
+    rx, ry = rx - rx.mean(), ry - ry.mean()
+    denominator = np.sqrt((rx * rx).sum() * (ry * ry).sum())
+    return float((rx * ry).sum() / denominator) if denominator else float("nan")
+
+
+def block_ordering(raw_block: dict) -> dict:
+    """Ordering statistics of one msgpack block (see blocks.fetch_raw_block)."""
+    block = raw_block[b"block"]
+    stxns = block.get(b"txns", [])
+    units = fee_per_byte(stxns)
+    return {
+        "Round": block.get(b"rnd", 0),
+        PROPOSER_COLUMN: block_proposer(raw_block),
+        "Transactions": len(stxns),
+        "Units": len(units),
+        "Median Fee Per Byte": float(np.median(units)) if len(units) else float("nan"),
+        "Max Fee Per Byte": float(units.max()) if len(units) else float("nan"),
+        CORRELATION_COLUMN: spearman(np.arange(len(units), dtype=np.float64), units),
+    }
+
+
+def analyze_range(client, start_round: int, end_round: int, workers: int = 8, rate: float = 0.0) -> pd.DataFrame:
+    limiter = RateLimiter(rate)
+
+    def analyze(round_number):
+        return block_ordering(fetch_with_retry(client, round_number, limiter, fetch_raw_block))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        rows = list(executor.map(analyze, range(start_round, end_round + 1)))
+    frame = pd.DataFrame(rows)
+    frame["Congestion"] = pd.cut(frame["Transactions"], CONGESTION_BINS, labels=CONGESTION_LABELS, right=False)
+    return frame
+
+
+def distribution(frame: pd.DataFrame, by) -> pd.DataFrame:
+    """Count, mean and quantiles of the per-block correlation for each group of `by`."""
+    grouped = frame.dropna(subset=[CORRELATION_COLUMN]).groupby(by, observed=True)[CORRELATION_COLUMN]
+    summary = grouped.quantile(QUANTILES).unstack()
+    summary.columns = [f"p{int(q * 100)}" for q in QUANTILES]
+    summary.insert(0, "mean", grouped.mean())
+    summary.insert(0, "blocks", grouped.size())
+    return summary
+
+
+if __name__ == "__main__":
+    from playground.experiments.utils import get_mainnet_TUM_algod_client
+
+    parser = argparse.ArgumentParser(description="Rank correlation of payset position and fee per byte per block.")
+    parser.add_argument("--start", type=int, help="First round.")
+    parser.add_argument("--end", type=int, help="Last round.")
+    parser.add_argument("--input", type=str, help="Summarise an earlier output instead of fetching blocks.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Per-block results CSV.")
+    parser.add_argument("--workers", type=int, default=8, help="Blocks fetched and analysed in parallel.")
+    parser.add_argument("--rate", type=float, default=0.0, help="Block requests per second at most (0: unlimited).")
+    with open(PROPOSERS_FILE) as f:
+        proposer_sets = list(json.load(f))
+    parser.add_argument("--proposers", type=str, choices=proposer_sets,
+                        help="Label proposers with this set from proposers.json.")
+    args = parser.parse_args()
+
+    if args.input:
+        data = pd.read_csv(args.input)
+        data["Congestion"] = pd.Categorical(data["Congestion"], CONGESTION_LABELS, ordered=True)
+    else:
+        if args.start is None or args.end is None:
+            parser.error("--start and --end are required unless --input is given")
+        data = analyze_range(get_mainnet_TUM_algod_client(), args.start, args.end, args.workers, args.rate)
+        data.to_csv(args.output, index=False)
+        print(f"Wrote {len(data)} blocks to {args.output}")
+
+    if args.proposers:
+        data[PROPOSER_COLUMN] = label_proposers(
+            data, load_proposer_labels(args.proposers), "other", column=PROPOSER_COLUMN
+        )
+    with pd.option_context("display.float_format", "{:.3f}".format, "display.width", 120):
+        print("\nBy congestion level:")
+        print(distribution(data, "Congestion").to_string())
+        print("\nBy proposer:")
+        print(distribution(data, PROPOSER_COLUMN).to_string())
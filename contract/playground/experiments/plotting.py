@@ -0,0 +1,118 @@
+"""
+Rendering helpers for the generate_plot*.py scripts.
+
+Small runs are drawn as one scatter point per iteration into an SVG as
+before. Runs above LARGE_RUN_THRESHOLD iterations are first reduced to a
+rolling win-rate series (downsampled to at most MAX_LINE_POINTS points) and
+written as a rasterised PNG, which keeps file size and render time flat.
+With `headless` the Agg backend is used and nothing is shown, so the scripts
+also run on machines without a display.
+"""
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+
+LARGE_RUN_THRESHOLD = 10_000
+MAX_LINE_POINTS = 2_000
+DEFAULT_DPI = 150
+
+
+def use_headless():
+    plt.switch_backend("Agg")
+
+
+def is_large(n_points: int) -> bool:
+    return n_points > LARGE_RUN_THRESHOLD
+
+
+def rolling_win_rate(outcomes, window: int | None = None):
+    """
+    Rolling share of increment wins (Function == 0) over `window` iterations,
+    computed with a cumulative sum. Returns (positions, rates) downsampled to
+    at most MAX_LINE_POINTS points.
+    """
+    wins = (np.asarray(outcomes) == 0).astype(np.float64)
+    n = len(wins)
+    if n == 0:
+        return np.array([], dtype=np.int64), np.array([])
+    window = window or max(1, n // 100)
+    window = min(window, n)
+    cumulative = np.concatenate(([0.0], np.cumsum(wins)))
+    rates = (cumulative[window:] - cumulative[:-window]) / window
+    positions = np.arange(window - 1, n)
+    step = max(1, len(rates) // MAX_LINE_POINTS)
+    return positions[::step], rates[::step] * 100
+
+
+def binned_counts(iterations, outcomes, bins: int = 200):
+    """Number of increment and decrement wins per iteration bin."""
+    iterations = np.asarray(iterations)
+    outcomes = np.asarray(outcomes)
+    edges = np.linspace(iterations.min(), iterations.max() + 1, bins + 1)
+    increments, _ = np.histogram(iterations[outcomes == 0], bins=edges)
+    decrements, _ = np.histogram(iterations[outcomes != 0], bins=edges)
+    return edges, increments, decrements
+
+
+def plot_win_rate(ax, iterations, outcomes, color=None, label=None, window=None):
+    positions, rates = rolling_win_rate(outcomes, window)
+    ax.plot(np.asarray(iterations)[positions], rates, color=color, label=label, linewidth=1)
+    ax.set_ylim(0, 100)
+    ax.set_ylabel("Increment wins (rolling %)")
+
+
+def save_figure(output, n_points: int, show: bool = True, dpi: int = DEFAULT_DPI) -> pathlib.Path:
+    """Save the current figure as SVG, or as PNG for large runs, and show it unless headless."""
+    path = pathlib.Path(output)
+    if is_large(n_points):
+        path = path.with_suffix(".png")
+        for ax in plt.gcf().axes:
+            ax.set_rasterized(True)
+    plt.savefig(path, format=path.suffix.lstrip("."), dpi=dpi)
+    print(f"Plot written to {path}")
+    if show and matplotlib.get_backend().lower() != "agg":
+        plt.show()
+    return path
+
+
+def _render_proposer_figure(args) -> str:
+    label, iterations, outcomes, colors, path, dpi = args
+    matplotlib.use("Agg", force=True)
+    fig, ax = plt.subplots(figsize=(8, 4))
+    if is_large(len(iterations)):
+        plot_win_rate(ax, iterations, outcomes, color=colors[0])
+    else:
+        ax.scatter(iterations, outcomes, c=np.where(outcomes == 0, colors[0], colors[1]), s=8)
+        ax.set_yticks([0, 1], ["Increment", "Decrement"])
+    share = (outcomes == 0).mean() * 100 if len(outcomes) else float("nan")
+    ax.set_title(f"Proposer {label}: increment won {share:.2f}% of {len(outcomes)} races")
+    ax.set_xlabel("Iterations")
+    fig.savefig(path, dpi=dpi)
+    plt.close(fig)
+    return str(path)
+
+
+def render_proposer_figures(iterations, outcomes, parts, color_map: dict, output_dir=".",
+                            workers: int | None = None, dpi: int = DEFAULT_DPI) -> list[str]:
+    """
+    Write one PNG per proposer label in `color_map` (label -> (increment
+    colour, decrement colour)), rendering the figures in worker processes.
+    """
+    iterations = np.asarray(iterations)
+    outcomes = np.asarray(outcomes)
+    parts = np.asarray(parts)
+    output_dir = pathlib.Path(output_dir)
+    jobs = []
+    for label, colors in color_map.items():
+        mask = parts == label
+        jobs.append(
+            (label, iterations[mask], outcomes[mask], colors, output_dir / f"plot_{label}.png", dpi)
+        )
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        paths = list(executor.map(_render_proposer_figure, jobs))
+    for path in paths:
+        print(f"Plot written to {path}")
+    return paths
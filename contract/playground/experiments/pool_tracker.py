@@ -0,0 +1,173 @@
+"""
+In-memory reserves of Tinyman V2 pools, kept current from block deltas.
+
+A Tinyman V2 pool is an account opted into the validator app; its reserves,
+fee settings and issued pool tokens live in that account's local state, and
+every swap, mint, burn and flash loan updates them through the validator.
+The tracker loads the local state of each pool once and then applies the
+local state deltas of the validator calls in every new block (inner calls
+from routers included), so quotes can be computed without fetching the pool
+again. One msgpack block request per round keeps all tracked pools current,
+either as the rounds are committed (`follow`) or for the rounds committed
+since the last update right before quoting (`catch_up`).
+
+    python pool_tracker.py --pool <pool address> --network testnet
+
+prints the reserves and spot price of the pool whenever a block changes them.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from algosdk.v2client import algod
+
+from playground.experiments.blocks import fetch_block, iter_transactions, local_deltas
+from playground.experiments.state_reader import GlobalStateReader
+
+VALIDATOR_APP_IDS = {"testnet": 148607000, "mainnet": 1002541853}
+FEE_SHARE_DENOMINATOR = 10_000
+
+
+class PoolState:
+    """Local state of one pool account in the validator app."""
+
+    def __init__(self, address: str, state: dict, round_number: int):
+        self.address = address
+        self.state = state
+        self.round = round_number
+
+    @property
+    def asset_1_id(self) -> int:
+        return self.state.get("asset_1_id", 0)
+
+    @property
+    def asset_2_id(self) -> int:
+        return self.state.get("asset_2_id", 0)
+
+    @property
+    def asset_1_reserves(self) -> int:
+        return self.state.get("asset_1_reserves", 0)
+
+    @property
+    def asset_2_reserves(self) -> int:
+        return self.state.get("asset_2_reserves", 0)
+
+    @property
+    def total_fee_share(self) -> int:
+        return self.state.get("total_fee_share", 0)
+
+    @property
+    def protocol_fee_ratio(self) -> int:
+        return self.state.get("protocol_fee_ratio", 0)
+
+    def reserves(self, asset_in_id: int) -> tuple[int, int]:
+        """(input reserves, output reserves) for a swap of `asset_in_id`."""
+        if asset_in_id == self.asset_1_id:
+            return self.asset_1_reserves, self.asset_2_reserves
+        if asset_in_id == self.asset_2_id:
+            return self.asset_2_reserves, self.asset_1_reserves
+        raise ValueError(f"Asset {asset_in_id} is not in pool {self.address}")
+
+    def fixed_input_swap(self, asset_in_id: int, amount_in: int) -> int:
+        """Output amount of swapping `amount_in` of `asset_in_id`, as tinyman.v2.formulas computes it."""
+        input_reserves, output_reserves = self.reserves(asset_in_id)
+        swap_amount = amount_in - amount_in * self.total_fee_share // FEE_SHARE_DENOMINATOR
+        k = input_reserves * output_reserves
+        return max(0, output_reserves - k // (input_reserves + swap_amount) - 1)
+
+    def spot_price(self, asset_in_id: int) -> float:
+        input_reserves, output_reserves = self.reserves(asset_in_id)
+        return output_reserves / input_reserves if input_reserves else 0.0
+
+
+class PoolTracker:
+    def __init__(self, client: algod.AlgodClient, validator_app_id: int):
+        self.client = client
+        self.validator_app_id = validator_app_id
+        self.pools = {}
+        self.round = None
+        self._reader = GlobalStateReader()
+
+    def add_pool(self, address: str) -> PoolState:
+        """Load the pool's local state; later changes come from apply_block."""
+        response = self.client.account_application_info(address, self.validator_app_id)
+        local_state = response.get("app-local-state", {}).get("key-value", [])
+        pool = PoolState(address, self._reader.decode(local_state), response.get("round", 0))
+        self.pools[address] = pool
+        if self.round is None:
+            self.round = pool.round
+        return pool
+
+    def apply_block(self, block: dict) -> set[str]:
+        """Apply the validator's local state deltas in `block`, returning the addresses of the pools it changed."""
+        round_number = block.get(b"rnd", 0)
+        touched = set()
+        for stxn in iter_transactions(block):
+            if stxn[b"txn"].get(b"apid") != self.validator_app_id:
+                continue
+            for address, key, value in local_deltas(stxn):
+                pool = self.pools.get(address)
+                # Skip blocks the pool's initial read already includes
+                if pool is None or round_number <= pool.round:
+                    continue
+                name = self._reader.key_from_bytes(key)
+                if value is None:
+                    pool.state.pop(name, None)
+                else:
+                    pool.state[name] = value
+                touched.add(address)
+        for address in touched:
+            self.pools[address].round = round_number
+        self.round = max(self.round or 0, round_number)
+        return touched
+
+    def catch_up(self) -> set[str]:
+        """Apply the blocks committed since the last applied round, returning the addresses of the pools they changed."""
+        last_round = self.client.status()["last-round"]
+        touched = set()
+        for round_number in range((self.round or last_round) + 1, last_round + 1):
+            touched |= self.apply_block(fetch_block(self.client, round_number))
+        return touched
+
+    def follow(self, rounds: int | None = None):
+        """Apply each new block as it is committed, yielding (round, touched pool addresses)."""
+        round_number = self.round if self.round is not None else self.client.status()["last-round"]
+        applied = 0
+        while rounds is None or applied < rounds:
+            self.client.status_after_block(round_number)
+            round_number += 1
+            yield round_number, self.apply_block(fetch_block(self.client, round_number))
+            applied += 1
+
+    def update_tinyman_pool(self, pool):
+        """Copy the tracked reserves into a tinyman `Pool` so its quotes can use `refresh=False`."""
+        state = self.pools[pool.address]
+        pool.asset_1_reserves = state.asset_1_reserves
+        pool.asset_2_reserves = state.asset_2_reserves
+        pool.issued_pool_tokens = state.state.get("issued_pool_tokens", pool.issued_pool_tokens)
+        pool.total_fee_share = state.total_fee_share
+        pool.protocol_fee_ratio = state.protocol_fee_ratio
+        pool.last_refreshed_round = self.round
+        return pool
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Track Tinyman V2 pool reserves from block deltas.")
+    parser.add_argument("--pool", action="append", required=True, help="Pool address, may be repeated.")
+    parser.add_argument("--network", choices=VALIDATOR_APP_IDS, default="testnet")
+    parser.add_argument("--rounds", type=int, help="Stop after this many rounds.")
+    parser.add_argument("--node-address", type=str, default="http://131.159.14.109:8081")
+    parser.add_argument("--node-token", type=str, default=os.getenv("TOKEN_TUM_TESTNET", ""))
+    args = parser.parse_args()
+
+    tracker = PoolTracker(algod.AlgodClient(args.node_token, args.node_address), VALIDATOR_APP_IDS[args.network])
+    for address in args.pool:
+        pool = tracker.add_pool(address)
+        print(f"{address}: {pool.asset_1_reserves} / {pool.asset_2_reserves} at round {pool.round}")
+    for round_number, touched in tracker.follow(args.rounds):
+        for address in sorted(touched):
+            pool = tracker.pools[address]
+            print(f"Round {round_number} {address}: {pool.asset_1_reserves} / {pool.asset_2_reserves}, "
+                  f"price {pool.spot_price(pool.asset_2_id):.6f}")
@@ -0,0 +1,228 @@
+"""
+Vectorised Tinyman V2 quotes.
+
+Evaluates the constant-product swap, flash loan and flash swap formulas for
+whole arrays of amounts (and pools, all arguments broadcast) with NumPy
+integer arithmetic instead of one `tinyman.v2.formulas` call per amount.
+
+All divisions are exact integer divisions, as in the validator program, so
+a quote is what the chain accepts. The fixed-output fee is rounded up like
+the SDK's `ceil(amount * 10_000 / (10_000 - fee))`, as an exact integer
+ceiling.
+
+Where the SDK divides the reserve product in floating point, `int(k / d)`
+(and `ceil(k / d)`), the quotes can differ from the SDK's:
+
+- below k = 2**53 (pools up to ~9 * 10**7 units per side) float division is
+  exact after rounding and the quotes are identical,
+- above it the float quotient can round to the next integer when k / d is
+  within half a float spacing of it. The SDK's swap output is then one unit
+  lower and its flash swap reserves one unit lower (the payment at most
+  ceil(10_000 / (10_000 - fee)) units lower). Measured on random pools
+  (2 * 10**5 quotes each): none at 10**9 units per side, 3 in 10**4 at
+  10**13, 3 in 100 at 10**15,
+- quotients above 2**53 themselves (output reserves beyond ~9 * 10**15
+  units) can differ by up to the float spacing of the quotient.
+
+`cross_check` compares both on random inputs; it needs tinyman-py-sdk (pinned
+in requirements.txt) and reports the mismatches of the ALGO sized pools it
+samples at about the rate above.
+Arrays are int64 while every intermediate product provably fits, otherwise
+they fall back to Python integers (object arrays), which is slower but still
+exact: reserves of real ALGO pools multiply to far more than 2**63.
+
+    python quote_engine.py --cross-check 10000   # compare with the SDK
+    python quote_engine.py --bench               # time a 10k size scan
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+
+FEE_SHARE_DENOMINATOR = 10_000
+# Inputs up to this bound keep every product (at most bound**2 * 10_000) inside int64
+INT64_SAFE_BOUND = math.isqrt((2**63 - 1) // FEE_SHARE_DENOMINATOR)
+
+
+def _prepare(*values):
+    """Broadcast the arguments to 1-d or more and pick int64 or exact Python integers for all of them."""
+    arrays = np.broadcast_arrays(*[np.atleast_1d(value) for value in values])
+    bound = max((int(np.abs(array).max()) if array.size else 0) for array in arrays)
+    dtype = np.int64 if bound < INT64_SAFE_BOUND else object
+    return [array.astype(dtype) for array in arrays]
+
+
+def _ceil_div(a, b):
+    return -(-a // b)
+
+
+def _fixed_output_input_amount(required, total_fee_share):
+    """Input the SDK asks for `required` after fee, ceil(required * 10_000 / (10_000 - fee)), 0 if nothing is required."""
+    kept_share = FEE_SHARE_DENOMINATOR - total_fee_share
+    return np.where(required > 0, _ceil_div(required * FEE_SHARE_DENOMINATOR, kept_share), 0)
+
+
+def _min_amount_after_fee(required, total_fee_share):
+    """Smallest x with x - x * total_fee_share // 10_000 >= required (0 if nothing is required)."""
+    kept_share = FEE_SHARE_DENOMINATOR - total_fee_share
+    amount = (required - 1) * FEE_SHARE_DENOMINATOR // kept_share + 1
+    return np.where(required > 0, amount, 0)
+
+
+def fixed_input_swap(input_reserves, output_reserves, amount_in, total_fee_share):
+    """
+    Output amount and total fee of swapping `amount_in`, as
+    `calculate_fixed_input_swap` computes them. Where the SDK raises
+    InsufficientReserves the output is 0.
+    """
+    input_reserves, output_reserves, amount_in, total_fee_share = _prepare(
+        input_reserves, output_reserves, amount_in, total_fee_share
+    )
+    fee = amount_in * total_fee_share // FEE_SHARE_DENOMINATOR
+    swap_amount = amount_in - fee
+    k = input_reserves * output_reserves
+    amount_out = output_reserves - k // np.maximum(input_reserves + swap_amount, 1) - 1
+    valid = (input_reserves > 0) & (output_reserves > 0) & (amount_out > 0)
+    return np.where(valid, amount_out, 0), fee
+
+
+def flash_loan_payment(loan_amount, total_fee_share):
+    """Amount to pay back for a flash loan of `loan_amount` (loan plus fixed input fee)."""
+    loan_amount, total_fee_share = _prepare(loan_amount, total_fee_share)
+    return loan_amount + loan_amount * total_fee_share // FEE_SHARE_DENOMINATOR
+
+
+def flash_swap_asset_2_payment(asset_1_reserves, asset_2_reserves, total_fee_share, protocol_fee_ratio,
+                               asset_1_loan_amount, asset_2_loan_amount, asset_1_payment_amount,
+                               minimal: bool = False):
+    """
+    Asset 2 payment that closes a flash swap: after the loans and payments,
+    the reserves without the poolers' fees must still hold
+    asset_1_reserves * asset_2_reserves. Rounded like
+    `calculate_flash_swap_asset_2_payment_amount`; with `minimal` the
+    smallest payment the validator accepts, which can be a few units below the SDK's.
+    """
+    (asset_1_reserves, asset_2_reserves, total_fee_share, protocol_fee_ratio,
+     asset_1_loan_amount, asset_2_loan_amount, asset_1_payment_amount) = _prepare(
+        asset_1_reserves, asset_2_reserves, total_fee_share, protocol_fee_ratio,
+        asset_1_loan_amount, asset_2_loan_amount, asset_1_payment_amount,
+    )
+    k = asset_1_reserves * asset_2_reserves
+    asset_1_fee = asset_1_payment_amount * total_fee_share // FEE_SHARE_DENOMINATOR
+    # The protocol fee leaves the reserves and the poolers' fee is excluded, so the whole fee drops out
+    asset_1_final = asset_1_reserves - asset_1_loan_amount + asset_1_payment_amount - asset_1_fee
+    asset_2_required = _ceil_div(k, np.maximum(asset_1_final, 1)) - (asset_2_reserves - asset_2_loan_amount)
+    if minimal:
+        return _min_amount_after_fee(asset_2_required, total_fee_share)
+    return _fixed_output_input_amount(asset_2_required, total_fee_share)
+
+
+def flash_swap_arbitrage(loan_pool, sell_pool, loan_sizes):
+    """
+    Profit in asset 2 of `loan_pool` for each loan size: borrow asset 1 of
+    `loan_pool` in a flash swap, sell it in `sell_pool` and repay the flash
+    swap in asset 2. Pools are PoolState objects (see pool_tracker.py).
+    """
+    asset_in = loan_pool.asset_1_id
+    if {sell_pool.asset_1_id, sell_pool.asset_2_id} != {loan_pool.asset_1_id, loan_pool.asset_2_id}:
+        raise ValueError("Both pools must trade the same asset pair")
+    sell_in, sell_out = sell_pool.reserves(asset_in)
+    amount_out, _ = fixed_input_swap(sell_in, sell_out, loan_sizes, sell_pool.total_fee_share)
+    payment = flash_swap_asset_2_payment(
+        loan_pool.asset_1_reserves, loan_pool.asset_2_reserves, loan_pool.total_fee_share,
+        loan_pool.protocol_fee_ratio, loan_sizes, 0, 0,
+    )
+    return amount_out - payment
+
+
+def candidate_sizes(max_size: int, count: int = 10_000) -> np.ndarray:
+    """Geometrically spaced integer sizes from 1 to `max_size`."""
+    return np.unique(np.geomspace(1, max_size, count).astype(np.int64))
+
+
+def best_loan_size(loan_pool, sell_pool, max_size: int | None = None, count: int = 10_000) -> tuple[int, int]:
+    """Most profitable flash swap loan size among `count` candidates and its profit."""
+    if max_size is None:
+        max_size = loan_pool.asset_1_reserves - 1
+    sizes = candidate_sizes(max_size, count)
+    profits = flash_swap_arbitrage(loan_pool, sell_pool, sizes)
+    best = int(np.argmax(profits))
+    return int(sizes[best]), int(profits[best])
+
+
+def cross_check(samples: int, seed: int = 0) -> int:
+    """Compare the engine with tinyman.v2.formulas on random inputs, returning the number of mismatches."""
+    try:
+        from tinyman.v2 import formulas
+        from tinyman.v2.exceptions import InsufficientReserves
+    except ImportError:
+        sys.exit("The cross-check needs the Tinyman SDK: pip install tinyman-py-sdk")
+
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(samples):
+        # Mix small pools (int64 path) and ALGO sized pools (object path)
+        scale = rng.choice((10**6, 10**13))
+        r1, r2 = rng.randint(1000, scale), rng.randint(1000, scale)
+        fee_share, protocol_ratio = rng.randint(1, 100), rng.randint(1, 10)
+        amount = rng.randint(1, r1 // 2)
+
+        try:
+            expected = formulas.calculate_fixed_input_swap(r1, r2, amount, fee_share)[0]
+        except InsufficientReserves:
+            expected = 0
+        got = int(fixed_input_swap(r1, r2, amount, fee_share)[0][0])
+        if got != expected:
+            mismatches += 1
+            print(f"swap {r1} {r2} {amount} {fee_share}: engine {got}, SDK {expected}")
+
+        expected = formulas.calculate_flash_loan_payment_amount(amount, fee_share)
+        got = int(flash_loan_payment(amount, fee_share)[0])
+        if got != expected:
+            mismatches += 1
+            print(f"flash loan {amount} {fee_share}: engine {got}, SDK {expected}")
+
+        expected = formulas.calculate_flash_swap_asset_2_payment_amount(
+            r1, r2, fee_share, protocol_ratio, amount, 0, 0
+        )
+        got = int(flash_swap_asset_2_payment(r1, r2, fee_share, protocol_ratio, amount, 0, 0)[0])
+        if got != expected:
+            mismatches += 1
+            print(f"flash swap {r1} {r2} {fee_share} {protocol_ratio} {amount}: engine {got}, SDK {expected}")
+    print(f"{mismatches} mismatches in {samples * 3} quotes")
+    return mismatches
+
+
+def bench(count: int = 10_000):
+    from playground.experiments.pool_tracker import PoolState
+
+    for label, scale in (("int64", 10**7), ("exact", 10**13)):
+        loan_pool = PoolState("loan", {"asset_1_id": 1, "asset_2_id": 0, "asset_1_reserves": scale,
+                                       "asset_2_reserves": 2 * scale, "total_fee_share": 30,
+                                       "protocol_fee_ratio": 6}, 0)
+        sell_pool = PoolState("sell", {"asset_1_id": 1, "asset_2_id": 0, "asset_1_reserves": scale,
+                                       "asset_2_reserves": 21 * scale // 10, "total_fee_share": 30,
+                                       "protocol_fee_ratio": 6}, 0)
+        start = time.perf_counter()
+        size, profit = best_loan_size(loan_pool, sell_pool, scale // 10, count)
+        elapsed = time.perf_counter() - start
+        print(f"{label}: best of {count} sizes is {size} with profit {profit}, {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorised Tinyman V2 quotes.")
+    parser.add_argument("--cross-check", type=int, metavar="SAMPLES", help="Compare with the SDK formulas.")
+    parser.add_argument("--bench", action="store_true", help="Time a flash swap loan size scan.")
+    parser.add_argument("--sizes", type=int, default=10_000, help="Candidate loan sizes in the benchmark.")
+    args = parser.parse_args()
+
+    if args.cross_check:
+        sys.exit(1 if cross_check(args.cross_check) else 0)
+    if args.bench:
+        bench(args.sizes)
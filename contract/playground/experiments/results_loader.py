@@ -0,0 +1,86 @@
+"""
+Load every experiment_data*.csv in a results directory as one frame.
+
+Files are parsed in parallel with pyarrow and cached as Feather (Arrow IPC)
+files in `<directory>/.results_cache`. A cache entry is keyed by the source
+file's name, mtime and size, so unchanged files are read back from the
+columnar cache instead of being reparsed. Each row gets a `Run` column
+holding the source file's stem, e.g. experiment_data_2.
+"""
+import argparse
+import pathlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+
+DEFAULT_PATTERN = "experiment_data*.csv"
+CACHE_DIR = ".results_cache"
+RUN_COLUMN = "Run"
+
+
+def _cache_path(cache_dir: pathlib.Path, path: pathlib.Path) -> pathlib.Path:
+    stat = path.stat()
+    return cache_dir / f"{path.stem}.{stat.st_mtime_ns}.{stat.st_size}.feather"
+
+
+def _load_file(path: pathlib.Path, cache_dir: pathlib.Path | None) -> pa.Table:
+    if cache_dir is None:
+        return pa_csv.read_csv(path)
+
+    cached = _cache_path(cache_dir, path)
+    if cached.exists():
+        return feather.read_table(cached)
+
+    table = pa_csv.read_csv(path)
+    # Only this file's entries: a plain glob would also match e.g. run.old.<mtime>.<size>.feather for run.csv
+    entry = re.compile(rf"{re.escape(path.stem)}\.\d+\.\d+\.feather")
+    for stale in cache_dir.glob(f"{path.stem}.*.feather"):
+        if entry.fullmatch(stale.name):
+            stale.unlink()
+    feather.write_feather(table, cached, compression="zstd")
+    return table
+
+
+def load_results(directory=".", pattern: str = DEFAULT_PATTERN, use_cache: bool = True,
+                 workers: int | None = None) -> pd.DataFrame:
+    """
+    Parse all files matching `pattern` in `directory` and return them
+    concatenated, with the file stem in the RUN_COLUMN column. Columns missing
+    from some files are filled with nulls.
+    """
+    directory = pathlib.Path(directory)
+    paths = sorted(directory.glob(pattern))
+    if not paths:
+        raise FileNotFoundError(f"No files matching {pattern} in {directory}")
+
+    cache_dir = directory / CACHE_DIR if use_cache else None
+    if cache_dir is not None:
+        cache_dir.mkdir(exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        tables = list(executor.map(lambda path: _load_file(path, cache_dir), paths))
+
+    runs = pa.DictionaryArray.from_arrays(
+        pa.array(np.repeat(np.arange(len(tables), dtype=np.int32), [table.num_rows for table in tables])),
+        pa.array([path.stem for path in paths]),
+    )
+    combined = pa.concat_tables(tables, promote_options="permissive")
+    return combined.append_column(RUN_COLUMN, runs).to_pandas()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load all experiment result files of a directory.")
+    parser.add_argument("directory", nargs="?", default=".", help="Results directory.")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help="Glob of the result files.")
+    parser.add_argument("--no-cache", action="store_true", help="Always reparse the CSV files.")
+    parser.add_argument("--workers", type=int, help="Number of files parsed in parallel.")
+    args = parser.parse_args()
+
+    data = load_results(args.directory, args.pattern, not args.no_cache, args.workers)
+    print(f"Loaded {len(data)} rows from {data[RUN_COLUMN].nunique()} runs")
+    print(data.groupby(RUN_COLUMN, observed=True).size().to_string())
@@ -0,0 +1,114 @@
+"""
+Sequential probability ratio tests (SPRT) for stopping race experiments early.
+
+The tests watch p, the probability that increment wins a race. Two one-sided
+Wald SPRTs run side by side: p = 0.5 against p = 0.5 + margin (increment
+wins) and p = 0.5 against p = 0.5 - margin (decrement wins). After every race
+both log-likelihood ratios are updated; the run can stop as soon as one side
+is accepted, or when both reject their alternative (neither function wins by
+more than the margin). For lopsided configurations, e.g. a 1000x fee, this
+happens after a few dozen races instead of the full iteration count.
+"""
+import json
+import math
+
+DEFAULT_CONFIDENCE = 0.99
+DEFAULT_MARGIN = 0.2
+DEFAULT_MIN_ITERATIONS = 30
+SUMMARY_FILE = "experiment_summary.json"
+
+
+class SPRT:
+    def __init__(
+        self,
+        confidence: float = DEFAULT_CONFIDENCE,
+        margin: float = DEFAULT_MARGIN,
+        min_iterations: int = DEFAULT_MIN_ITERATIONS,
+    ):
+        if not 0 < margin < 0.5:
+            raise ValueError("margin must be between 0 and 0.5")
+        error = 1 - confidence
+        self.confidence = confidence
+        self.margin = margin
+        self.min_iterations = min_iterations
+        # log-likelihood ratio steps for a win/loss of increment, per alternative
+        self._steps = {
+            "Increment": (math.log((0.5 + margin) / 0.5), math.log((0.5 - margin) / 0.5)),
+            "Decrement": (math.log((0.5 - margin) / 0.5), math.log((0.5 + margin) / 0.5)),
+        }
+        self._accept = math.log((1 - error) / error)
+        self._reject = -self._accept
+        self.llr = {"Increment": 0.0, "Decrement": 0.0}
+        self.increments = 0
+        self.iterations = 0
+        self.decision = None
+
+    def update(self, increment_won: bool) -> str | None:
+        """
+        Record one race. Returns the decision once reached: "Increment" or
+        "Decrement" for a winner, "Neither" when both win rates are within the
+        margin of 0.5, otherwise None.
+        """
+        self.iterations += 1
+        self.increments += bool(increment_won)
+        for side, (win_step, loss_step) in self._steps.items():
+            self.llr[side] += win_step if increment_won else loss_step
+
+        if self.decision is None and self.iterations >= self.min_iterations:
+            if self.llr["Increment"] >= self._accept:
+                self.decision = "Increment"
+            elif self.llr["Decrement"] >= self._accept:
+                self.decision = "Decrement"
+            elif max(self.llr.values()) <= self._reject:
+                self.decision = "Neither"
+        return self.decision
+
+    @property
+    def stop_reason(self) -> str:
+        if self.decision is None:
+            return f"No SPRT decision after {self.iterations} iterations, {self.increments} increment wins"
+        if self.decision == "Neither":
+            outcome = f"neither function wins by more than {self.margin:.2f}"
+        else:
+            outcome = f"{self.decision} wins with p >= {0.5 + self.margin:.2f}"
+        return (
+            f"SPRT stopped: {outcome} ({self.confidence:.0%} confidence) "
+            f"after {self.iterations} iterations, {self.increments} increment wins"
+        )
+
+
+def add_arguments(parser):
+    """Add the early-stop options shared by the race scripts to an argparse parser."""
+    parser.add_argument(
+        "--early-stop", action="store_true",
+        help="Stop the race loop as soon as the SPRT reaches a decision.",
+    )
+    parser.add_argument("--early-stop-confidence", type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument(
+        "--early-stop-margin", type=float, default=DEFAULT_MARGIN,
+        help="Smallest deviation of the increment win rate from 0.5 that counts as a winner.",
+    )
+    parser.add_argument("--early-stop-min-iterations", type=int, default=DEFAULT_MIN_ITERATIONS)
+
+
+def from_args(args) -> SPRT | None:
+    if not args.early_stop:
+        return None
+    return SPRT(args.early_stop_confidence, args.early_stop_margin, args.early_stop_min_iterations)
+
+
+def write_summary(increment_count: int, decrement_count: int, stop_reason: str, path=SUMMARY_FILE, **extra):
+    total = increment_count + decrement_count
+    summary = {
+        "iterations": total,
+        "increment_count": increment_count,
+        "decrement_count": decrement_count,
+        "increment_percentage": increment_count / total * 100 if total else None,
+        "decrement_percentage": decrement_count / total * 100 if total else None,
+        "stop_reason": stop_reason,
+        **extra,
+    }
+    with open(path, "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"{stop_reason}. Summary written to {path}")
+    return summary
@@ -0,0 +1,107 @@
+"""
+Batched global state reads.
+
+`application_info` returns one app per request and every caller decodes all
+keys again. `GlobalStateReader.read_created` instead fetches the global state
+of every app an account created with a single `account_info` request. Keys
+are base64-decoded once into an interned key table shared by all apps and
+reads, values come back typed (uint -> int, bytes -> bytes), and a `keys`
+filter skips the values the caller does not need, e.g. the call log slots of
+LastExecuted when only `counter` matters.
+
+    python state_reader.py --manifest app_manifest.json --keys counter
+
+prints the counter of every app in the manifest once per round.
+"""
+import argparse
+import base64
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from algosdk.v2client import algod
+
+from playground.experiments.app_deployer import load_manifest
+
+BYTES_TYPE = 1
+
+
+class GlobalStateReader:
+    def __init__(self):
+        # base64 (str) or raw (bytes) key -> decoded key (str if UTF-8, else bytes)
+        self._keys = {}
+
+    def key(self, encoded: str):
+        name = self._keys.get(encoded)
+        if name is None:
+            name = self._keys[encoded] = self.key_from_bytes(base64.b64decode(encoded))
+        return name
+
+    def key_from_bytes(self, raw: bytes):
+        """Decoded key for a raw key, e.g. from the state deltas of a msgpack block."""
+        name = self._keys.get(raw)
+        if name is None:
+            try:
+                name = sys.intern(raw.decode("utf-8"))
+            except UnicodeDecodeError:
+                name = raw
+            self._keys[raw] = name
+        return name
+
+    def decode(self, global_state: list, keys=None) -> dict:
+        """Decode a `global-state` list into {key: int | bytes}, only for `keys` if given."""
+        state = {}
+        for item in global_state:
+            name = self.key(item["key"])
+            if keys is not None and name not in keys:
+                continue
+            value = item["value"]
+            state[name] = base64.b64decode(value["bytes"]) if value["type"] == BYTES_TYPE else value["uint"]
+        return state
+
+    def read_created(self, client: algod.AlgodClient, creator: str, app_ids=None, keys=None) -> dict:
+        """
+        Global state of the apps created by `creator` (restricted to `app_ids`
+        if given) as {app_id: {key: value}}, from one account_info request.
+        """
+        wanted = set(app_ids) if app_ids is not None else None
+        states = {}
+        for app in client.account_info(creator).get("created-apps", []):
+            if wanted is None or app["id"] in wanted:
+                states[app["id"]] = self.decode(app["params"].get("global-state", []), keys)
+        return states
+
+    def read_app(self, client: algod.AlgodClient, app_id: int, keys=None) -> dict:
+        """Global state of a single app, for apps of other creators."""
+        response = client.application_info(app_id)
+        return self.decode(response["params"].get("global-state", []), keys)
+
+
+def counter_values(states: dict) -> dict:
+    """The LastExecuted `counter` (the last method executed) of every app in `states`."""
+    return {
+        app_id: state["counter"].decode() if "counter" in state else None for app_id, state in states.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print the global state of many apps once per round.")
+    parser.add_argument("--manifest", required=True, help="App manifest written by app_deployer.py.")
+    parser.add_argument("--keys", nargs="*", help="Only decode these keys.")
+    parser.add_argument("--rounds", type=int, default=10, help="Number of rounds to monitor.")
+    parser.add_argument("--node-address", type=str, default="http://10.1.1.1:4100")
+    parser.add_argument("--node-token", type=str, default="97361fdc801fe9fd7f2ae87fa4ea5dc8b9b6ce7380c230eaf5494c4cb5d38d61")
+    args = parser.parse_args()
+
+    client = algod.AlgodClient(args.node_token, args.node_address)
+    manifest = load_manifest(args.manifest)
+    reader = GlobalStateReader()
+    keys = set(args.keys) if args.keys else None
+    round_number = client.status()["last-round"]
+    for _ in range(args.rounds):
+        states = reader.read_created(client, manifest["creator"], manifest["app_ids"], keys)
+        print(f"Round {round_number}: {len(states)} apps")
+        for app_id, state in sorted(states.items()):
+            print(f"  {app_id}: {state}")
+        round_number = client.status_after_block(round_number)["last-round"]
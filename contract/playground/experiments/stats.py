@@ -0,0 +1,126 @@
+"""
+Confidence intervals for race win rates.
+
+Win rates are the share of races won by increment (Function == 0) within each
+group of rows, e.g. per proposer, fee ratio, node pair or submission skew (the
+columns described in analysis.py). Continuous columns such as the skew are
+grouped into bins with --bin COLUMN=WIDTH. Files written before the race
+drivers recorded a column have no value for it and fall out of its groups.
+Two intervals are reported per group:
+
+- Wilson score interval, closed form.
+- Percentile bootstrap. Resampling n Bernoulli outcomes with replacement and
+  counting the wins is a Binomial(n, k/n) draw, so all resamples of all groups
+  are drawn as one (groups x resamples) NumPy array instead of looping.
+"""
+import argparse
+import os
+import sys
+from statistics import NormalDist
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+import pandas as pd
+from playground.experiments.analysis import (
+    FUNCTION_COLUMN,
+    INCREMENT,
+    PROPOSER_COLUMN,
+    SKEW_COLUMN,
+    label_proposers,
+    load_proposer_labels,
+)
+from playground.experiments.results_loader import RUN_COLUMN, load_results
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_RESAMPLES = 10_000
+
+
+def wilson_interval(successes, totals, confidence: float = DEFAULT_CONFIDENCE):
+    """Wilson score interval for arrays of success counts and totals."""
+    successes = np.asarray(successes, dtype=np.float64)
+    totals = np.asarray(totals, dtype=np.float64)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = successes / totals
+        denominator = 1 + z**2 / totals
+        centre = (p + z**2 / (2 * totals)) / denominator
+        margin = z * np.sqrt(p * (1 - p) / totals + z**2 / (4 * totals**2)) / denominator
+    return centre - margin, centre + margin
+
+
+def bootstrap_interval(successes, totals, confidence: float = DEFAULT_CONFIDENCE,
+                       resamples: int = DEFAULT_RESAMPLES, seed: int | None = None):
+    """Percentile bootstrap interval of the win rate for every group at once."""
+    successes = np.asarray(successes, dtype=np.int64)
+    totals = np.asarray(totals, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.where(totals > 0, successes / totals, 0.0)
+        draws = rng.binomial(totals[:, None], p[:, None], size=(len(totals), resamples))
+        rates = draws / totals[:, None]
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(rates, [alpha, 1 - alpha], axis=1)
+    empty = totals == 0
+    low[empty] = np.nan
+    high[empty] = np.nan
+    return low, high
+
+
+def bin_values(values: pd.Series, width: float) -> pd.Series:
+    """Replace every value with the lower edge of its `width` wide bin."""
+    return np.floor(values / width) * width
+
+
+def parse_bin(spec: str) -> tuple:
+    column, _, width = spec.rpartition("=")
+    if not column or not width:
+        raise argparse.ArgumentTypeError(f"expected COLUMN=WIDTH, got {spec!r}")
+    return column, float(width)
+
+
+def win_rate_intervals(data: pd.DataFrame, by, confidence: float = DEFAULT_CONFIDENCE,
+                       resamples: int = DEFAULT_RESAMPLES, seed: int | None = None) -> pd.DataFrame:
+    """Win rate with Wilson and bootstrap intervals for every combination of the `by` columns present in `data`."""
+    by = [by] if isinstance(by, str) else list(by)
+    grouped = data[FUNCTION_COLUMN].eq(INCREMENT).groupby([data[column] for column in by], sort=True, observed=True)
+    result = grouped.agg(["sum", "size"]).rename(columns={"sum": "wins", "size": "total"})
+    result["wins"] = result["wins"].astype(np.int64)
+    result["win_rate"] = result["wins"] / result["total"]
+    result["wilson_low"], result["wilson_high"] = wilson_interval(result["wins"], result["total"], confidence)
+    result["bootstrap_low"], result["bootstrap_high"] = bootstrap_interval(
+        result["wins"].to_numpy(), result["total"].to_numpy(), confidence, resamples, seed
+    )
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Confidence intervals for increment win rates.")
+    parser.add_argument("input", nargs="?", default="experiment_data.csv",
+                        help="Experiment CSV file, or a directory of experiment_data*.csv runs.")
+    parser.add_argument("--by", action="append",
+                        help=f"Column to group by, repeatable. Defaults to '{PROPOSER_COLUMN}', "
+                             f"or '{RUN_COLUMN}' for a directory.")
+    parser.add_argument("--bin", type=parse_bin, action="append", default=[], metavar="COLUMN=WIDTH",
+                        help=f"Group a numeric column in bins of WIDTH, repeatable, e.g. '{SKEW_COLUMN}=50'.")
+    parser.add_argument("--proposers", type=str,
+                        help="Name of a label set in proposers.json to replace proposer addresses with.")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument("--resamples", type=int, default=DEFAULT_RESAMPLES)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    if os.path.isdir(args.input):
+        data = load_results(args.input)
+        default_by = [RUN_COLUMN]
+    else:
+        data = pd.read_csv(args.input)
+        default_by = [PROPOSER_COLUMN]
+    if args.proposers:
+        data[PROPOSER_COLUMN] = label_proposers(data, load_proposer_labels(args.proposers))
+    for column, width in args.bin:
+        data[column] = bin_values(data[column], width)
+
+    intervals = win_rate_intervals(data, args.by or default_by, args.confidence, args.resamples, args.seed)
+    with pd.option_context("display.max_rows", None, "display.max_columns", None, "display.width", 200):
+        print(intervals)
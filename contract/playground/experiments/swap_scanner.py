@@ -0,0 +1,241 @@
+"""
+Historical back-run and sandwich opportunities of Tinyman V2 swaps.
+
+Walks a range of (archival) msgpack blocks in parallel and finds every
+validator `swap` call, at top level or inside router app calls, together with
+the transfer into the pool that precedes it. The call's local state delta
+holds the pool reserves after the swap; the reserves before follow from the
+amounts (the input reserves grow by the amount used, i.e. the transfer less
+any change a fixed-output swap refunds, minus the protocol fee on it; the
+output reserves shrink by the amount out). For each swap it computes with
+the exact quote engine:
+
+- back-run profit: the best trade back into the pool after the swap, valued
+  at the pool's price before the swap,
+- sandwich profit: the best front-run of a fixed-input swap that still lets
+  it meet its minimum output, plus the sale of the front-run's output after it.
+
+Profits are in the swap's input asset. The range is split into chunks of
+rounds; each finished chunk is written to `<output dir>/<first>_<last>.csv`,
+so an interrupted scan resumes with the chunks that have no file yet. Block
+requests go through a shared rate limiter and are retried with backoff.
+
+    python swap_scanner.py --start 30000000 --end 30100000 --workers 8 --rate 50
+"""
+import argparse
+import csv
+import os
+import pathlib
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from algosdk import encoding
+
+from playground.experiments.blocks import RateLimiter, fetch_with_retry, local_deltas
+from playground.experiments.pool_tracker import VALIDATOR_APP_IDS
+from playground.experiments.quote_engine import FEE_SHARE_DENOMINATOR, candidate_sizes, fixed_input_swap
+
+DEFAULT_OUTPUT_DIR = "swap_scan"
+DEFAULT_CHUNK_SIZE = 1_000
+DEFAULT_SIZES = 256
+# Fee settings of nearly every Tinyman V2 pool, used unless a delta says otherwise
+DEFAULT_TOTAL_FEE_SHARE = 30
+DEFAULT_PROTOCOL_FEE_RATIO = 6
+FIELDS = [
+    "Round", "Txn Index", "Pool", "Asset In", "Asset Out", "Amount In", "Amount Out", "Min Amount Out",
+    "Backrun Profit", "Backrun Amount", "Sandwich Profit", "Frontrun Amount",
+]
+
+
+def _input_transfer(stxn: dict, pool: bytes):
+    """(asset id, amount) if `stxn` transfers to the pool, else None."""
+    txn = stxn[b"txn"]
+    if txn.get(b"type") == b"pay" and txn.get(b"rcv") == pool:
+        return 0, txn.get(b"amt", 0)
+    if txn.get(b"type") == b"axfer" and txn.get(b"arcv") == pool:
+        return txn.get(b"xaid", 0), txn.get(b"aamt", 0)
+    return None
+
+
+def _inner_amount(stxn: dict, asset_id: int) -> int:
+    """Total the call's inner transactions pay out in `asset_id`."""
+    total = 0
+    for inner in stxn.get(b"dt", {}).get(b"itx", []):
+        txn = inner[b"txn"]
+        if txn.get(b"type") == b"pay" and asset_id == 0:
+            total += txn.get(b"amt", 0)
+        elif txn.get(b"type") == b"axfer" and txn.get(b"xaid", 0) == asset_id:
+            total += txn.get(b"aamt", 0)
+    return total
+
+
+def find_swaps(stxns: list, validator_app_id: int, path: str = ""):
+    """
+    Yield a dict per validator swap call in `stxns` and their inner
+    transactions, with the reserves before and after the swap.
+    """
+    for index, stxn in enumerate(stxns):
+        txn = stxn[b"txn"]
+        position = f"{path}{index}"
+        inner = stxn.get(b"dt", {}).get(b"itx", [])
+        if inner:
+            yield from find_swaps(inner, validator_app_id, f"{position}.")
+        args = txn.get(b"apaa", [])
+        if txn.get(b"apid") != validator_app_id or not args or args[0] != b"swap" or index == 0:
+            continue
+        pool = txn[b"apat"][0]
+        transfer = _input_transfer(stxns[index - 1], pool)
+        assets = txn.get(b"apas", [])
+        if transfer is None or len(assets) != 2:
+            continue
+        pool_address = encoding.encode_address(pool)
+        state = {key: value for address, key, value in local_deltas(stxn) if address == pool_address}
+        if b"asset_1_reserves" not in state or b"asset_2_reserves" not in state:
+            continue
+
+        asset_in, transferred = transfer
+        asset_out = assets[1] if asset_in == assets[0] else assets[0]
+        amount_out = _inner_amount(stxn, asset_out)
+        # A fixed-output swap refunds the unused input, the fee is charged on what was used
+        amount_in = transferred - _inner_amount(stxn, asset_in)
+        if asset_in == assets[0]:
+            input_after, output_after = state[b"asset_1_reserves"], state[b"asset_2_reserves"]
+        else:
+            input_after, output_after = state[b"asset_2_reserves"], state[b"asset_1_reserves"]
+        fee_share = state.get(b"total_fee_share", DEFAULT_TOTAL_FEE_SHARE)
+        protocol_ratio = state.get(b"protocol_fee_ratio", DEFAULT_PROTOCOL_FEE_RATIO)
+        protocol_fee = amount_in * fee_share // FEE_SHARE_DENOMINATOR // protocol_ratio
+        fixed_input = len(args) > 1 and args[1] == b"fixed-input"
+        yield {
+            "index": position,
+            "pool": pool_address,
+            "asset_in": asset_in,
+            "asset_out": asset_out,
+            "amount_in": amount_in,
+            "amount_out": amount_out,
+            "min_amount_out": int.from_bytes(args[2], "big") if fixed_input and len(args) > 2 else None,
+            "input_before": input_after - amount_in + protocol_fee,
+            "output_before": output_after + amount_out,
+            "input_after": input_after,
+            "output_after": output_after,
+            "total_fee_share": fee_share,
+            "protocol_fee_ratio": protocol_ratio,
+        }
+
+
+def backrun_profit(swap: dict, sizes: int = DEFAULT_SIZES) -> tuple[float, int]:
+    """Best (profit, amount) selling the swap's output asset back into the pool, valued at the pre-swap price."""
+    if swap["output_after"] <= 1 or swap["output_before"] <= 0:
+        return 0.0, 0
+    price = swap["input_before"] / swap["output_before"]
+    amounts = candidate_sizes(swap["output_after"] - 1, sizes)
+    received, _ = fixed_input_swap(swap["output_after"], swap["input_after"], amounts, swap["total_fee_share"])
+    profits = received.astype(float) - amounts * price
+    best = int(np.argmax(profits))
+    return (float(profits[best]), int(amounts[best])) if profits[best] > 0 else (0.0, 0)
+
+
+def sandwich_profit(swap: dict, sizes: int = DEFAULT_SIZES) -> tuple[int, int]:
+    """Best (profit, front-run amount) of sandwiching a fixed-input swap without breaking its minimum output."""
+    if swap["min_amount_out"] is None or swap["input_before"] <= 1:
+        return 0, 0
+    fee_share, protocol_ratio = swap["total_fee_share"], swap["protocol_fee_ratio"]
+    input_reserves, output_reserves = swap["input_before"], swap["output_before"]
+
+    front = candidate_sizes(input_reserves - 1, sizes)
+    front_out, front_fee = fixed_input_swap(input_reserves, output_reserves, front, fee_share)
+    input_1 = input_reserves + front - front_fee // protocol_ratio
+    output_1 = output_reserves - front_out
+    victim_out, victim_fee = fixed_input_swap(input_1, output_1, swap["amount_in"], fee_share)
+    input_2 = input_1 + swap["amount_in"] - victim_fee // protocol_ratio
+    output_2 = output_1 - victim_out
+    back, _ = fixed_input_swap(output_2, input_2, front_out, fee_share)
+
+    profits = np.where(victim_out >= swap["min_amount_out"], back - front, 0)
+    best = int(np.argmax(profits))
+    return (int(profits[best]), int(front[best])) if profits[best] > 0 else (0, 0)
+
+
+def scan_block(block: dict, validator_app_id: int, sizes: int = DEFAULT_SIZES) -> list[dict]:
+    rows = []
+    for swap in find_swaps(block.get(b"txns", []), validator_app_id):
+        backrun, backrun_amount = backrun_profit(swap, sizes)
+        sandwich, frontrun_amount = sandwich_profit(swap, sizes)
+        rows.append({
+            "Round": block.get(b"rnd", 0),
+            "Txn Index": swap["index"],
+            "Pool": swap["pool"],
+            "Asset In": swap["asset_in"],
+            "Asset Out": swap["asset_out"],
+            "Amount In": swap["amount_in"],
+            "Amount Out": swap["amount_out"],
+            "Min Amount Out": swap["min_amount_out"],
+            "Backrun Profit": round(backrun),
+            "Backrun Amount": backrun_amount,
+            "Sandwich Profit": sandwich,
+            "Frontrun Amount": frontrun_amount,
+        })
+    return rows
+
+
+def _write_chunk(path: pathlib.Path, rows: list[dict]):
+    # Write to a temporary file first so a chunk file is always complete
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    tmp.replace(path)
+
+
+def scan_range(client, start_round: int, end_round: int, validator_app_id: int,
+               output_dir: str = DEFAULT_OUTPUT_DIR, chunk_size: int = DEFAULT_CHUNK_SIZE,
+               workers: int = 8, rate: float = 0.0, sizes: int = DEFAULT_SIZES) -> int:
+    """Scan [start_round, end_round] chunk by chunk, skipping finished chunks. Returns the number of swaps found."""
+    output = pathlib.Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    limiter = RateLimiter(rate)
+    found = 0
+
+    def scan(round_number):
+        return scan_block(fetch_with_retry(client, round_number, limiter), validator_app_id, sizes)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for first in range(start_round, end_round + 1, chunk_size):
+            last = min(first + chunk_size - 1, end_round)
+            path = output / f"{first}_{last}.csv"
+            if path.exists():
+                print(f"Rounds {first}-{last}: already scanned")
+                continue
+            started = time.perf_counter()
+            rows = [row for block_rows in executor.map(scan, range(first, last + 1)) for row in block_rows]
+            _write_chunk(path, rows)
+            found += len(rows)
+            elapsed = time.perf_counter() - started
+            print(f"Rounds {first}-{last}: {len(rows)} swaps, {(last - first + 1) / elapsed:.1f} rounds/s")
+    return found
+
+
+if __name__ == "__main__":
+    from playground.experiments.utils import get_mainnet_TUM_algod_client
+
+    parser = argparse.ArgumentParser(description="Scan historical blocks for Tinyman back-run and sandwich profit.")
+    parser.add_argument("--start", type=int, required=True, help="First round.")
+    parser.add_argument("--end", type=int, required=True, help="Last round.")
+    parser.add_argument("--network", choices=VALIDATOR_APP_IDS, default="mainnet")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="One CSV per chunk of rounds.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rounds per chunk file.")
+    parser.add_argument("--workers", type=int, default=8, help="Blocks fetched in parallel.")
+    parser.add_argument("--rate", type=float, default=0.0, help="Block requests per second at most (0: unlimited).")
+    parser.add_argument("--sizes", type=int, default=DEFAULT_SIZES, help="Candidate trade sizes per swap.")
+    args = parser.parse_args()
+
+    total = scan_range(
+        get_mainnet_TUM_algod_client(), args.start, args.end, VALIDATOR_APP_IDS[args.network],
+        args.output_dir, args.chunk_size, args.workers, args.rate, args.sizes,
+    )
+    print(f"Found {total} swaps, load them with results_loader.load_results('{args.output_dir}', '*.csv')")
@@ -10,19 +10,46 @@ import pyteal as pt
 from algosdk import mnemonic, account, transaction
 from algosdk.atomic_transaction_composer import AccountTransactionSigner
 from algosdk.v2client import algod
-from beaker import Application, Authorize, GlobalStateValue, unconditional_create_approval
+from beaker import (
+    Application,
+    Authorize,
+    GlobalStateValue,
+    ReservedGlobalStateValue,
+    unconditional_create_approval,
+)
 from beaker.client import ApplicationClient
 from dotenv import load_dotenv
 
 load_dotenv()  # take environment variables from .env.
 
 
+# Call log: one (method, round, sequence, sender) entry per increment/decrement
+# call, kept in a ring buffer of LOG_SLOTS global state slots keyed by one byte
+LOG_SLOTS = 60
+# Entries returned by one get_log call; 20 encoded entries fit the 1024 byte log limit
+MAX_LOG_ENTRIES = 20
+INCREMENT_METHOD = 0
+DECREMENT_METHOD = 1
+
+LogEntry = pt.abi.Tuple4[pt.abi.Uint8, pt.abi.Uint64, pt.abi.Uint64, pt.abi.Address]
+
+
 class LastExecutedState:
     counter = GlobalStateValue(
         stack_type=pt.TealType.bytes,
         default=pt.Bytes("None"),
         descr="A counter for showing how to use application state",
     )
+    seq = GlobalStateValue(
+        stack_type=pt.TealType.uint64,
+        default=pt.Int(0),
+        descr="Sequence number of the next call log entry",
+    )
+    call_log = ReservedGlobalStateValue(
+        stack_type=pt.TealType.bytes,
+        max_keys=LOG_SLOTS,
+        descr="Ring buffer of encoded (method, round, sequence, sender) call log entries",
+    )
 
 
 last_executed = Application("LastExecutedApp", state=LastExecutedState()).apply(
@@ -30,11 +57,33 @@ last_executed = Application("LastExecutedApp", state=LastExecutedState()).apply(
 )
 
 
+def _log_key(seq: pt.Expr) -> pt.Expr:
+    return pt.Extract(pt.Itob(seq % pt.Int(LOG_SLOTS)), pt.Int(7), pt.Int(1))
+
+
+@pt.Subroutine(pt.TealType.none)
+def record_call(method: pt.Expr) -> pt.Expr:
+    """append (method, round, sequence, sender) to the call log"""
+    seq = last_executed.state.seq.get()
+    return pt.Seq(
+        last_executed.state.call_log[_log_key(seq)].set(
+            pt.Concat(
+                pt.Extract(pt.Itob(method), pt.Int(7), pt.Int(1)),
+                pt.Itob(pt.Global.round()),
+                pt.Itob(seq),
+                pt.Txn.sender(),
+            )
+        ),
+        last_executed.state.seq.set(seq + pt.Int(1)),
+    )
+
+
 @last_executed.external(authorize=Authorize.only_creator())
 def increment(*, output: pt.abi.String) -> pt.Expr:
     """increment the counter"""
     return pt.Seq(
         last_executed.state.counter.set(pt.Bytes("increment")),
+        record_call(pt.Int(INCREMENT_METHOD)),
         output.set(last_executed.state.counter),
     )
 
@@ -44,10 +93,37 @@ def decrement(*, output: pt.abi.String) -> pt.Expr:
     """decrement the counter"""
     return pt.Seq(
         last_executed.state.counter.set(pt.Bytes("decrement")),
+        record_call(pt.Int(DECREMENT_METHOD)),
         output.set(last_executed.state.counter),
     )
 
 
+@last_executed.external(read_only=True)
+def get_log(since: pt.abi.Uint64, *, output: pt.abi.DynamicArray[LogEntry]) -> pt.Expr:
+    """return up to MAX_LOG_ENTRIES call log entries with sequence >= since that are still in the buffer"""
+    next_seq = last_executed.state.seq.get()
+    start = pt.ScratchVar(pt.TealType.uint64)
+    end = pt.ScratchVar(pt.TealType.uint64)
+    i = pt.ScratchVar(pt.TealType.uint64)
+    entries = pt.ScratchVar(pt.TealType.bytes)
+    return pt.Seq(
+        start.store(since.get()),
+        pt.If(start.load() + pt.Int(LOG_SLOTS) < next_seq).Then(
+            start.store(next_seq - pt.Int(LOG_SLOTS))
+        ),
+        pt.If(start.load() > next_seq).Then(start.store(next_seq)),
+        end.store(start.load() + pt.Int(MAX_LOG_ENTRIES)),
+        pt.If(end.load() > next_seq).Then(end.store(next_seq)),
+        entries.store(pt.Bytes("")),
+        pt.For(i.store(start.load()), i.load() < end.load(), i.store(i.load() + pt.Int(1))).Do(
+            entries.store(pt.Concat(entries.load(), last_executed.state.call_log[_log_key(i.load())].get()))
+        ),
+        output.decode(
+            pt.Concat(pt.Extract(pt.Itob(end.load() - start.load()), pt.Int(6), pt.Int(2)), entries.load())
+        ),
+    )
+
+
 def demo() -> None:
     parser = argparse.ArgumentParser(description="Deploy and interact with a Beaker application.")
 
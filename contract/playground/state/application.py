@@ -95,6 +95,46 @@ def read_global_blob(*, output: pt.abi.DynamicBytes) -> pt.Expr:
     )
 
 
+# Box-backed equivalents of the blobs above. A box is a named byte array owned
+# by the app; it is read and written with plain byte-range opcodes instead of
+# being split across state keys. The box sizes match the blobs so the methods
+# are directly comparable (see benchmark.py). Callers need to pass the box
+# reference and the app account must hold the box minimum balance
+# (2500 + 400 * (name length + size) microAlgos).
+GLOBAL_BOX_NAME = pt.Bytes("global_blob")
+GLOBAL_BOX_SIZE = 2032  # global_blob.blob.max_bytes
+ACCOUNT_BOX_SIZE = 381  # local_blob.blob.max_bytes
+
+
+@app.external
+def write_global_box(v: pt.abi.String) -> pt.Expr:
+    return pt.Seq(
+        # Creating an existing box of the same size is a no-op that returns 0
+        pt.Pop(pt.BoxCreate(GLOBAL_BOX_NAME, pt.Int(GLOBAL_BOX_SIZE))),
+        pt.BoxReplace(GLOBAL_BOX_NAME, pt.Int(0), v.get()),
+    )
+
+
+@app.external
+def read_global_box(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+    return output.set(pt.BoxExtract(GLOBAL_BOX_NAME, pt.Int(0), pt.Int(GLOBAL_BOX_SIZE - 1)))
+
+
+# One box per account, named by the sender's address, like `local_blob` but
+# without requiring an opt in
+@app.external
+def write_account_box(v: pt.abi.String) -> pt.Expr:
+    return pt.Seq(
+        pt.Pop(pt.BoxCreate(pt.Txn.sender(), pt.Int(ACCOUNT_BOX_SIZE))),
+        pt.BoxReplace(pt.Txn.sender(), pt.Int(0), v.get()),
+    )
+
+
+@app.external
+def read_account_box(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+    return output.set(pt.BoxExtract(pt.Txn.sender(), pt.Int(0), pt.Int(ACCOUNT_BOX_SIZE - 1)))
+
+
 @app.external
 def set_global_state_val(v: pt.abi.String) -> pt.Expr:
     # This will fail, since it was declared as `static` and initialized to
@@ -0,0 +1,131 @@
+# Compare the blob (global/local state) and box write methods of the state example
+import argparse
+import base64
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pathlib import Path
+
+from algosdk import abi, account, encoding, transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner, AtomicTransactionComposer
+from beaker import client, localnet as sandbox
+
+import application
+from teal_analyzer import analyze
+
+# Write methods compared, with the boxes each call has to reference
+WRITE_METHODS = {
+    "global blob": (application.write_global_blob, lambda sender: []),
+    "local blob": (application.write_local_blob, lambda sender: []),
+    "global box": (application.write_global_box, lambda sender: [(0, b"global_blob")]),
+    "account box": (application.write_account_box, lambda sender: [(0, encoding.decode_address(sender))]),
+}
+# Upper bound of transaction bytes per block (consensus MaxTxnBytesPerBlock)
+MAX_BLOCK_TXN_BYTES = 5 * 1024 * 1024
+GROUP_SIZE = 16
+
+
+def call_size(method, message: str, boxes) -> int:
+    """Bytes of a signed app call to `method` with `message` as its argument."""
+    private_key, sender = account.generate_account()
+    params = transaction.SuggestedParams(
+        fee=1000, first=1, last=1001, gh=base64.b64encode(bytes(32)).decode(), gen="localnet-v1", flat_fee=True
+    )
+    contract_method = method.method_spec()
+    txn = transaction.ApplicationCallTxn(
+        sender,
+        params,
+        1,
+        transaction.OnComplete.NoOpOC,
+        app_args=[contract_method.get_selector(), abi.StringType().encode(message)],
+        boxes=boxes(sender),
+        note=b"0" * 16,
+    )
+    return len(base64.b64decode(encoding.msgpack_encode(txn.sign(private_key))))
+
+
+def static_report(message: str) -> dict:
+    """
+    Opcode cost from the compiled TEAL (blob writes loop once per state key
+    touched, so only the per-iteration range is known statically), bytes per
+    call and the block-size bound on writes per round.
+    """
+    analysis = analyze(Path(__file__).parent)
+    if analysis is None:
+        sys.exit("No artifacts for the state example, run build_all.py state first")
+    costs = analysis["methods"]
+    report = {}
+    for label, (method, boxes) in WRITE_METHODS.items():
+        cost = costs[method.method_signature()]
+        size = call_size(method, message, boxes)
+        report[label] = {
+            "cost": f"{cost['min']}..{cost['max']}" + (" per loop iteration" if cost["loop"] else ""),
+            "bytes_per_call": size,
+            "max_writes_per_round": MAX_BLOCK_TXN_BYTES // size,
+        }
+    return report
+
+
+def live_report(message: str, writes: int) -> dict:
+    """Deploy to the local sandbox node and measure budget used and confirmed writes per round."""
+    acct = sandbox.get_accounts().pop()
+    algod_client = sandbox.get_algod_client()
+    app_client = client.ApplicationClient(algod_client, application.app, signer=acct.signer)
+    app_id, app_address, _ = app_client.create()
+    # App minimum balance plus both boxes' minimum balance
+    app_client.fund(2_000_000)
+    app_client.opt_in()
+    signer = AccountTransactionSigner(acct.private_key)
+
+    report = {}
+    for label, (method, boxes) in WRITE_METHODS.items():
+        atc = AtomicTransactionComposer()
+        app_client.add_method_call(atc, method, v=message, boxes=boxes(acct.address))
+        simulated = atc.simulate(algod_client).simulate_response
+        consumed = simulated["txn-groups"][0]["txn-results"][0].get("app-budget-consumed")
+
+        # Submit all groups before waiting so the node can fill rounds
+        start = time.perf_counter()
+        first_txids = []
+        for first in range(0, writes, GROUP_SIZE):
+            atc = AtomicTransactionComposer()
+            for i in range(first, min(first + GROUP_SIZE, writes)):
+                app_client.add_method_call(
+                    atc, method, v=message, boxes=boxes(acct.address), note=f"{label}_{i}".encode(),
+                    signer=signer,
+                )
+            first_txids.append(atc.submit(algod_client)[0])
+        rounds = [
+            transaction.wait_for_confirmation(algod_client, txid, 10)["confirmed-round"] for txid in first_txids
+        ]
+        elapsed = time.perf_counter() - start
+        report[label] = {
+            "budget_consumed": consumed,
+            "writes_per_round": writes / (max(rounds) - min(rounds) + 1),
+            "writes_per_second": writes / elapsed,
+        }
+    print(f"Measured on app {app_id} ({app_address})")
+    return report
+
+
+def print_report(title: str, report: dict):
+    print(f"== {title}")
+    for label, values in report.items():
+        print(f"  {label:12} " + ", ".join(f"{key}: {value}" for key, value in values.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare blob and box storage for the state example.")
+    parser.add_argument("--message-size", type=int, default=64, help="Bytes written per call.")
+    parser.add_argument("--localnet", action="store_true",
+                        help="Also deploy to the local sandbox node and measure budget and writes per round.")
+    parser.add_argument("--writes", type=int, default=160, help="Writes per method in the live measurement.")
+    args = parser.parse_args()
+
+    message = "x" * args.message_size
+    print_report(f"static, {args.message_size} byte writes", static_report(message))
+    if args.localnet:
+        print_report(f"localnet, {args.message_size} byte writes", live_report(message, args.writes))
@@ -0,0 +1,336 @@
+# Static opcode cost and size report for the compiled contracts in */artifacts
+import argparse
+import json
+import math
+from pathlib import Path
+
+from build_all import PLAYGROUND_DIR
+
+REPORT_FILE = "teal_report.json"
+MAX_PATHS = 10_000
+
+# Opcode costs that differ from 1 (AVM v8). Ops with a length-dependent cost
+# (e.g. base64_decode, json_ref) are counted with their base cost.
+OPCODE_COSTS = {
+    "sha256": 35,
+    "keccak256": 130,
+    "sha512_256": 45,
+    "sha3_256": 130,
+    "ed25519verify": 1900,
+    "ed25519verify_bare": 1900,
+    "ecdsa_verify": 1700,
+    "ecdsa_pk_decompress": 650,
+    "ecdsa_pk_recover": 2000,
+    "vrf_verify": 5700,
+    "bn256_add": 70,
+    "bn256_scalar_mul": 970,
+    "bn256_pairing": 8700,
+    "divmodw": 20,
+    "sqrt": 4,
+    "expw": 10,
+    "b+": 10,
+    "b-": 10,
+    "b*": 20,
+    "b/": 20,
+    "b%": 20,
+    "b|": 6,
+    "b&": 6,
+    "b^": 6,
+    "b~": 4,
+    "bsqrt": 40,
+    "json_ref": 25,
+}
+
+# Number of one-byte immediates per opcode, for the program size estimate
+ONE_BYTE_IMMEDIATES = {
+    "intc", "bytec", "arg", "load", "store", "txn", "global", "gtxns", "gloads", "itxn", "itxn_field",
+    "frame_dig", "frame_bury", "dupn", "popn", "bury", "cover", "uncover", "dig", "replace2",
+    "asset_holding_get", "asset_params_get", "app_params_get", "acct_params_get", "json_ref",
+    "base64_decode", "ecdsa_verify", "ecdsa_pk_decompress", "ecdsa_pk_recover", "vrf_verify", "block",
+}
+TWO_BYTE_IMMEDIATES = {"txna", "gtxn", "gtxnsa", "itxna", "gitxn", "gload", "extract", "substring", "proto"}
+THREE_BYTE_IMMEDIATES = {"gtxna", "gitxna"}
+BRANCHES = {"b", "bz", "bnz", "callsub"}
+TERMINATORS = {"return", "err", "retsub"}
+
+
+def _varuint_size(value: int) -> int:
+    return max(1, math.ceil(value.bit_length() / 7))
+
+
+def _byte_length(token: str) -> int:
+    if token.startswith("0x"):
+        return len(token) // 2 - 1
+    if token.startswith('"'):
+        return len(token[1:-1].encode().decode("unicode_escape"))
+    return len(token)
+
+
+def _split_line(line: str) -> list[str]:
+    """Split a TEAL line into tokens, dropping the comment but keeping quoted strings."""
+    tokens, current, in_string = [], "", False
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if in_string:
+            current += char
+            if char == "\\" and i + 1 < len(line):
+                current += line[i + 1]
+                i += 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+            current += char
+        elif line.startswith("//", i):
+            break
+        elif char.isspace():
+            if current:
+                tokens.append(current)
+                current = ""
+        else:
+            current += char
+        i += 1
+    if current:
+        tokens.append(current)
+    return tokens
+
+
+def _comment(line: str) -> str:
+    return line.split("//", 1)[1].strip() if "//" in line else ""
+
+
+def parse(source: str):
+    """Return the program as a list of (op, args, comment) and a label -> index map."""
+    program, labels = [], {}
+    for line in source.splitlines():
+        tokens = _split_line(line.strip())
+        if not tokens or tokens[0].startswith("#pragma"):
+            continue
+        if tokens[0].endswith(":"):
+            labels[tokens[0][:-1]] = len(program)
+            continue
+        program.append((tokens[0], tokens[1:], _comment(line)))
+    return program, labels
+
+
+def instruction_size(op: str, args: list[str]) -> int:
+    if op == "intcblock":
+        return 1 + _varuint_size(len(args)) + sum(_varuint_size(int(arg, 0)) for arg in args)
+    if op == "bytecblock":
+        lengths = [_byte_length(arg) for arg in args]
+        return 1 + _varuint_size(len(args)) + sum(_varuint_size(n) + n for n in lengths)
+    if op in ("pushint", "int"):
+        return 1 + _varuint_size(int(args[0], 0))
+    if op in ("pushbytes", "byte"):
+        n = _byte_length(args[0])
+        return 1 + _varuint_size(n) + n
+    if op == "method":
+        return 6
+    if op in ("switch", "match"):
+        return 2 + 2 * len(args)
+    if op in BRANCHES:
+        return 3
+    if op in THREE_BYTE_IMMEDIATES:
+        return 4
+    if op in TWO_BYTE_IMMEDIATES:
+        return 3
+    if op in ONE_BYTE_IMMEDIATES:
+        return 2
+    return 1
+
+
+def program_size(program) -> int:
+    """Estimated assembled size in bytes, including the version byte."""
+    return 1 + sum(instruction_size(op, args) for op, args, _ in program)
+
+
+class CostAnalyzer:
+    """
+    Walks every path through the program. Subroutines are summarised once as
+    a (min, max) cost over their own paths. A path that reaches a label it
+    already passed is cut there and flagged as a loop: its cost covers one
+    iteration only.
+    """
+
+    def __init__(self, program, labels):
+        self.program = program
+        self.labels = labels
+        self._subroutines = {}
+
+    def _successors(self, pc: int):
+        op, args, _ = self.program[pc]
+        if op == "b":
+            return [self.labels[args[0]]]
+        if op in ("bz", "bnz"):
+            return [pc + 1, self.labels[args[0]]]
+        if op in ("switch", "match"):
+            return [pc + 1] + [self.labels[arg] for arg in args]
+        return [pc + 1]
+
+    def _walk(self, start: int, in_subroutine: bool):
+        """Yield (method, min cost, max cost, outcome, loop) for every path from `start`."""
+        stack = [(start, 0, 0, None, frozenset(), False, None)]
+        paths = 0
+        while stack and paths < MAX_PATHS:
+            pc, low, high, method, seen, loop, pending = stack.pop()
+            if pc >= len(self.program):
+                paths += 1
+                yield method, low, high, "end", loop
+                continue
+            op, args, comment = self.program[pc]
+            cost = OPCODE_COSTS.get(op, 1)
+            low, high = low + cost, high + cost
+
+            if op == "callsub":
+                sub_low, sub_high, sub_loop = self.subroutine_cost(args[0])
+                stack.append((pc + 1, low + sub_low, high + sub_high, method, seen, loop or sub_loop, None))
+                continue
+            if op in TERMINATORS:
+                if (op == "retsub") == in_subroutine:
+                    paths += 1
+                    yield method, low, high, "reject" if op == "err" else "approve", loop
+                continue
+
+            # Track router comparisons to attribute paths to ABI methods
+            if op == "==" and pc >= 2:
+                prev_op, prev_args, prev_comment = self.program[pc - 1]
+                first_op, first_args, _ = self.program[pc - 2]
+                if first_op == "txna" and first_args[:2] == ["ApplicationArgs", "0"]:
+                    pending = prev_comment.strip('"') or (prev_args[0] if prev_args else None)
+                elif first_op == "txn" and first_args == ["NumAppArgs"]:
+                    pending = "(bare)"
+                else:
+                    pending = None
+            elif op not in ("bz", "bnz"):
+                pending = None
+
+            successors = self._successors(pc)
+            for index, target in enumerate(successors):
+                target_method = method
+                if pending and method is None:
+                    taken = index == 1
+                    if (op == "bnz" and taken) or (op == "bz" and not taken):
+                        target_method = pending
+                target_seen, target_loop = seen, loop
+                if target <= pc:
+                    if target in seen:
+                        paths += 1
+                        yield target_method, low, high, "loop", True
+                        continue
+                    target_seen = seen | {target}
+                stack.append((target, low, high, target_method, target_seen, target_loop,
+                              pending if op == "==" else None))
+
+    def subroutine_cost(self, label: str):
+        if label not in self._subroutines:
+            self._subroutines[label] = (0, 0, True)  # guards recursion
+            results = list(self._walk(self.labels[label], in_subroutine=True))
+            low = min((r[1] for r in results), default=0)
+            high = max((r[2] for r in results), default=0)
+            self._subroutines[label] = (low, high, any(r[4] for r in results))
+        return self._subroutines[label]
+
+    def method_costs(self) -> dict:
+        methods = {}
+        for method, low, high, outcome, loop in self._walk(0, in_subroutine=False):
+            if outcome == "reject":
+                continue
+            entry = methods.setdefault(method or "(unrouted)", {"paths": 0, "min": low, "max": high, "loop": False})
+            entry["paths"] += 1
+            entry["min"] = min(entry["min"], low)
+            entry["max"] = max(entry["max"], high)
+            entry["loop"] = entry["loop"] or loop
+        return methods
+
+
+def state_report(app_spec: dict) -> dict:
+    """
+    Schema counts, maximum state bytes and minimum balance increase in
+    microAlgos per scope. The global state increase falls on the creator,
+    the local state increase on each account that opts in.
+    """
+    schema = app_spec["state"]
+    report = {}
+    for scope in ("global", "local"):
+        uints = schema[scope]["num_uints"]
+        byte_slices = schema[scope]["num_byte_slices"]
+        report[scope] = {
+            "num_uints": uints,
+            "num_byte_slices": byte_slices,
+            "max_bytes": 128 * (uints + byte_slices),
+            "min_balance": 28_500 * uints + 50_000 * byte_slices,
+        }
+    return report
+
+
+def analyze(package: Path) -> dict | None:
+    artifacts = package / "artifacts"
+    approval_path = artifacts / "approval.teal"
+    if not approval_path.exists():
+        return None
+
+    program, labels = parse(approval_path.read_text())
+    clear_program, _ = parse((artifacts / "clear.teal").read_text())
+    approval_size = program_size(program)
+    clear_size = program_size(clear_program)
+
+    report = {
+        "approval_bytes": approval_size,
+        "clear_bytes": clear_size,
+        "extra_pages": max(0, math.ceil((approval_size + clear_size) / 2048) - 1),
+        "methods": CostAnalyzer(program, labels).method_costs(),
+    }
+    app_spec_path = artifacts / "application.json"
+    if app_spec_path.exists():
+        report["state"] = state_report(json.loads(app_spec_path.read_text()))
+    return report
+
+
+def _delta(new, old) -> str:
+    if old is None:
+        return " (new)"
+    return f" ({new - old:+d})" if new != old else ""
+
+
+def print_report(name: str, report: dict, previous: dict | None):
+    previous = previous or {}
+    print(f"== {name}")
+    print(f"approval: ~{report['approval_bytes']} bytes{_delta(report['approval_bytes'], previous.get('approval_bytes'))}, "
+          f"clear: ~{report['clear_bytes']} bytes{_delta(report['clear_bytes'], previous.get('clear_bytes'))}, "
+          f"extra pages: {report['extra_pages']}")
+    for scope, state in report.get("state", {}).items():
+        print(f"{scope} state: {state['num_uints']} uints, {state['num_byte_slices']} byte slices, "
+              f"<= {state['max_bytes']} bytes, min balance +{state['min_balance']} "
+              f"{'for the creator' if scope == 'global' else 'per opted-in account'}")
+    old_methods = previous.get("methods", {})
+    for method, cost in sorted(report["methods"].items()):
+        old = old_methods.get(method, {})
+        loop = " per loop iteration" if cost["loop"] else ""
+        print(f"  {method}: cost {cost['min']}{_delta(cost['min'], old.get('min'))}"
+              f"..{cost['max']}{_delta(cost['max'], old.get('max'))}{loop} over {cost['paths']} paths")
+    for method in sorted(set(old_methods) - set(report["methods"])):
+        print(f"  {method}: removed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report opcode cost per ABI method and program/state size of the built contracts."
+    )
+    parser.add_argument("packages", nargs="*", help="Only analyze these packages, e.g. counter.")
+    parser.add_argument("--no-save", action="store_true",
+                        help=f"Do not store the report as artifacts/{REPORT_FILE} for the next diff.")
+    args = parser.parse_args()
+
+    for package in sorted(path.parent for path in PLAYGROUND_DIR.glob("*/build.py")):
+        if args.packages and package.name not in args.packages:
+            continue
+        report = analyze(package)
+        if report is None:
+            print(f"== {package.name}: no artifacts, run build_all.py first")
+            continue
+        report_path = package / "artifacts" / REPORT_FILE
+        previous = json.loads(report_path.read_text()) if report_path.exists() else None
+        print_report(package.name, report, previous)
+        if not args.no_save:
+            report_path.write_text(json.dumps(report, indent=2, sort_keys=True))
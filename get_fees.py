@@ -1,15 +1,22 @@
 import csv
+import os
+import sys
 from algosdk.v2client import algod
 import argparse
 import json
 import base64
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'contract'))
+
+from playground.experiments.experiment_store import open_store
+
 DEFAULT_ROUNDS_TO_SCAN = 1000
 
 
 def find_transaction_fees_in_blocks(notes_to_find, notes_to_txid, client, rounds_to_scan):
 
     found_fees = {}
+    found_rounds = {}
     remaining_notes = notes_to_find.copy()
 
     try:
@@ -45,6 +52,7 @@ def find_transaction_fees_in_blocks(notes_to_find, notes_to_txid, client, rounds
                                     print(
                                         f"  -> Found note '{decoded_note}' (TXID {txid}) in block {round_num} with fee {fee} microAlgos")
                                     found_fees[txid] = fee
+                                    found_rounds[txid] = round_num
                                     remaining_notes.remove(decoded_note)
                             except Exception:
                                 continue
@@ -60,10 +68,10 @@ def find_transaction_fees_in_blocks(notes_to_find, notes_to_txid, client, rounds
         for note in remaining_notes:
             print(f" - {note} (TXID: {notes_to_txid.get(note, 'N/A')})")
 
-    return found_fees
+    return found_fees, found_rounds
 
 
-def process_transactions(input_file, output_file, client, rounds_to_scan):
+def process_transactions(input_file, output_file, client, rounds_to_scan, store_path=None):
     notes_to_find = set()
     notes_to_txid = {}
     original_data = []
@@ -96,7 +104,13 @@ def process_transactions(input_file, output_file, client, rounds_to_scan):
 
     print(f"\nFound {len(notes_to_find)} unique transaction notes to search for.")
 
-    tx_fees = find_transaction_fees_in_blocks(notes_to_find, notes_to_txid, client, rounds_to_scan)
+    tx_fees, tx_rounds = find_transaction_fees_in_blocks(notes_to_find, notes_to_txid, client, rounds_to_scan)
+
+    store = open_store(store_path)
+    if store:
+        with store:
+            store.add_fees(tx_fees, tx_rounds)
+        print(f"Stored {len(tx_fees)} fees in {store_path}")
 
     with open(output_file, 'w', newline='') as outfile:
         writer = csv.writer(outfile)
@@ -141,6 +155,10 @@ if __name__ == "__main__":
         default=DEFAULT_ROUNDS_TO_SCAN,
         help=f'Number of recent rounds to scan. Defaults to {DEFAULT_ROUNDS_TO_SCAN}.'
     )
+    parser.add_argument(
+        '--store',
+        help='Experiment store (SQLite file, see experiment_store.py) to also write the fees into.'
+    )
 
     args = parser.parse_args()
 
@@ -162,6 +180,6 @@ if __name__ == "__main__":
         print(f"Error: {e}")
         exit()
 
-    process_transactions(args.input, args.output, algod_client, args.rounds)
+    process_transactions(args.input, args.output, algod_client, args.rounds, args.store)
 
     print(f"\nProcessing complete. Output written to {args.output}")
@@ -1,36 +1,69 @@
 from algosdk import account, mnemonic
 from algosdk.transaction import PaymentTxn
 from algosdk.v2client import algod
+from concurrent.futures import ThreadPoolExecutor
 import random
 import base64
-import time
+import csv
 import argparse
+import os
+import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'contract'))
 
-def wait_for_confirmation_with_timeout(client, txid, timeout=1000):
-    start_time = time.time()
+from playground.experiments import fee_oracle
 
-    while True:
-        elapsed_time = time.time() - start_time
-        if elapsed_time > timeout:
-            print(f"Transaction confirmation timed out after {timeout} seconds")
-            return None
 
+def wait_for_confirmation_with_timeout(client, txid, timeout=10):
+    """Wait up to `timeout` rounds for `txid`, checking once per new block."""
+    current_round = client.status()['last-round']
+    max_round = current_round + timeout
+
+    while current_round <= max_round:
         try:
             pending_txn = client.pending_transaction_info(txid)
         except Exception as e:
             print(f"Error fetching pending transaction: {e}")
             return None
 
-        if 'confirmed-round' in pending_txn:
+        if pending_txn.get('confirmed-round', 0) > 0:
             return pending_txn['confirmed-round']
+        if pending_txn.get('pool-error'):
+            print(f"Transaction rejected: {pending_txn['pool-error']}")
+            return None
+
+        client.status_after_block(current_round)
+        current_round += 1
+
+    print(f"Transaction confirmation timed out after {timeout} rounds")
+    return None
 
-        time.sleep(1)
 
+def wait_for_block_confirmations(client, txids, start_round, timeout=10):
+    """
+    Wait for many transactions at once by matching their IDs against the
+    transaction IDs of every new block after `start_round`.
+    Returns a dict of txid -> confirmed round for the transactions found.
+    """
+    remaining = set(txids)
+    confirmed = {}
+    current_round = start_round
 
-def send_funds(private_key, receiver_address, amount, node_address, node_token):
-    algod_client = algod.AlgodClient(node_token, node_address)
+    while remaining and current_round < start_round + timeout:
+        client.status_after_block(current_round)
+        current_round += 1
+        block_txids = client.get_block_txids(current_round).get('blockTxids') or []
+        for txid in remaining.intersection(block_txids):
+            confirmed[txid] = current_round
+        remaining.difference_update(confirmed)
+        print(f"Round {current_round}: {len(confirmed)}/{len(txids)} payments confirmed")
 
+    if remaining:
+        print(f"{len(remaining)} payments not confirmed after {timeout} rounds")
+    return confirmed
+
+
+def send_funds(private_key, receiver_address, amount, algod_client, fee_bidder=None):
     public_key = account.address_from_private_key(private_key)
     print(f"Public Key: {public_key}")
     print(f"Receiver's Address: {receiver_address}")
@@ -45,10 +78,12 @@ def send_funds(private_key, receiver_address, amount, node_address, node_token):
     encoded_note = base64.b64encode(str(random_note).encode())
 
     txn = PaymentTxn(public_key, params, receiver_address, amount, None, note=encoded_note)
+    if fee_bidder:
+        fee_bidder.bind(algod_client).apply(txn)
     signed_txn = txn.sign(private_key)
 
     txid = algod_client.send_transaction(signed_txn)
-    print(f"Transaction ID: {txid}")
+    print(f"Transaction ID: {txid}, fee {txn.fee} microAlgos")
 
     try:
         confirmed_round = wait_for_confirmation_with_timeout(algod_client, txid)
@@ -58,6 +93,49 @@ def send_funds(private_key, receiver_address, amount, node_address, node_token):
         print(f"Exception raised: {e}")
 
 
+def read_payments(csv_file):
+    """Read (receiver, amount) rows from a CSV file with a `receiver,amount` header."""
+    with open(csv_file, 'r', newline='') as infile:
+        return [(row['receiver'], int(row['amount'])) for row in csv.DictReader(infile)]
+
+
+def send_funds_batch(private_key, payments, algod_client, max_workers=16, fee_bidder=None):
+    """
+    Sign every payment up front, submit them in parallel and confirm them per
+    block. With `fee_bidder` (see fee_oracle.py) each payment bids from the
+    fees of recent blocks, read once for the whole batch.
+    """
+    public_key = account.address_from_private_key(private_key)
+    params = algod_client.suggested_params()
+    oracle = fee_bidder.bind(algod_client).oracle if fee_bidder else None
+    if oracle:
+        oracle.update()
+
+    signed_txns = []
+    fees = []
+    for i, (receiver_address, amount) in enumerate(payments):
+        note = f"batch_{random.randint(1, 10000)}_{i}".encode()
+        txn = PaymentTxn(public_key, params, receiver_address, amount, None, note=note)
+        if oracle:
+            oracle.apply(txn, fee_bidder.percentile, fee_bidder.epsilon, fee_bidder.max_fee, refresh=False)
+        fees.append(txn.fee)
+        signed_txns.append(txn.sign(private_key))
+    if oracle:
+        print(f"Fee bids {min(fees)}-{max(fees)} microAlgos ({oracle.describe(fee_bidder.percentile)})")
+    print(f"Signed {len(signed_txns)} payments from {public_key}")
+
+    start_round = algod_client.status()['last-round']
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        txids = list(executor.map(algod_client.send_transaction, signed_txns))
+    print(f"Submitted {len(txids)} payments")
+
+    confirmed = wait_for_block_confirmations(algod_client, txids, start_round)
+    for txid, fee, (receiver_address, amount) in zip(txids, fees, payments):
+        status = f"confirmed in round {confirmed[txid]}" if txid in confirmed else "NOT confirmed"
+        print(f"{receiver_address} {amount} microAlgos: {txid} fee {fee} {status}")
+    return confirmed
+
+
 def main():
     parser = argparse.ArgumentParser(description="Send Algorand funds to a specified address.")
 
@@ -75,20 +153,39 @@ def main():
         help="The address of the Algorand participation node."
     )
 
+    parser.add_argument(
+        '--batch-csv',
+        type=str,
+        help="CSV file with 'receiver,amount' rows. Sends all payments in parallel instead of a single one."
+    )
+
+    fee_oracle.add_arguments(parser)
+
     args = parser.parse_args()
 
     example_private_key = "UK790krMFIp90Z02KuuLk+g6O5GOnQwSBYyqqMCw/w/z03/UuY2YCWL3xuu8RXC13ybK5QauZ+2hkgh+ZM2y/A=="
     example_amount = 2000000000
     example_node_token = "97361fdc801fe9fd7f2ae87fa4ea5dc8b9b6ce7380c230eaf5494c4cb5d38d61"
 
+    algod_client = algod.AlgodClient(example_node_token, args.node_address)
+
+    if args.batch_csv:
+        send_funds_batch(
+            private_key=example_private_key,
+            payments=read_payments(args.batch_csv),
+            algod_client=algod_client,
+            fee_bidder=fee_oracle.from_args(args),
+        )
+        return
+
     send_funds(
         private_key=example_private_key,
         receiver_address=args.receiver_address,
         amount=example_amount,
-        node_address=args.node_address,
-        node_token=example_node_token
+        algod_client=algod_client,
+        fee_bidder=fee_oracle.from_args(args),
     )
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()